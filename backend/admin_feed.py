@@ -0,0 +1,215 @@
+import threading
+
+ADMIN_NAMESPACE = '/admin'
+
+
+def summarize_game(game_id, game):
+    """Résumé d'une partie tel qu'affiché dans le tableau de bord admin"""
+    return {
+        'game_id': game_id,
+        'players_count': len(game.players),
+        'players': [{'name': p['name'], 'number': p['number']} for p in list(game.players.values())],
+        'spectators_count': len(game.spectators),
+        'current_player': game.current_player,
+        'game_over': game.game_over,
+        'ai_enabled': game.ai_enabled,
+        'moves_count': sum(1 for row in game.board for cell in row if cell != 0)
+    }
+
+
+class AdminFeed:
+    """Flux temps réel du tableau de bord admin (namespace Socket.IO /admin)
+
+    Un admin reçoit un instantané à la connexion puis des événements
+    incrémentaux. L'emplacement de chaque sid (partie et rôle) et les
+    agrégats sont tenus à jour au fil des événements : ni l'instantané ni
+    les routes REST n'ont à croiser utilisateurs connectés et parties.
+    Chaque événement porte un numéro de séquence ; le client ignore ceux
+    antérieurs à l'instantané reçu.
+    """
+
+    def __init__(self):
+        self._socketio = None
+        self._games = None
+        self._connected_users = None
+        self._locations = {}     # sid -> (game_id, rôle)
+        self._members = {}       # game_id -> {sid}
+        self._admins = {}        # sid admin -> user_id
+        self._ai_games = set()
+        self._authenticated = set()
+        self._role_counts = {'player': 0, 'spectator': 0}
+        self._ended_total = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def attach(self, socketio, games, connected_users):
+        self._socketio = socketio
+        self._games = games
+        self._connected_users = connected_users
+
+    # Abonnés
+
+    def add_admin(self, sid, user_id):
+        with self._lock:
+            self._admins[sid] = user_id
+            return self._snapshot()
+
+    def remove_admin(self, sid):
+        with self._lock:
+            self._admins.pop(sid, None)
+
+    def admin_sids(self, user_id):
+        with self._lock:
+            return [sid for sid, admin_id in self._admins.items() if admin_id == user_id]
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot()
+
+    # Événements
+
+    def game_created(self, game_id, game):
+        with self._lock:
+            if game.ai_enabled:
+                self._ai_games.add(game_id)
+            self._members.setdefault(game_id, set())
+        if self._admins:
+            self._publish('game_created', summarize_game(game_id, game))
+
+    def game_ended(self, game_id, game):
+        with self._lock:
+            self._ended_total += 1
+        self._publish('game_ended', {'game_id': game_id, 'winner': game.winner,
+                                     'moves_count': sum(1 for row in game.board for cell in row if cell != 0)})
+
+    def game_removed(self, game_id, reason):
+        with self._lock:
+            self._ai_games.discard(game_id)
+            for sid in self._members.pop(game_id, ()):
+                _, role = self._locations.pop(sid)
+                self._role_counts[role] -= 1
+        self._publish('game_removed', {'game_id': game_id, 'reason': reason})
+
+    def games_removed(self, game_ids, reason):
+        """Variante groupée de game_removed : un seul événement pour toute la liste"""
+        with self._lock:
+            for game_id in game_ids:
+                self._ai_games.discard(game_id)
+                for sid in self._members.pop(game_id, ()):
+                    _, role = self._locations.pop(sid)
+                    self._role_counts[role] -= 1
+        self._publish('games_removed', {'game_ids': list(game_ids), 'reason': reason})
+
+    def user_connected(self, sid):
+        info = self._connected_users.get(sid)
+        if info is None:
+            return
+        if info.get('authenticated'):
+            with self._lock:
+                self._authenticated.add(sid)
+        self._publish('user_connected', self._summarize_user(sid, info))
+
+    def user_left(self, sid):
+        with self._lock:
+            self._leave(sid)
+            self._authenticated.discard(sid)
+        self._publish('user_left', {'sid': sid})
+
+    def users_left(self, sids):
+        """Variante groupée de user_left : un seul événement pour toute la liste"""
+        with self._lock:
+            for sid in sids:
+                self._leave(sid)
+                self._authenticated.discard(sid)
+        self._publish('users_left', {'sids': list(sids)})
+
+    def role_changed(self, sid, game_id, role):
+        """Un sid rejoint (rôle 'player' ou 'spectator') ou quitte (rôle None) une partie"""
+        with self._lock:
+            self._leave(sid)
+            if role is not None:
+                self._locations[sid] = (game_id, role)
+                self._members.setdefault(game_id, set()).add(sid)
+                self._role_counts[role] += 1
+        self._publish('user_role', {
+            'sid': sid,
+            'username': self._connected_users.get(sid, {}).get('username', 'Anonyme'),
+            'in_game': game_id if role else None,
+            'role': role or 'idle'
+        })
+
+    def admin_role_changed(self, user_id, is_admin):
+        self._publish('admin_role', {'user_id': user_id, 'is_admin': is_admin})
+
+    def bulk_progress(self, job):
+        self._publish('bulk_progress', dict(job))
+
+    # Lectures
+
+    def location(self, sid):
+        return self._locations.get(sid, (None, 'idle'))
+
+    def stats(self):
+        with self._lock:
+            return self._stats()
+
+    def connected_users_list(self):
+        return [self._summarize_user(sid, info) for sid, info in list(self._connected_users.items())]
+
+    def active_games_list(self):
+        return [summarize_game(game_id, game) for game_id, game in list(self._games.items())]
+
+    # Interne
+
+    def _leave(self, sid):
+        game_id, role = self._locations.pop(sid, (None, None))
+        if game_id is not None:
+            self._role_counts[role] -= 1
+            members = self._members.get(game_id)
+            if members is not None:
+                members.discard(sid)
+
+    def _summarize_user(self, sid, info):
+        in_game, role = self.location(sid)
+        return {
+            'sid': sid,
+            'username': info.get('username', 'Anonyme'),
+            'user_id': info.get('user_id'),
+            'connected_at': info.get('connected_at'),
+            'in_game': in_game,
+            'role': role
+        }
+
+    def _stats(self):
+        return {
+            'active_games': len(self._games),
+            'ai_games': len(self._ai_games),
+            'games_ended_total': self._ended_total,
+            'connected_users': len(self._connected_users),
+            'authenticated_users': len(self._authenticated),
+            'players': self._role_counts['player'],
+            'spectators': self._role_counts['spectator'],
+            'admins_watching': len(self._admins)
+        }
+
+    def _snapshot(self):
+        return {
+            'seq': self._seq,
+            'games': self.active_games_list(),
+            'users': self.connected_users_list(),
+            'stats': self._stats()
+        }
+
+    def _publish(self, event, payload):
+        # Aucun coût de diffusion tant qu'aucun admin ne regarde le tableau de bord
+        if not self._admins or self._socketio is None:
+            return
+        with self._lock:
+            self._seq += 1
+            payload['seq'] = self._seq
+            payload['stats'] = self._stats()
+        self._socketio.emit(event, payload, namespace=ADMIN_NAMESPACE)
+
+
+# Instance globale du flux admin
+admin_feed = AdminFeed()
@@ -1,5 +1,7 @@
 import random
 import copy
+from profiling import tracer
+from position_cache import position_cache
 
 class PuissanceAI:
     """Intelligence Artificielle pour le jeu Puissance 4"""
@@ -11,15 +13,33 @@ class PuissanceAI:
             'medium': 4,
             'hard': 6
         }.get(difficulty, 4)
+        self.nodes = 0
+        # Arbre Monte Carlo gardé d'un coup à l'autre (difficulté 'mcts')
+        self._mcts = None
+        # Score minimax du dernier coup calculé
+        self.last_score = None
     
+    @tracer.traced('ai.get_move')
     def get_move(self, board, player=2):
         """Retourne la meilleure colonne à jouer pour l'IA"""
         if self.difficulty == 'easy':
             return self._random_move(board)
-        elif self.difficulty == 'medium':
-            return self._smart_move(board, player)
+        
+        cached = position_cache.get(board, player, self.difficulty)
+        if cached is not None:
+            return cached[0]
+        
+        score = None
+        if self.difficulty == 'medium':
+            col = self._smart_move(board, player)
+        elif self.difficulty == 'mcts':
+            col = self._mcts_move(board, player)
         else:  # hard
-            return self._minimax_move(board, player)
+            col = self._minimax_move(board, player)
+            score = self.last_score
+        
+        position_cache.set(board, player, self.difficulty, col, score)
+        return col
     
     def _random_move(self, board):
         """IA facile : coup aléatoire valide"""
@@ -53,11 +73,31 @@ class PuissanceAI:
         # 5. Coup aléatoire en dernier recours
         return self._random_move(board)
     
+    def _mcts_move(self, board, player):
+        """IA Monte Carlo : autant de parties aléatoires que le budget de temps le permet"""
+        from mcts import MCTSSearch
+        
+        if self._mcts is None:
+            self._mcts = MCTSSearch()
+        col = self._mcts.get_move(board, player)
+        self.nodes += self._mcts.playouts
+        return col
+    
     def _minimax_move(self, board, player):
-        _, best_col = self._minimax(board, self.max_depth, -float('inf'), float('inf'), True, player)
+        from parallel_search import parallel_search
+        
+        if self._check_winner(board) == 0:
+            result = parallel_search.search(board, self.max_depth, player)
+            if result is not None:
+                self.last_score, best_col, nodes = result
+                self.nodes += nodes
+                return best_col
+        
+        self.last_score, best_col = self._minimax(board, self.max_depth, -float('inf'), float('inf'), True, player)
         return best_col
     
     def _minimax(self, board, depth, alpha, beta, maximizing_player, player):
+        self.nodes += 1
         winner = self._check_winner(board)
         
         if depth == 0 or winner != 0 or self._is_board_full(board):
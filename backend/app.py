@@ -2,23 +2,37 @@ from flask import Flask
 from flask_socketio import SocketIO
 from flask_cors import CORS
 import os
+import signal
+import sys
+import time
 from dotenv import load_dotenv
-from database import db
-from auth import auth_manager
-from routes import auth_bp, admin_bp, game_bp, init_socketio_handlers, init_admin_routes, init_game_routes
 
+# Charger le .env avant les modules qui lisent leur configuration à l'import
 load_dotenv()
 
+from database import db
+from auth import auth_manager
+from chat import chat_pipeline
+from admin_feed import admin_feed
+from migration import drain_controller
+from sessions import reconnect_grace
+from event_log import game_log
+from routes import (auth_bp, admin_bp, game_bp, init_socketio_handlers, init_admin_routes, init_game_routes,
+                    schedule_grace_expiry, arm_clock, init_matchmaking_handlers, leaderboard_bp, metrics_bp,
+                    init_metrics_routes, tournament_bp, init_tournament_handlers, social_bp, init_social_routes)
+
 app = Flask(__name__)
 secret_key = os.getenv('SECRET_KEY', 'votre_clé_secrète_ici')
 app.config['SECRET_KEY'] = secret_key
 auth_manager.secret_key = secret_key
 app.auth_manager = auth_manager
 
-CORS(app, resources={r"/*": {"origins": ["http://localhost:5173", "http://localhost:5174"]}})
+cors_origins = os.getenv('CORS_ORIGINS', 'http://localhost:5173,http://localhost:5174').split(',')
+
+CORS(app, resources={r"/*": {"origins": cors_origins}})
 socketio = SocketIO(
     app, 
-    cors_allowed_origins=["http://localhost:5173", "http://localhost:5174"],
+    cors_allowed_origins=cors_origins,
     async_mode='threading',
     logger=False,
     engineio_logger=False,
@@ -32,10 +46,18 @@ connected_users = {}
 app.register_blueprint(auth_bp, url_prefix='/api')
 app.register_blueprint(admin_bp, url_prefix='/api/admin')
 app.register_blueprint(game_bp)
+app.register_blueprint(leaderboard_bp, url_prefix='/api')
+app.register_blueprint(metrics_bp)
+app.register_blueprint(tournament_bp, url_prefix='/api')
+app.register_blueprint(social_bp, url_prefix='/api')
 
 init_game_routes(games)
 init_admin_routes(games, socketio, connected_users)
 init_socketio_handlers(socketio, games, connected_users)
+init_matchmaking_handlers(socketio, games, connected_users)
+init_tournament_handlers(socketio, games, connected_users)
+init_social_routes(socketio, games)
+init_metrics_routes(games, connected_users)
 
 
 def init_admin_user():
@@ -53,8 +75,50 @@ def init_admin_user():
     except Exception as e:
         print(f"⚠️  Erreur lors de l'initialisation de l'admin : {e}")
 
+def restore_games():
+    """Reprend les parties laissées par le processus précédent (instantané de déploiement, sinon journal)"""
+    restored = drain_controller.restore(games) or game_log.replay(games)
+    game_log.checkpoint(games)
+    if restored:
+        for game_id, game in games.items():
+            admin_feed.game_created(game_id, game)
+            # Les joueurs d'une partie multijoueur ont le délai de grâce pour revenir
+            if reconnect_grace.enabled and not game.ai_enabled:
+                for number, slot in list(game.reserved_slots.items()):
+                    schedule_grace_expiry(socketio, games, game_id, number, slot['token'])
+            # Pendule suspendue tant que des places sont gardées (elle repart au retour
+            # des deux joueurs), sinon le drapeau du joueur au trait est reprogrammé
+            if game.clock and game.clock.running is not None:
+                if reconnect_grace.enabled and game.reserved_slots:
+                    game.clock.stop()
+                else:
+                    arm_clock(socketio, games, game_id, game)
+
+def handle_sigterm(signum, frame):
+    """Arrêt pour déploiement : instantané des parties en cours puis sortie"""
+    drain_controller.start_drain()
+    drain_controller.shutting_down = True
+    for sid, notice in drain_controller.issue_tokens(games):
+        socketio.emit('server_draining', notice, to=sid)
+    # Délai laissé aux émissions en file pour partir vers les clients avant la sortie
+    notify_deadline = time.monotonic() + float(os.getenv('SHUTDOWN_NOTIFY_SECONDS', 1))
+    try:
+        drain_controller.snapshot(games)
+    except OSError as e:
+        print(f"⚠️  Instantané des parties impossible : {e}")
+    chat_pipeline.flush()
+    game_log.flush()
+    socketio.sleep(max(0, notify_deadline - time.monotonic()))
+    sys.exit(0)
+
 if __name__ == '__main__':
     init_admin_user()
     
+    debug = os.getenv('SERVER_DEBUG', 'true').lower() == 'true'
+    # Avec le rechargeur du mode debug, seul le processus enfant sert les requêtes
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        restore_games()
+        signal.signal(signal.SIGTERM, handle_sigterm)
+    
     print("🚀 Démarrage du serveur sur http://0.0.0.0:5001")
-    socketio.run(app, debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    socketio.run(app, debug=debug, host='0.0.0.0', port=5001, allow_unsafe_werkzeug=True)
\ No newline at end of file
@@ -4,10 +4,16 @@ from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify, current_app
 import os
+import time
+from cache import LRUCache
 
 class AuthManager:
     def __init__(self, secret_key=None):
         self.secret_key = secret_key or os.getenv('SECRET_KEY') or secrets.token_hex(32)
+        cache_size = int(os.getenv('AUTH_CACHE_SIZE', 10000))
+        cache_ttl = float(os.getenv('AUTH_CACHE_TTL', 60))
+        self.token_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self.admin_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
     
     def generate_token(self, user_data):
         payload = {
@@ -20,14 +26,41 @@ class AuthManager:
         return jwt.encode(payload, self.secret_key, algorithm='HS256')
     
     def verify_token(self, token):
-        """Vérifie et décode un JWT token"""
+        """Vérifie et décode un JWT token (résultat mis en cache pour une courte durée)"""
+        payload = self.token_cache.get(token)
+        if payload is not None:
+            if payload['exp'] > time.time():
+                return payload
+            self.token_cache.pop(token)
+        
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=['HS256'])
-            return payload
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
+        
+        self.token_cache.set(token, payload)
+        return payload
+    
+    def is_admin(self, user_id):
+        """Vérifie le statut admin d'un utilisateur (mis en cache pour une courte durée)"""
+        from database import db
+        
+        is_admin = self.admin_cache.get(user_id)
+        if is_admin is None:
+            user = db.get_user_by_id(user_id)
+            is_admin = bool(user and user.get('is_admin'))
+            self.admin_cache.set(user_id, is_admin)
+        return is_admin
+    
+    def invalidate_user(self, user_id):
+        """Invalide le statut admin en cache d'un utilisateur modifié ou supprimé
+        
+        Seul le cache admin est concerné : les claims d'un JWT ne dépendent que
+        du token, qui reste valide jusqu'à son expiration (pas de révocation).
+        """
+        self.admin_cache.pop(user_id)
     
     def get_user_from_token(self, token):
         """Extrait les données utilisateur d'un token"""
@@ -39,18 +72,21 @@ class AuthManager:
             }
         return None
 
+def _get_bearer_token():
+    """Extrait le token du header Authorization ; lève IndexError si mal formé"""
+    auth_header = request.headers.get('Authorization')
+    if auth_header:
+        return auth_header.split(' ')[1]
+    return None
+
 def token_required(f):
     """Décorateur pour protéger les routes nécessitant une authentification"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        auth_header = request.headers.get('Authorization')
-        if auth_header:
-            try:
-                token = auth_header.split(' ')[1]
-            except IndexError:
-                return jsonify({'error': 'Format de token invalide'}), 401
+        try:
+            token = _get_bearer_token()
+        except IndexError:
+            return jsonify({'error': 'Format de token invalide'}), 401
         
         if not token:
             return jsonify({'error': 'Token manquant'}), 401
@@ -70,13 +106,11 @@ def optional_token(f):
     """Décorateur pour les routes où l'authentification est optionnelle"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
         request.current_user = None
         
-        auth_header = request.headers.get('Authorization')
-        if auth_header:
+        if request.headers.get('Authorization'):
             try:
-                token = auth_header.split(' ')[1]
+                token = _get_bearer_token()
                 auth_manager = current_app.auth_manager
                 user_data = auth_manager.get_user_from_token(token)
                 if user_data:
@@ -92,16 +126,10 @@ def admin_required(f):
     """Décorateur pour protéger les routes admin"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        from database import db
-        
-        token = None
-        
-        auth_header = request.headers.get('Authorization')
-        if auth_header:
-            try:
-                token = auth_header.split(' ')[1]
-            except IndexError:
-                return jsonify({'error': 'Format de token invalide'}), 401
+        try:
+            token = _get_bearer_token()
+        except IndexError:
+            return jsonify({'error': 'Format de token invalide'}), 401
         
         if not token:
             return jsonify({'error': 'Token manquant'}), 401
@@ -112,8 +140,7 @@ def admin_required(f):
         if not user_data:
             return jsonify({'error': 'Token invalide ou expiré'}), 401
         
-        user = db.get_user_by_id(user_data['user_id'])
-        if not user or not user.get('is_admin'):
+        if not auth_manager.is_admin(user_data['user_id']):
             return jsonify({'error': 'Accès refusé - droits administrateur requis'}), 403
         request.current_user = user_data
         return f(*args, **kwargs)
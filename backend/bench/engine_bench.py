@@ -0,0 +1,203 @@
+"""Micro-benchmarks reproductibles de PuissanceAI et du moteur Puissance4
+
+Mesure, sur un corpus fixe de positions :
+- le temps par coup et les nœuds/seconde de l'IA pour chaque difficulté
+- le débit de check_winner, _evaluate_board et drop_piece
+
+    python bench/engine_bench.py --output bench.json
+    python bench/engine_bench.py --baseline bench.json --threshold 0.15
+
+Avec --baseline, le script échoue (code 1) si un débit baisse ou si un temps
+augmente de plus du seuil, ou si un coup choisi par une IA déterministe change
+(--allow-move-changes pour l'accepter, par exemple après un réglage voulu).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import PuissanceAI  # noqa: E402
+from game import Puissance4  # noqa: E402
+from position_cache import position_cache  # noqa: E402
+
+# Positions décrites par la suite des colonnes jouées (joueur 1 commence)
+CORPUS = {
+    'empty': '',
+    'center_open': '3',
+    'center_reply': '33',
+    'early_mixed': '3324',
+    'early_edge': '30',
+    'mid_center': '33443',
+    'mid_diagonal': '32234',
+    'mid_left': '1122',
+    'mid_right': '55664',
+    'late_crowded': '3333332222224444',
+    'double_threat': '332211',
+    'endgame': '000000111111222222'
+}
+
+DETERMINISTIC_DIFFICULTIES = ('medium', 'hard')
+
+
+def build_board(moves):
+    """Rejoue une suite de coups et retourne le plateau et le joueur au trait"""
+    game = Puissance4()
+    player = 1
+    for char in moves:
+        col = int(char)
+        if not game.drop_piece(col, player):
+            raise ValueError(f'Coup invalide dans le corpus : {moves}')
+        if game.check_winner():
+            raise ValueError(f'Position terminale dans le corpus : {moves}')
+        player = 2 if player == 1 else 1
+    return game.board, player
+
+
+def throughput(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    return round(iterations / elapsed, 1)
+
+
+def bench_ai(difficulty, repeat):
+    times = []
+    nodes = 0
+    moves = {}
+    for name, sequence in CORPUS.items():
+        board, player = build_board(sequence)
+        best = None
+        for _ in range(repeat):
+            ai = PuissanceAI(difficulty)
+            random.seed(0)
+            start = time.perf_counter()
+            move = ai.get_move(board, player)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            nodes_for_move = ai.nodes
+        times.append(best)
+        nodes += nodes_for_move
+        moves[name] = move
+
+    total = sum(times)
+    return {
+        'mean_move_ms': round(1000 * total / len(times), 3),
+        'max_move_ms': round(1000 * max(times), 3),
+        'nodes': nodes,
+        'nodes_per_second': round(nodes / total, 1) if nodes else None,
+        'moves': moves
+    }
+
+
+def bench_engine(iterations):
+    boards = [build_board(sequence)[0] for sequence in CORPUS.values()]
+    game = Puissance4()
+    ai = PuissanceAI('hard')
+    state = {'index': 0}
+
+    def next_board():
+        state['index'] = (state['index'] + 1) % len(boards)
+        return boards[state['index']]
+
+    def check_winner():
+        game.board = next_board()
+        game.check_winner()
+
+    def evaluate():
+        ai._evaluate_board(next_board(), 2)
+
+    def fill_board():
+        game.board = [[0] * 7 for _ in range(6)]
+        game.game_over = False
+        for col in (3, 2, 4, 1, 5, 0, 6) * 6:
+            game.drop_piece(col, 1)
+
+    return {
+        'check_winner_per_second': throughput(check_winner, iterations),
+        'evaluate_board_per_second': throughput(evaluate, max(1, iterations // 4)),
+        # 42 pions déposés par itération
+        'drop_piece_per_second': round(throughput(fill_board, max(1, iterations // 10)) * 42, 1)
+    }
+
+
+def run(args):
+    # On mesure la recherche elle-même, pas le cache partagé entre les parties
+    position_cache.enabled = False
+    results = {'engine': bench_engine(args.iterations), 'ai': {}}
+    for difficulty in args.difficulties:
+        results['ai'][difficulty] = bench_ai(difficulty, args.repeat)
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'corpus_size': len(CORPUS)
+        },
+        'results': results
+    }
+
+
+def compare(current, baseline, threshold, allow_move_changes):
+    """Retourne la liste des régressions par rapport à la référence"""
+    regressions = []
+    for metric, value in current['engine'].items():
+        previous = baseline.get('engine', {}).get(metric)
+        if previous and value < previous * (1 - threshold):
+            regressions.append(f'{metric}: {value} < {previous} (-{100 * (1 - value / previous):.1f}%)')
+
+    for difficulty, stats in current['ai'].items():
+        previous = baseline.get('ai', {}).get(difficulty)
+        if not previous:
+            continue
+        if previous['mean_move_ms'] and stats['mean_move_ms'] > previous['mean_move_ms'] * (1 + threshold):
+            regressions.append(f"{difficulty}.mean_move_ms: {stats['mean_move_ms']} > {previous['mean_move_ms']}")
+        if previous.get('nodes_per_second') and stats['nodes_per_second'] and \
+                stats['nodes_per_second'] < previous['nodes_per_second'] * (1 - threshold):
+            regressions.append(f"{difficulty}.nodes_per_second: {stats['nodes_per_second']} "
+                               f"< {previous['nodes_per_second']}")
+        if difficulty in DETERMINISTIC_DIFFICULTIES and not allow_move_changes:
+            for position, move in stats['moves'].items():
+                if position in previous['moves'] and previous['moves'][position] != move:
+                    regressions.append(f'{difficulty}.moves.{position}: {move} (référence {previous["moves"][position]})')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--difficulties', default='easy,medium,hard', type=lambda v: v.split(','))
+    parser.add_argument('--iterations', type=int, default=20000, help='Itérations des benchmarks du moteur')
+    parser.add_argument('--repeat', type=int, default=3, help='Répétitions par position (meilleur temps retenu)')
+    parser.add_argument('--output', help='Écrit les résultats JSON dans ce fichier')
+    parser.add_argument('--baseline', help='Fichier JSON de référence à comparer')
+    parser.add_argument('--threshold', type=float, default=0.15, help='Régression tolérée (0.15 = 15 %%)')
+    parser.add_argument('--allow-move-changes', action='store_true')
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report['results'], baseline['results'], args.threshold, args.allow_move_changes)
+        if regressions:
+            print('Régressions détectées :', file=sys.stderr)
+            for line in regressions:
+                print(f'  - {line}', file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""Générateur de charge Socket.IO pour le serveur Puissance 4
+
+Simule des parties multijoueur, des parties contre l'IA et des spectateurs
+contre un serveur local (démarré automatiquement si --url n'est pas fourni),
+puis rapporte les latences p50/p99 et la consommation CPU/RSS du serveur.
+
+    python bench/loadtest.py --games 200 --concurrency 50 --spectators 2
+    python bench/loadtest.py --url http://localhost:5001 --mix pvp=0.5,ai=0.5 --json result.json
+
+Contre un serveur existant, son CORS_ORIGINS doit accepter l'URL cible comme origine.
+"""
+import argparse
+import json
+import os
+import queue
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import socketio
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+class Recorder:
+    """Collecte thread-safe des échantillons de latence (en secondes)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+
+    def add(self, name, value):
+        with self._lock:
+            self.samples.setdefault(name, []).append(value)
+
+    def error(self, kind):
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def summary(self):
+        result = {}
+        for name, values in self.samples.items():
+            values = sorted(values)
+            result[name] = {
+                'count': len(values),
+                'p50_ms': round(percentile(values, 50) * 1000, 2),
+                'p99_ms': round(percentile(values, 99) * 1000, 2),
+                'max_ms': round(values[-1] * 1000, 2)
+            }
+        return result
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class SimClient:
+    """Client Socket.IO simulé ; les événements reçus sont horodatés dans une file"""
+
+    EVENTS = ('player_assigned', 'move_made', 'game_state', 'error', 'game_ended')
+
+    def __init__(self, url, timeout):
+        self.timeout = timeout
+        self.events = queue.Queue()
+        self.sio = socketio.Client(reconnection=False)
+        for name in self.EVENTS:
+            self.sio.on(name, self._handler(name))
+        self.sio.connect(url, transports=['websocket'], wait_timeout=timeout)
+
+    def _handler(self, name):
+        def handle(data=None):
+            self.events.put((name, time.perf_counter(), data))
+        return handle
+
+    def emit(self, event, data):
+        self.sio.emit(event, data)
+
+    def wait_for(self, name, predicate=None):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(name)
+            event, received_at, data = self.events.get(timeout=remaining)
+            if event == 'error' and name != 'error':
+                raise RuntimeError(data.get('message') if isinstance(data, dict) else data)
+            if event == name and (predicate is None or predicate(data)):
+                return received_at, data
+
+    def close(self):
+        """Déconnexion en arrière-plan : le client engineio attend la fin de sa boucle de lecture"""
+        closer = threading.Thread(target=self._disconnect, daemon=True)
+        closer.start()
+        _closers.append(closer)
+
+    def _disconnect(self):
+        try:
+            self.sio.disconnect()
+        except Exception:
+            pass
+
+
+_closers = []
+
+
+def http_post(url, payload=None):
+    request = urllib.request.Request(url, data=json.dumps(payload or {}).encode(), method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def choose_column(heights, rng):
+    return rng.choice([col for col in range(7) if heights[col] < 6])
+
+
+def play_pvp(url, args, recorder, rng):
+    game_id = http_post(f'{url}/create_game')['game_id']
+    clients = []
+    try:
+        players = [SimClient(url, args.timeout) for _ in range(2)]
+        clients.extend(players)
+        for index, player in enumerate(players):
+            player.emit('join_game', {'game_id': game_id, 'player_name': f'bot{index + 1}'})
+            player.wait_for('player_assigned')
+
+        spectators = []
+        for index in range(args.spectators):
+            spectator = SimClient(url, args.timeout)
+            clients.append(spectator)
+            spectator.emit('join_game', {'game_id': game_id, 'player_name': f'spec{index}'})
+            spectator.wait_for('player_assigned', lambda data: data.get('role') == 'spectator')
+            spectators.append(spectator)
+
+        heights = [0] * 7
+        current = 1
+        for _ in range(args.moves):
+            mover = players[current - 1]
+            col = choose_column(heights, rng)
+            start = time.perf_counter()
+            mover.emit('make_move', {'game_id': game_id, 'col': col})
+            received_at, _ = mover.wait_for('move_made', lambda data: data.get('player') == current)
+            recorder.add('move_rtt', received_at - start)
+            for spectator in spectators:
+                received_at, _ = spectator.wait_for('move_made', lambda data: data.get('player') == current)
+                recorder.add('broadcast_fanout', received_at - start)
+
+            heights[col] += 1
+            _, state = mover.wait_for('game_state')
+            if state.get('game_over'):
+                break
+            current = state['current_player']
+        recorder.add('game_completed', 0)
+    finally:
+        for client in clients:
+            client.close()
+
+
+def play_ai(url, args, recorder, rng):
+    difficulty = rng.choice(args.ai_difficulties)
+    game_id = http_post(f'{url}/create_ai_game', {'difficulty': difficulty})['game_id']
+    player = SimClient(url, args.timeout)
+    try:
+        player.emit('join_game', {'game_id': game_id, 'player_name': 'bot'})
+        player.wait_for('player_assigned')
+
+        heights = [0] * 7
+        for _ in range(args.moves):
+            col = choose_column(heights, rng)
+            start = time.perf_counter()
+            player.emit('make_move', {'game_id': game_id, 'col': col})
+            received_at, _ = player.wait_for('move_made', lambda data: data.get('player') == 1)
+            recorder.add('move_rtt', received_at - start)
+            heights[col] += 1
+
+            _, state = player.wait_for('game_state')
+            if state.get('game_over'):
+                break
+            received_at, data = player.wait_for('move_made', lambda data: data.get('player') == 2)
+            recorder.add('ai_reply', received_at - start)
+            heights[data['column']] += 1
+            _, state = player.wait_for('game_state')
+            if state.get('game_over'):
+                break
+        recorder.add('game_completed', 0)
+    finally:
+        player.close()
+
+
+def parse_mix(spec):
+    weights = {}
+    for item in spec.split(','):
+        name, _, weight = item.partition('=')
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(args):
+    """Démarre le backend dans un répertoire temporaire (base SQLite jetable)"""
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix='puissance4-loadtest-')
+    url = f'http://127.0.0.1:{port}'
+    # Les clients simulés envoient leur propre URL comme origine
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, CORS_ORIGINS=url)
+    # Les bots jouent bien plus vite qu'un humain : le limiteur est coupé sauf demande explicite
+    env['SOCKET_RATE_LIMIT_ENABLED'] = 'true' if args.rate_limit else 'false'
+    code = ('import app; app.socketio.run(app.app, host="127.0.0.1", port=%d, '
+            'allow_unsafe_werkzeug=True, log_output=False)' % port)
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'{url}/api/health', timeout=1)
+            return process, url
+        except Exception:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError('Le serveur local ne répond pas')
+
+
+def process_usage(pid):
+    """Temps CPU (s) et RSS (Mo) d'un processus, lus dans /proc"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / CLK_TCK
+        with open(f'/proc/{pid}/status') as f:
+            rss = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:')) / 1024
+        return cpu, rss
+    except (OSError, StopIteration, IndexError, ValueError):
+        return None, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Serveur cible (par défaut : serveur local démarré pour le test)')
+    parser.add_argument('--games', type=int, default=50, help='Nombre total de parties simulées')
+    parser.add_argument('--concurrency', type=int, default=10, help='Parties jouées simultanément')
+    parser.add_argument('--mix', default='pvp=0.7,ai=0.3', help='Répartition des scénarios')
+    parser.add_argument('--spectators', type=int, default=1, help='Spectateurs par partie multijoueur')
+    parser.add_argument('--moves', type=int, default=42, help='Nombre maximal de coups par joueur simulé')
+    parser.add_argument('--ai-difficulties', default='easy,medium', type=lambda v: v.split(','))
+    parser.add_argument('--timeout', type=float, default=15.0, help='Attente maximale par événement (s)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--rate-limit', action='store_true', help='Garde le limiteur actif sur le serveur local')
+    parser.add_argument('--json', help='Écrit le rapport JSON dans ce fichier')
+    parser.add_argument('--max-p99-ms', type=float, help='Échoue si le p99 de move_rtt dépasse ce seuil')
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if not url:
+        server, url = start_local_server(args)
+
+    mix = parse_mix(args.mix)
+    scenarios = {'pvp': play_pvp, 'ai': play_ai}
+    rng = random.Random(args.seed)
+    plan = rng.choices(list(mix), weights=list(mix.values()), k=args.games)
+    recorder = Recorder()
+
+    pid = server.pid if server else None
+    cpu_before, _ = process_usage(pid) if pid else (None, None)
+    started = time.perf_counter()
+
+    def run(index, kind):
+        try:
+            scenarios[kind](url, args, recorder, random.Random(args.seed * 100003 + index))
+        except Exception as e:
+            recorder.error(f'{kind}:{type(e).__name__}')
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            for index, kind in enumerate(plan):
+                executor.submit(run, index, kind)
+        elapsed = time.perf_counter() - started
+        cpu_after, rss = process_usage(pid) if pid else (None, None)
+        for closer in _closers:
+            closer.join(timeout=10)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+
+    summary = recorder.summary()
+    completed = summary.pop('game_completed', {}).get('count', 0)
+    report = {
+        'games': args.games,
+        'completed': completed,
+        'concurrency': args.concurrency,
+        'elapsed_seconds': round(elapsed, 2),
+        'latency': summary,
+        'errors': recorder.errors,
+        'server': {
+            'cpu_seconds': round(cpu_after - cpu_before, 2) if cpu_after is not None else None,
+            'cpu_percent': round(100 * (cpu_after - cpu_before) / elapsed, 1) if cpu_after is not None else None,
+            'rss_mb': round(rss, 1) if rss is not None else None
+        }
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    p99 = summary.get('move_rtt', {}).get('p99_ms')
+    if args.max_p99_ms is not None and (p99 is None or p99 > args.max_p99_ms):
+        print(f"p99 move_rtt {p99} ms > seuil {args.max_p99_ms} ms", file=sys.stderr)
+        return 1
+    return 1 if recorder.errors and not completed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
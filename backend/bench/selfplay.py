@@ -0,0 +1,184 @@
+"""Parties IA contre IA sans serveur, réparties sur tous les cœurs
+
+Joue N parties de PuissanceAI contre PuissanceAI pour chaque appariement de
+difficultés et écrit au fil de l'eau un fichier TSV compressé (gzip), une
+ligne par partie :
+
+    index  joueur1  joueur2  gagnant  ouverture  coups  temps_us
+
+`coups` est la suite des colonnes jouées ("3324..."), `ouverture` le nombre
+de coups d'ouverture tirés au hasard (pour varier les parties entre IA
+déterministes) et `temps_us` le temps de réflexion de chaque coup en
+microsecondes, séparés par des virgules.
+
+    python bench/selfplay.py --pairs hard:medium,mcts:hard --games 10000 --output selfplay.tsv.gz
+    python bench/selfplay.py --pairs medium:medium --games 1000000 --workers 16 --opening-moves 6
+
+Un résumé JSON (victoires, nuls, longueur moyenne, temps de réflexion par
+difficulté) est affiché à la fin.
+"""
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import PuissanceAI  # noqa: E402
+from game import Puissance4  # noqa: E402
+from parallel_search import parallel_search  # noqa: E402
+from position_cache import position_cache  # noqa: E402
+
+HEADER = 'index\tplayer1\tplayer2\twinner\topening\tmoves\tthink_us'
+
+
+def _init_worker(use_cache):
+    # Un processus par cœur : pas de pool de recherche imbriqué
+    parallel_search.workers = 0
+    position_cache.enabled = use_cache
+
+
+def play_game(task):
+    """Joue une partie ; retourne (index, difficulté 1, difficulté 2, gagnant, ouverture, coups, temps)"""
+    index, first, second, opening_moves, seed = task
+    rng = random.Random(seed)
+    random.seed(seed)
+    ais = {1: PuissanceAI(first), 2: PuissanceAI(second)}
+    for player, ai in ais.items():
+        if ai.difficulty == 'mcts':
+            from mcts import MCTSSearch
+            ai._mcts = MCTSSearch(seed=seed * 2 + player)
+
+    game = Puissance4()
+    player = 1
+    moves = []
+    think_us = []
+    winner = 0
+    while True:
+        if len(moves) < opening_moves:
+            col = rng.choice([c for c in range(7) if game.board[0][c] == 0])
+            elapsed = 0
+        else:
+            start = time.perf_counter()
+            col = ais[player].get_move(game.board, player)
+            elapsed = int((time.perf_counter() - start) * 1e6)
+
+        game.drop_piece(col, player)
+        moves.append(col)
+        think_us.append(elapsed)
+
+        if game.check_winner():
+            winner = player
+            break
+        if game.is_board_full():
+            break
+        player = 2 if player == 1 else 1
+
+    return index, first, second, winner, opening_moves, ''.join(map(str, moves)), think_us
+
+
+def build_tasks(pairs, games, opening_moves, seed, swap):
+    """Génère les parties à jouer, en alternant les couleurs si `swap`"""
+    for pair_index, (first, second) in enumerate(pairs):
+        for game in range(games):
+            index = len(pairs) * game + pair_index
+            if swap and game % 2:
+                yield index, second, first, opening_moves, seed + index
+            else:
+                yield index, first, second, opening_moves, seed + index
+
+
+def summarize(summary, first, second, winner, moves, think_us, opening_moves):
+    entry = summary.setdefault(f'{first}:{second}', {
+        'games': 0, 'player1_wins': 0, 'player2_wins': 0, 'draws': 0, 'total_moves': 0
+    })
+    entry['games'] += 1
+    entry['total_moves'] += len(moves)
+    if winner == 0:
+        entry['draws'] += 1
+    else:
+        entry[f'player{winner}_wins'] += 1
+
+    for ply, elapsed in enumerate(think_us):
+        if ply < opening_moves:
+            continue
+        difficulty = first if ply % 2 == 0 else second
+        timing = summary.setdefault('_think', {}).setdefault(difficulty, {'moves': 0, 'total_us': 0, 'max_us': 0})
+        timing['moves'] += 1
+        timing['total_us'] += elapsed
+        timing['max_us'] = max(timing['max_us'], elapsed)
+
+
+def finalize(summary, elapsed):
+    think = summary.pop('_think', {})
+    pairs = {}
+    for key, entry in summary.items():
+        pairs[key] = dict(entry, mean_moves=round(entry.pop('total_moves') / entry['games'], 2))
+    return {
+        'pairs': pairs,
+        'think_ms': {
+            difficulty: {
+                'mean': round(t['total_us'] / t['moves'] / 1000, 3) if t['moves'] else None,
+                'max': round(t['max_us'] / 1000, 3)
+            }
+            for difficulty, t in think.items()
+        },
+        'games': sum(entry['games'] for entry in pairs.values()),
+        'seconds': round(elapsed, 2)
+    }
+
+
+def parse_pairs(value):
+    pairs = []
+    for pair in value.split(','):
+        first, _, second = pair.partition(':')
+        pairs.append((first, second or first))
+    return pairs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pairs', default='hard:medium', type=parse_pairs,
+                        help='Appariements joueur1:joueur2 séparés par des virgules')
+    parser.add_argument('--games', type=int, default=100, help='Parties par appariement')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Processus (défaut : un par cœur)')
+    parser.add_argument('--opening-moves', type=int, default=4, help='Coups d\'ouverture aléatoires')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-swap', dest='swap', action='store_false',
+                        help='Ne pas alterner le joueur qui commence')
+    parser.add_argument('--use-cache', action='store_true',
+                        help='Garder le cache de positions (fausse les temps de réflexion)')
+    parser.add_argument('--output', default='selfplay.tsv.gz')
+    parser.add_argument('--progress', type=int, default=1000, help='Affiche l\'avancement toutes les N parties')
+    args = parser.parse_args(argv)
+
+    tasks = build_tasks(args.pairs, args.games, args.opening_moves, args.seed, args.swap)
+    total = args.games * len(args.pairs)
+    context = multiprocessing.get_context(os.getenv('AI_MP_START_METHOD', 'fork'))
+    summary = {}
+    started = time.perf_counter()
+
+    with gzip.open(args.output, 'wt', compresslevel=6) as out, \
+            context.Pool(args.workers, initializer=_init_worker, initargs=(args.use_cache,)) as pool:
+        out.write(HEADER + '\n')
+        done = 0
+        for index, first, second, winner, opening, moves, think_us in pool.imap_unordered(
+                play_game, tasks, chunksize=max(1, min(64, total // (args.workers * 8)))):
+            out.write(f"{index}\t{first}\t{second}\t{winner}\t{opening}\t{moves}\t"
+                      f"{','.join(map(str, think_us))}\n")
+            summarize(summary, first, second, winner, moves, think_us, opening)
+            done += 1
+            if args.progress and done % args.progress == 0:
+                rate = done / (time.perf_counter() - started)
+                print(f'{done}/{total} parties ({rate:.1f}/s)', file=sys.stderr)
+
+    print(json.dumps(finalize(summary, time.perf_counter() - started), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
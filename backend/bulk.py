@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from admin_feed import admin_feed
+
+
+class BulkJob:
+    """Opération admin en masse et sa progression"""
+
+    def __init__(self, kind, total):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.total = total
+        self.done = 0
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._reported = -1
+
+    def advance_to(self, done):
+        """Met à jour la progression ; les admins sont notifiés tous les 5 % environ"""
+        self.done = min(done, self.total)
+        step = max(1, self.total // 20)
+        if self.done - self._reported >= step:
+            self._reported = self.done
+            admin_feed.bulk_progress(self.to_dict())
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'total': self.total,
+            'done': self.done,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+class BulkJobs:
+    """Exécution des opérations admin en masse
+
+    Les petites opérations s'exécutent dans la requête ; au-delà de
+    BULK_ASYNC_THRESHOLD éléments, elles partent dans un thread et la route
+    répond immédiatement avec l'identifiant de la tâche, dont la progression
+    est consultable en REST et poussée sur le namespace /admin.
+    """
+
+    def __init__(self, async_threshold=None, max_jobs=100):
+        self.async_threshold = async_threshold or int(os.getenv('BULK_ASYNC_THRESHOLD', 500))
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, total, work):
+        """Lance `work(job)` ; son retour devient le résultat de la tâche"""
+        job = BulkJob(kind, total)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+
+        job.status = 'running'
+        if total > self.async_threshold:
+            threading.Thread(target=self._run, args=(job, work), daemon=True).start()
+        else:
+            self._run(job, work)
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def recent(self):
+        with self._lock:
+            return [job.to_dict() for job in reversed(self._jobs.values())]
+
+    def _run(self, job, work):
+        try:
+            job.result = work(job)
+            job.done = job.total
+            job.status = 'done'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+            print(f"⚠️  Échec de l'opération en masse {job.kind} ({job.id}) : {e}")
+        job.finished_at = time.time()
+        admin_feed.bulk_progress(job.to_dict())
+
+
+# Instance globale des opérations en masse
+bulk_jobs = BulkJobs()
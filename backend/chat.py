@@ -0,0 +1,148 @@
+import os
+import queue
+import threading
+import time
+import atexit
+from collections import OrderedDict, deque
+from datetime import datetime
+from database import db
+
+
+class ChatPipeline:
+    """Persistance des messages de chat par lots + tampon mémoire par partie
+
+    Le tampon d'une partie ne sert l'historique que s'il est complet : ouvert
+    à la création de la partie (`open`) et sans message évincé. Un tampon
+    recréé après une éviction LRU ou un redémarrage ne contient que les
+    messages récents, l'historique est alors lu en base.
+    """
+
+    def __init__(self, database, batch_size=None, flush_interval=None,
+                 buffer_size=None, max_games=None):
+        self.db = database
+        self.batch_size = batch_size or int(os.getenv('CHAT_BATCH_SIZE', 200))
+        self.flush_interval = flush_interval or float(os.getenv('CHAT_FLUSH_INTERVAL', 0.5))
+        self.buffer_size = buffer_size or int(os.getenv('CHAT_BUFFER_SIZE', 100))
+        self.max_games = max_games or int(os.getenv('CHAT_BUFFER_MAX_GAMES', 10000))
+
+        self._queue = queue.Queue()
+        self._buffers = OrderedDict()
+        self._lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._done = threading.Condition()
+        self._submitted = 0
+        self._written = 0
+        self.persisted_count = 0
+        self.failed_count = 0
+
+    def start(self):
+        """Démarre le thread d'écriture (idempotent)"""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name='chat-writer', daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def open(self, game_id):
+        """Crée le tampon d'une nouvelle partie : il contient tout son chat"""
+        with self._lock:
+            self._buffers[game_id] = {'messages': deque(maxlen=self.buffer_size), 'dropped': 0, 'complete': True}
+            if len(self._buffers) > self.max_games:
+                self._buffers.popitem(last=False)
+
+    def submit(self, game_id, sender_id, sender_name, recipient_id, message, is_guest_message=False):
+        """Ajoute un message au tampon de la partie et à la file d'écriture"""
+        entry = {
+            'sender_id': sender_id,
+            'sender_name': sender_name,
+            'recipient_id': recipient_id,
+            'message': message,
+            'sent_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+            'is_guest_message': int(bool(is_guest_message))
+        }
+
+        with self._lock:
+            buffer = self._buffers.get(game_id)
+            if buffer is None:
+                buffer = self._buffers[game_id] = {'messages': deque(maxlen=self.buffer_size), 'dropped': 0,
+                                                   'complete': False}
+                if len(self._buffers) > self.max_games:
+                    self._buffers.popitem(last=False)
+            else:
+                self._buffers.move_to_end(game_id)
+
+            if len(buffer['messages']) == self.buffer_size:
+                buffer['dropped'] += 1
+            buffer['messages'].append(entry)
+            self._submitted += 1
+
+        self.start()
+        self._queue.put((game_id, sender_id, sender_name, recipient_id, message,
+                         entry['is_guest_message'], entry['sent_at']))
+
+    def get_recent(self, game_id, limit=100):
+        """Retourne les derniers messages depuis la mémoire, ou None s'il faut lire la base"""
+        with self._lock:
+            buffer = self._buffers.get(game_id)
+            if buffer is None or not buffer['complete']:
+                return None
+            messages = buffer['messages']
+            if buffer['dropped'] and limit > len(messages):
+                return None
+            return list(messages)[-limit:] if limit > 0 else []
+
+    def discard(self, game_id):
+        """Libère le tampon mémoire d'une partie terminée"""
+        with self._lock:
+            self._buffers.pop(game_id, None)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        """Écrit immédiatement tous les messages en attente, lot en cours du thread d'écriture compris"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        target = self._submitted
+        self._write(batch)
+        # Attend aussi le lot déjà dépilé par le thread d'écriture mais pas encore écrit ;
+        # les messages arrivés après l'appel ne sont pas attendus
+        with self._done:
+            self._done.wait_for(lambda: self._written >= target)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Regroupe les messages arrivés pendant la fenêtre de flush
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            self.db.save_chat_messages(batch)
+            self.persisted_count += len(batch)
+        except Exception as e:
+            self.failed_count += len(batch)
+            print(f"⚠️  Erreur lors de l'écriture du chat ({len(batch)} messages) : {e}")
+        finally:
+            with self._done:
+                self._written += len(batch)
+                self._done.notify_all()
+
+# Instance globale du pipeline de chat
+chat_pipeline = ChatPipeline(db)
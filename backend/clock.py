@@ -0,0 +1,89 @@
+import os
+import time
+
+
+class GameClock:
+    """Pendule d'une partie : temps restant par joueur et incrément par coup
+
+    Seul le temps du joueur au trait s'écoule ; le coup joué lui rend
+    l'incrément et lance la pendule adverse. Le minuteur de chute du
+    drapeau (`timer`) est programmé sur la roue de temporisation par les
+    routes de jeu, la pendule elle-même ne fait que compter.
+    """
+
+    def __init__(self, initial, increment=0):
+        self.initial = initial
+        self.increment = increment
+        self.remaining = {1: float(initial), 2: float(initial)}
+        self.running = None
+        self.started_at = None
+        self.timer = None
+
+    @classmethod
+    def from_env(cls):
+        """Pendule par défaut des parties multijoueur, ou None si CLOCK_INITIAL_SECONDS vaut 0"""
+        initial = float(os.getenv('CLOCK_INITIAL_SECONDS', 600))
+        if initial <= 0:
+            return None
+        return cls(initial, float(os.getenv('CLOCK_INCREMENT_SECONDS', 5)))
+
+    def start(self, player, now=None):
+        """Lance le temps du joueur `player`"""
+        self.running = player
+        self.started_at = time.monotonic() if now is None else now
+
+    def stop(self, now=None):
+        """Arrête la pendule en décomptant le temps écoulé du joueur au trait"""
+        if self.running is not None:
+            self.remaining[self.running] = self.left(self.running, now)
+        self.running = None
+        self.started_at = None
+
+    def switch(self, now=None):
+        """Coup joué : décompte, ajoute l'incrément au joueur au trait et lance la pendule adverse"""
+        now = time.monotonic() if now is None else now
+        player = self.running
+        self.stop(now)
+        self.remaining[player] += self.increment
+        self.start(3 - player, now)
+
+    def left(self, player, now=None):
+        """Temps restant (secondes) du joueur, pendule en marche comprise"""
+        remaining = self.remaining[player]
+        if player == self.running:
+            remaining -= (time.monotonic() if now is None else now) - self.started_at
+        return max(remaining, 0.0)
+
+    def flagged(self, now=None):
+        """Retourne le joueur dont le drapeau est tombé, ou None"""
+        if self.running is not None and self.left(self.running, now) <= 0:
+            return self.running
+        return None
+
+    def reset(self):
+        self.remaining = {1: float(self.initial), 2: float(self.initial)}
+        self.running = None
+        self.started_at = None
+
+    def to_dict(self, now=None):
+        now = time.monotonic() if now is None else now
+        return {
+            'initial_ms': int(self.initial * 1000),
+            'increment_ms': int(self.increment * 1000),
+            'remaining_ms': {player: int(self.left(player, now) * 1000) for player in (1, 2)},
+            'running': self.running
+        }
+
+    def snapshot(self, now=None):
+        """[initial, incrément, restant 1, restant 2, joueur au trait] ; le temps écoulé est décompté"""
+        return [self.initial, self.increment, self.left(1, now), self.left(2, now), self.running]
+
+    @classmethod
+    def from_snapshot(cls, data):
+        """Reconstruit une pendule ; celle du joueur au trait repart aussitôt"""
+        initial, increment, first, second, running = data
+        clock = cls(initial, increment)
+        clock.remaining = {1: first, 2: second}
+        if running is not None:
+            clock.start(running)
+        return clock
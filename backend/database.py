@@ -1,10 +1,63 @@
 import sqlite3
-import hashlib
-import secrets
 from datetime import datetime, timedelta
 import jwt
 import os
+from hashing import password_hasher
+from leaderboard import elo_update
+from metrics import instrument_methods, DB_QUERY_SECONDS
+from profiling import trace_methods
 
+def fts_query(text, prefix=True):
+    """Traduit une saisie libre en requête FTS5 sûre : termes entre guillemets, préfixes en `*`
+    
+    Les opérateurs FTS5 de la saisie ne sont pas interprétés ; tous les termes
+    doivent apparaître. Retourne None si la saisie ne contient aucun terme.
+    """
+    terms = [term.replace('"', '""') for term in (text or '').split()]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' if prefix else f'"{term}"' for term in terms)
+
+# Agrégat des parties de l'historique par (jour, mode, difficulté de l'IA). Le gagnant
+# est le numéro de place (0 : nulle) ; sur les parties antérieures à la colonne `winner`,
+# il est déduit de winner_id quand c'est possible, sinon l'issue reste inconnue.
+STATS_ROLLUP_SELECT = '''
+    SELECT date(COALESCE(ended_at, started_at)) AS day, COALESCE(game_mode, 'multiplayer') AS game_mode,
+           COALESCE(ai_difficulty, '') AS ai_difficulty, COUNT(*) AS games,
+           SUM(outcome IS 1) AS player1_wins, SUM(outcome IS 2) AS player2_wins, SUM(outcome IS 0) AS draws,
+           SUM(COALESCE(moves_count, 0)) AS moves_total
+    FROM (SELECT *, COALESCE(winner, CASE WHEN winner_id IS NULL THEN NULL
+                                          WHEN winner_id = player1_id THEN 1
+                                          WHEN winner_id = player2_id THEN 2 END) AS outcome
+          FROM game_history WHERE ({where}))
+    GROUP BY 1, 2, 3
+'''
+
+STATS_ROLLUP_MERGE = '''
+    ON CONFLICT (day, game_mode, ai_difficulty) DO UPDATE SET
+        games = games + excluded.games,
+        player1_wins = player1_wins + excluded.player1_wins,
+        player2_wins = player2_wins + excluded.player2_wins,
+        draws = draws + excluded.draws,
+        moves_total = moves_total + excluded.moves_total
+'''
+
+def stats_rollup_subtract(where):
+    """Requêtes retirant des agrégats les parties de l'historique sur le point d'être supprimées"""
+    return [f'''
+        UPDATE stats_daily SET
+            games = stats_daily.games - d.games,
+            player1_wins = stats_daily.player1_wins - d.player1_wins,
+            player2_wins = stats_daily.player2_wins - d.player2_wins,
+            draws = stats_daily.draws - d.draws,
+            moves_total = stats_daily.moves_total - d.moves_total
+        FROM ({STATS_ROLLUP_SELECT.format(where=where)}) AS d
+        WHERE stats_daily.day = d.day AND stats_daily.game_mode = d.game_mode
+          AND stats_daily.ai_difficulty = d.ai_difficulty
+    ''', 'DELETE FROM stats_daily WHERE games <= 0']
+
+@trace_methods('db', exclude=('get_connection', 'hash_password', 'verify_password'))
+@instrument_methods(DB_QUERY_SECONDS, exclude=('get_connection', 'hash_password', 'verify_password'))
 class Database:
     def __init__(self, db_path='puissance4.db'):
         self.db_path = db_path
@@ -100,9 +153,164 @@ class Database:
             )
         ''')
         
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tournaments (
+                id VARCHAR(36) PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                format VARCHAR(20) NOT NULL,
+                status VARCHAR(20) DEFAULT 'registration',
+                total_rounds INTEGER,
+                created_by INTEGER,
+                winner_id INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP,
+                FOREIGN KEY (created_by) REFERENCES users (id),
+                FOREIGN KEY (winner_id) REFERENCES users (id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tournament_entrants (
+                tournament_id VARCHAR(36) NOT NULL,
+                user_id INTEGER NOT NULL,
+                score REAL DEFAULT 0,
+                eliminated BOOLEAN DEFAULT 0,
+                PRIMARY KEY (tournament_id, user_id),
+                FOREIGN KEY (tournament_id) REFERENCES tournaments (id),
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tournament_games (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tournament_id VARCHAR(36) NOT NULL,
+                round INTEGER NOT NULL,
+                game_id VARCHAR(36),
+                player1_id INTEGER,
+                player2_id INTEGER,
+                winner_id INTEGER,
+                result VARCHAR(20),
+                FOREIGN KEY (tournament_id) REFERENCES tournaments (id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_tournament_games_round
+            ON tournament_games (tournament_id, round)
+        ''')
+        
+        self._ensure_column(cursor, 'users', 'rating', 'REAL DEFAULT 1200')
+        self._ensure_column(cursor, 'users', 'rated_games', 'INTEGER DEFAULT 0')
+        self._ensure_column(cursor, 'game_history', 'winner', 'INTEGER')
+        self._ensure_column(cursor, 'game_history', 'ai_difficulty', 'VARCHAR(10)')
+        
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_daily'")
+        stats_exist = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_daily (
+                day DATE NOT NULL,
+                game_mode VARCHAR(20) NOT NULL,
+                ai_difficulty VARCHAR(10) NOT NULL DEFAULT '',
+                games INTEGER NOT NULL DEFAULT 0,
+                player1_wins INTEGER NOT NULL DEFAULT 0,
+                player2_wins INTEGER NOT NULL DEFAULT 0,
+                draws INTEGER NOT NULL DEFAULT 0,
+                moves_total INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, game_mode, ai_difficulty)
+            ) WITHOUT ROWID
+        ''')
+        if not stats_exist:
+            # Première création : agrégats remplis une fois depuis l'historique existant
+            cursor.execute(f'''
+                INSERT INTO stats_daily (day, game_mode, ai_difficulty, games,
+                                         player1_wins, player2_wins, draws, moves_total)
+                {STATS_ROLLUP_SELECT.format(where='1')}
+            ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_users_rating
+            ON users (rating DESC) WHERE rated_games > 0
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_chat_messages_game
+            ON chat_messages (game_id, sent_at)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_friendships_friend
+            ON friendships (friend_id, status)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_game_invitations_pending
+            ON game_invitations (expires_at) WHERE status = 'pending'
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_game_invitations_to
+            ON game_invitations (to_user_id, status)
+        ''')
+        
+        self.fts_enabled = self._init_search(cursor)
+        
         conn.commit()
         conn.close()
     
+    def _init_search(self, cursor):
+        """Index plein texte FTS5 du chat et des utilisateurs, tenus à jour par triggers
+        
+        Tables à contenu externe : l'index ne duplique pas les textes. À la
+        création, il est rempli une fois depuis les tables existantes.
+        Retourne False si SQLite est compilé sans FTS5 (recherche désactivée).
+        """
+        indexes = {
+            'chat_messages_fts': ('chat_messages', ('message', 'sender_name')),
+            'users_fts': ('users', ('username', 'display_name', 'email', 'bio'))
+        }
+        try:
+            for fts, (table, columns) in indexes.items():
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,))
+                exists = cursor.fetchone() is not None
+                cursor.execute(f'''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                        {', '.join(columns)}, content='{table}', content_rowid='id',
+                        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+                    )
+                ''')
+                new = ', '.join(f'new.{column}' for column in columns)
+                old = ', '.join(f'old.{column}' for column in columns)
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN
+                        INSERT INTO {fts} (rowid, {', '.join(columns)}) VALUES (new.id, {new});
+                    END
+                ''')
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN
+                        INSERT INTO {fts} ({fts}, rowid, {', '.join(columns)}) VALUES ('delete', old.id, {old});
+                    END
+                ''')
+                # Seules les colonnes indexées déclenchent la réindexation (pas le classement, les compteurs...)
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {', '.join(columns)} ON {table} BEGIN
+                        INSERT INTO {fts} ({fts}, rowid, {', '.join(columns)}) VALUES ('delete', old.id, {old});
+                        INSERT INTO {fts} (rowid, {', '.join(columns)}) VALUES (new.id, {new});
+                    END
+                ''')
+                if not exists:
+                    cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  Recherche plein texte indisponible (FTS5) : {e}")
+            return False
+    
+    def _ensure_column(self, cursor, table, column, definition):
+        """Ajoute une colonne manquante aux bases créées avant son introduction"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    
     def create_admin_user(self, username, email, password, display_name=None):
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -134,19 +342,12 @@ class Database:
             conn.close()
     
     def hash_password(self, password):
-        """Hash un mot de passe avec salt"""
-        salt = secrets.token_hex(16)
-        password_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-        return f"{salt}:{password_hash.hex()}"
+        """Hash un mot de passe avec salt (calcul délégué au pool de hachage)"""
+        return password_hasher.hash(password)
     
     def verify_password(self, password, hashed):
         """Vérifie un mot de passe"""
-        try:
-            salt, hash_hex = hashed.split(':')
-            password_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-            return password_hash.hex() == hash_hex
-        except:
-            return False
+        return password_hasher.verify(password, hashed)
     
     def create_user(self, username, email, password, display_name=None):
         """Crée un nouvel utilisateur"""
@@ -184,6 +385,11 @@ class Database:
         conn.close()
         
         if user and self.verify_password(password, user[3]):
+            if password_hasher.needs_rehash(user[3]):
+                # Migration du hash en arrière-plan : la connexion ne la paie pas et n'échoue jamais à cause d'elle
+                user_id = user[0]
+                password_hasher.rehash_in_background(
+                    password, lambda password_hash: self.update_password_hash(user_id, password_hash))
             return {
                 'id': user[0],
                 'username': user[1],
@@ -194,6 +400,16 @@ class Database:
             }
         return None
     
+    def update_password_hash(self, user_id, password_hash):
+        """Remplace le hash du mot de passe (migration de schéma de hachage)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('UPDATE users SET password_hash = ? WHERE id = ?', (password_hash, user_id))
+        
+        conn.commit()
+        conn.close()
+    
     def get_user_by_id(self, user_id):
         """Récupère un utilisateur par son ID"""
         conn = self.get_connection()
@@ -201,7 +417,7 @@ class Database:
         
         cursor.execute('''
             SELECT id, username, email, display_name, avatar_url, bio, 
-                   games_played, games_won, created_at, is_admin
+                   games_played, games_won, created_at, is_admin, rating
             FROM users WHERE id = ? AND is_active = 1
         ''', (user_id,))
         
@@ -219,7 +435,8 @@ class Database:
                 'games_played': user[6],
                 'games_won': user[7],
                 'created_at': user[8],
-                'is_admin': bool(user[9])
+                'is_admin': bool(user[9]),
+                'rating': user[10]
             }
         return None
     
@@ -252,18 +469,32 @@ class Database:
         conn.close()
     
     def save_game_result(self, game_id, player1_id, player2_id, player1_name, player2_name, 
-                        winner_id, game_mode='multiplayer', moves_count=0, is_guest_game=False):
-        """Sauvegarde le résultat d'une partie"""
+                        winner_id, game_mode='multiplayer', moves_count=0, is_guest_game=False,
+                        winner=None, ai_difficulty=None):
+        """Sauvegarde le résultat d'une partie et retourne les nouveaux classements {user_id: rating}
+        
+        winner : numéro de place du gagnant (0 : nulle). Les agrégats de
+        statistiques du jour sont mis à jour dans la même transaction.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
+        ended_at = datetime.now()
         
         cursor.execute('''
             INSERT INTO game_history 
             (game_id, player1_id, player2_id, player1_name, player2_name, 
-             winner_id, game_mode, ended_at, moves_count, is_guest_game)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             winner_id, game_mode, ended_at, moves_count, is_guest_game, winner, ai_difficulty)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (game_id, player1_id, player2_id, player1_name, player2_name,
-              winner_id, game_mode, datetime.now(), moves_count, is_guest_game))
+              winner_id, game_mode, ended_at, moves_count, is_guest_game, winner, ai_difficulty))
+        
+        cursor.execute(f'''
+            INSERT INTO stats_daily (day, game_mode, ai_difficulty, games,
+                                     player1_wins, player2_wins, draws, moves_total)
+            VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+            {STATS_ROLLUP_MERGE}
+        ''', (ended_at.strftime('%Y-%m-%d'), game_mode, ai_difficulty or '',
+              int(winner == 1), int(winner == 2), int(winner == 0), moves_count or 0))
         
         if not is_guest_game:
             if player1_id:
@@ -276,8 +507,252 @@ class Database:
                 if winner_id == player2_id:
                     cursor.execute('UPDATE users SET games_won = games_won + 1 WHERE id = ?', (player2_id,))
         
+        ratings = {}
+        if player1_id and player2_id and player1_id != player2_id and game_mode == 'multiplayer':
+            ratings = self._update_ratings(cursor, player1_id, player2_id, winner_id)
+        
+        conn.commit()
+        conn.close()
+        
+        return ratings
+    
+    def _update_ratings(self, cursor, player1_id, player2_id, winner_id):
+        """Met à jour les classements Elo des deux joueurs dans la transaction en cours"""
+        cursor.execute('SELECT id, rating, rated_games FROM users WHERE id IN (?, ?)', (player1_id, player2_id))
+        current = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+        if player1_id not in current or player2_id not in current:
+            return {}
+        
+        score = 1.0 if winner_id == player1_id else 0.0 if winner_id == player2_id else 0.5
+        (rating1, games1), (rating2, games2) = current[player1_id], current[player2_id]
+        new1, new2 = elo_update(rating1, rating2, score, games1, games2)
+        
+        cursor.executemany('UPDATE users SET rating = ?, rated_games = rated_games + 1 WHERE id = ?',
+                           [(new1, player1_id), (new2, player2_id)])
+        return {player1_id: new1, player2_id: new2}
+    
+    def create_tournament(self, tournament_id, name, format, created_by=None):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('INSERT INTO tournaments (id, name, format, created_by) VALUES (?, ?, ?, ?)',
+                       (tournament_id, name, format, created_by))
+        conn.commit()
+        conn.close()
+    
+    def update_tournament_status(self, tournament_id, status, total_rounds=None):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('UPDATE tournaments SET status = ?, total_rounds = COALESCE(?, total_rounds) WHERE id = ?',
+                       (status, total_rounds, tournament_id))
+        conn.commit()
+        conn.close()
+    
+    def save_tournament_round(self, tournament_id, games, entrants, status, winner_id=None, finished_at=None):
+        """Enregistre une manche complète en une transaction : rencontres, scores et statut du tournoi
+        
+        games : [(tournament_id, round, game_id, player1_id, player2_id, winner_id, result)]
+        entrants : [(tournament_id, user_id, score, eliminated)]
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.executemany('''
+                INSERT INTO tournament_games
+                (tournament_id, round, game_id, player1_id, player2_id, winner_id, result)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', games)
+            cursor.executemany('''
+                INSERT INTO tournament_entrants (tournament_id, user_id, score, eliminated)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (tournament_id, user_id)
+                DO UPDATE SET score = excluded.score, eliminated = excluded.eliminated
+            ''', entrants)
+            cursor.execute('UPDATE tournaments SET status = ?, winner_id = ?, finished_at = ? WHERE id = ?',
+                           (status, winner_id, finished_at, tournament_id))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def find_user(self, username):
+        """Retourne (id, username) d'un utilisateur actif, ou None"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, username FROM users WHERE username = ? AND is_active = 1', (username,))
+        row = cursor.fetchone()
+        conn.close()
+        return row
+    
+    def get_friend_ids(self, user_id):
+        """Identifiants des amis (demandes acceptées, dans les deux sens)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT friend_id FROM friendships WHERE user_id = ? AND status = 'accepted'
+            UNION
+            SELECT user_id FROM friendships WHERE friend_id = ? AND status = 'accepted'
+        ''', (user_id, user_id))
+        ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return ids
+    
+    def get_friendships(self, user_id):
+        """Amis et demandes en cours : [{user_id, username, status, direction}]"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT f.friend_id, u.username, f.status, 'outgoing' FROM friendships f
+            JOIN users u ON u.id = f.friend_id WHERE f.user_id = ?
+            UNION ALL
+            SELECT f.user_id, u.username, f.status, 'incoming' FROM friendships f
+            JOIN users u ON u.id = f.user_id WHERE f.friend_id = ?
+        ''', (user_id, user_id))
+        rows = cursor.fetchall()
+        conn.close()
+        return [{'user_id': row[0], 'username': row[1], 'status': row[2], 'direction': row[3]} for row in rows]
+    
+    def create_friend_request(self, user_id, friend_id):
+        """Crée une demande d'ami ; une demande inverse en attente est acceptée à la place
+        
+        Retourne le statut obtenu ('pending' ou 'accepted'), ou None si le lien existe déjà.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                UPDATE friendships SET status = 'accepted', accepted_at = CURRENT_TIMESTAMP
+                WHERE user_id = ? AND friend_id = ? AND status = 'pending'
+            ''', (friend_id, user_id))
+            if cursor.rowcount:
+                conn.commit()
+                return 'accepted'
+            cursor.execute('''
+                SELECT 1 FROM friendships WHERE (user_id = ? AND friend_id = ?) OR (user_id = ? AND friend_id = ?)
+            ''', (user_id, friend_id, friend_id, user_id))
+            if cursor.fetchone():
+                return None
+            cursor.execute('INSERT INTO friendships (user_id, friend_id) VALUES (?, ?)', (user_id, friend_id))
+            conn.commit()
+            return 'pending'
+        finally:
+            conn.close()
+    
+    def accept_friend_request(self, user_id, requester_id):
+        """Accepte la demande de `requester_id` ; retourne False si aucune demande n'est en attente"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE friendships SET status = 'accepted', accepted_at = CURRENT_TIMESTAMP
+            WHERE user_id = ? AND friend_id = ? AND status = 'pending'
+        ''', (requester_id, user_id))
+        accepted = cursor.rowcount > 0
         conn.commit()
         conn.close()
+        return accepted
+    
+    def delete_friendship(self, user_id, other_id):
+        """Supprime le lien (ami ou demande) entre deux utilisateurs, dans un sens ou dans l'autre"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            DELETE FROM friendships WHERE (user_id = ? AND friend_id = ?) OR (user_id = ? AND friend_id = ?)
+        ''', (user_id, other_id, other_id, user_id))
+        deleted = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return deleted
+    
+    def create_invitation(self, from_user_id, to_user_id, game_id, message, expires_at):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO game_invitations (from_user_id, to_user_id, game_id, message, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (from_user_id, to_user_id, game_id, message, expires_at))
+        invitation_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return invitation_id
+    
+    def get_pending_invitations(self, user_id):
+        """Invitations reçues encore valables"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT i.id, i.from_user_id, u.username, i.game_id, i.message, i.created_at, i.expires_at
+            FROM game_invitations i JOIN users u ON u.id = i.from_user_id
+            WHERE i.to_user_id = ? AND i.status = 'pending' AND i.expires_at > ?
+            ORDER BY i.created_at DESC
+        ''', (user_id, datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')))
+        rows = cursor.fetchall()
+        conn.close()
+        return [{
+            'invitation_id': row[0],
+            'from_user_id': row[1],
+            'from_username': row[2],
+            'game_id': row[3],
+            'message': row[4],
+            'created_at': row[5],
+            'expires_at': row[6]
+        } for row in rows]
+    
+    def answer_invitation(self, invitation_id, to_user_id, status):
+        """Passe une invitation en attente à `status` ; retourne (from_user_id, game_id) ou None"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                SELECT from_user_id, game_id FROM game_invitations
+                WHERE id = ? AND to_user_id = ? AND status = 'pending' AND expires_at > ?
+            ''', (invitation_id, to_user_id, datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            cursor.execute('UPDATE game_invitations SET status = ? WHERE id = ?', (status, invitation_id))
+            conn.commit()
+            return row
+        finally:
+            conn.close()
+    
+    def expire_invitations(self, now=None):
+        """Expire les invitations échues via l'index partiel sur expires_at
+        
+        Retourne [(id, from_user_id, to_user_id, game_id)] des invitations expirées.
+        """
+        now = now or datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                SELECT id, from_user_id, to_user_id, game_id FROM game_invitations
+                WHERE status = 'pending' AND expires_at <= ?
+            ''', (now,))
+            rows = cursor.fetchall()
+            if rows:
+                cursor.executemany("UPDATE game_invitations SET status = 'expired' WHERE id = ?",
+                                   [(row[0],) for row in rows])
+                conn.commit()
+            return rows
+        finally:
+            conn.close()
+    
+    def get_rated_users(self):
+        """Récupère (id, username, rating) des joueurs ayant au moins une partie classée"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, username, rating FROM users
+            WHERE rated_games > 0 AND is_active = 1
+            ORDER BY rating DESC
+        ''')
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return rows
     
     def get_user_game_history(self, user_id, limit=50):
         """Récupère l'historique des parties d'un utilisateur"""
@@ -320,16 +795,32 @@ class Database:
         conn.commit()
         conn.close()
     
+    def save_chat_messages(self, messages):
+        """Sauvegarde un lot de messages de chat en une seule transaction"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT INTO chat_messages 
+            (game_id, sender_id, sender_name, recipient_id, message, is_guest_message, sent_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', messages)
+        
+        conn.commit()
+        conn.close()
+    
     def get_chat_history(self, game_id, limit=100):
-        """Récupère l'historique du chat d'une partie"""
+        """Récupère les `limit` derniers messages du chat d'une partie, du plus ancien au plus récent"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT sender_id, sender_name, recipient_id, message, sent_at, is_guest_message
-            FROM chat_messages 
-            WHERE game_id = ?
-            ORDER BY sent_at ASC LIMIT ?
+            SELECT sender_id, sender_name, recipient_id, message, sent_at, is_guest_message FROM (
+                SELECT id, sender_id, sender_name, recipient_id, message, sent_at, is_guest_message
+                FROM chat_messages 
+                WHERE game_id = ?
+                ORDER BY sent_at DESC, id DESC LIMIT ?
+            ) ORDER BY sent_at ASC, id ASC
         ''', (game_id, limit))
         
         messages = cursor.fetchall()
@@ -344,6 +835,79 @@ class Database:
             'is_guest_message': msg[5]
         } for msg in messages]
     
+    def search_chat(self, query, limit=50, offset=0, order='rank', game_id=None, sender_id=None, prefix=True):
+        """Recherche plein texte dans le chat ; retourne (messages, il en reste d'autres)
+        
+        order='rank' classe par pertinence (bm25), order='recent' par date
+        décroissante (parcours de l'index dans l'ordre des rowid, sans tri).
+        """
+        match = fts_query(query, prefix)
+        if match is None:
+            return [], False
+        
+        filters = ''
+        params = [match]
+        if game_id:
+            filters += ' AND c.game_id = ?'
+            params.append(game_id)
+        if sender_id is not None:
+            filters += ' AND c.sender_id = ?'
+            params.append(sender_id)
+        order_by = 'f.rowid DESC' if order == 'recent' else 'f.rank'
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT c.id, c.game_id, c.sender_id, c.sender_name, c.recipient_id, c.message, c.sent_at,
+                   snippet(chat_messages_fts, 0, '[', ']', '…', 16), f.rank
+            FROM chat_messages_fts f JOIN chat_messages c ON c.id = f.rowid
+            WHERE chat_messages_fts MATCH ?{filters}
+            ORDER BY {order_by} LIMIT ? OFFSET ?
+        ''', params + [limit + 1, offset])
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [{
+            'id': row[0],
+            'game_id': row[1],
+            'sender_id': row[2],
+            'sender_name': row[3],
+            'recipient_id': row[4],
+            'message': row[5],
+            'sent_at': row[6],
+            'snippet': row[7],
+            'score': round(-row[8], 4)
+        } for row in rows[:limit]], len(rows) > limit
+    
+    def search_users(self, query, limit=50, offset=0, prefix=True):
+        """Recherche plein texte des utilisateurs (nom d'abord, puis nom affiché, email, bio)"""
+        match = fts_query(query, prefix)
+        if match is None:
+            return [], False
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT u.id, u.username, u.display_name, u.email, u.is_admin, u.is_active, u.created_at,
+                   bm25(users_fts, 10.0, 5.0, 2.0, 1.0) AS score
+            FROM users_fts f JOIN users u ON u.id = f.rowid
+            WHERE users_fts MATCH ?
+            ORDER BY score LIMIT ? OFFSET ?
+        ''', (match, limit + 1, offset))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [{
+            'id': row[0],
+            'username': row[1],
+            'display_name': row[2],
+            'email': row[3],
+            'is_admin': bool(row[4]),
+            'is_active': bool(row[5]),
+            'created_at': row[6],
+            'score': round(-row[7], 4)
+        } for row in rows[:limit]], len(rows) > limit
+    
     def get_all_users(self, include_inactive=False):
         """Récupère tous les utilisateurs (admin)"""
         conn = self.get_connection()
@@ -380,21 +944,61 @@ class Database:
         } for user in users]
     
     def delete_user(self, user_id):
-        """Supprime un utilisateur (admin)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """Supprime un utilisateur, administrateur compris (admin)"""
+        return self.delete_users([user_id], include_admins=True) > 0
+    
+    def find_user_ids(self, filters):
+        """Sélectionne les ids des comptes non admin correspondant aux filtres (admin)"""
+        clauses = ['is_admin = 0']
+        params = []
         
-        cursor.execute('DELETE FROM chat_messages WHERE sender_id = ? OR recipient_id = ?', (user_id, user_id))
-        cursor.execute('DELETE FROM friendships WHERE user_id = ? OR friend_id = ?', (user_id, user_id))
-        cursor.execute('DELETE FROM game_invitations WHERE sender_id = ? OR recipient_id = ?', (user_id, user_id))
-        cursor.execute('DELETE FROM game_history WHERE player1_id = ? OR player2_id = ?', (user_id, user_id))
-        cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
+        if 'inactive' in filters:
+            clauses.append('is_active = ?')
+            params.append(0 if filters['inactive'] else 1)
+        if filters.get('created_after'):
+            clauses.append('created_at >= ?')
+            params.append(filters['created_after'])
+        if filters.get('created_before'):
+            clauses.append('created_at < ?')
+            params.append(filters['created_before'])
+        if filters.get('username_prefix'):
+            prefix = filters['username_prefix'].replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            clauses.append("username LIKE ? ESCAPE '\\'")
+            params.append(prefix + '%')
+        if filters.get('never_played'):
+            clauses.append('games_played = 0')
+        if filters.get('never_logged_in'):
+            clauses.append('last_login IS NULL')
         
-        conn.commit()
-        affected = cursor.rowcount
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT id FROM users WHERE {" AND ".join(clauses)}', params)
+        ids = [row[0] for row in cursor.fetchall()]
         conn.close()
         
-        return affected > 0
+        return ids
+    
+    def delete_users(self, user_ids, chunk_size=1000, progress=None, include_admins=False):
+        """Supprime des comptes et leurs données en une seule transaction (admin)
+        
+        Sauf include_admins, les comptes administrateurs sont retirés du lot
+        avant toute suppression : ni eux ni leurs données ne sont touchés.
+        """
+        statements = [] if include_admins else [
+            'DELETE FROM bulk_ids WHERE id IN (SELECT id FROM users WHERE is_admin = 1)'
+        ]
+        return self._bulk_delete(user_ids, statements + [
+            'DELETE FROM chat_messages WHERE sender_id IN (SELECT id FROM bulk_ids) '
+            'OR recipient_id IN (SELECT id FROM bulk_ids)',
+            'DELETE FROM friendships WHERE user_id IN (SELECT id FROM bulk_ids) '
+            'OR friend_id IN (SELECT id FROM bulk_ids)',
+            'DELETE FROM game_invitations WHERE from_user_id IN (SELECT id FROM bulk_ids) '
+            'OR to_user_id IN (SELECT id FROM bulk_ids)',
+            *stats_rollup_subtract('player1_id IN (SELECT id FROM bulk_ids) OR player2_id IN (SELECT id FROM bulk_ids)'),
+            'DELETE FROM game_history WHERE player1_id IN (SELECT id FROM bulk_ids) '
+            'OR player2_id IN (SELECT id FROM bulk_ids)',
+            'DELETE FROM users WHERE id IN (SELECT id FROM bulk_ids)'
+        ], chunk_size, progress)
     
     def get_all_games(self, limit=100):
         """Récupère toutes les parties enregistrées (admin)"""
@@ -425,17 +1029,199 @@ class Database:
     
     def delete_game(self, game_id):
         """Supprime une partie de l'historique (admin)"""
+        return self.delete_games([game_id]) > 0
+    
+    def find_game_ids(self, filters):
+        """Sélectionne les identifiants de parties de l'historique correspondant aux filtres (admin)"""
+        clauses = []
+        params = []
+        
+        if filters.get('before'):
+            clauses.append('started_at < ?')
+            params.append(filters['before'])
+        if filters.get('after'):
+            clauses.append('started_at >= ?')
+            params.append(filters['after'])
+        if filters.get('game_mode'):
+            clauses.append('game_mode = ?')
+            params.append(filters['game_mode'])
+        if 'is_guest_game' in filters:
+            clauses.append('is_guest_game = ?')
+            params.append(1 if filters['is_guest_game'] else 0)
+        if filters.get('player_id') is not None:
+            clauses.append('(player1_id = ? OR player2_id = ?)')
+            params.extend([filters['player_id'], filters['player_id']])
+        
+        where = f'WHERE {" AND ".join(clauses)}' if clauses else ''
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.execute(f'SELECT DISTINCT game_id FROM game_history {where}', params)
+        ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
         
-        cursor.execute('DELETE FROM chat_messages WHERE game_id = ?', (game_id,))
-        cursor.execute('DELETE FROM game_history WHERE game_id = ?', (game_id,))
+        return ids
+    
+    def delete_games(self, game_ids, chunk_size=1000, progress=None):
+        """Supprime des parties de l'historique et leur chat en une seule transaction (admin)"""
+        return self._bulk_delete(game_ids, [
+            'DELETE FROM chat_messages WHERE game_id IN (SELECT id FROM bulk_ids)',
+            *stats_rollup_subtract('game_id IN (SELECT id FROM bulk_ids)'),
+            'DELETE FROM game_history WHERE game_id IN (SELECT id FROM bulk_ids)'
+        ], chunk_size, progress)
+    
+    def _bulk_delete(self, ids, statements, chunk_size, progress):
+        """Exécute des suppressions par lots d'identifiants, dans une transaction unique
         
-        conn.commit()
-        affected = cursor.rowcount
+        Les identifiants d'un lot sont chargés par executemany dans une table
+        temporaire : chaque table n'est parcourue qu'une fois par lot au lieu
+        d'une requête par identifiant. Retourne le nombre de lignes supprimées
+        par la dernière requête (la table principale).
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        deleted = 0
+        
+        try:
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS bulk_ids (id PRIMARY KEY) WITHOUT ROWID')
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                cursor.execute('DELETE FROM bulk_ids')
+                cursor.executemany('INSERT OR IGNORE INTO bulk_ids (id) VALUES (?)', [(value,) for value in chunk])
+                for statement in statements:
+                    cursor.execute(statement)
+                deleted += cursor.rowcount
+                if progress:
+                    progress(start + len(chunk))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        return deleted
+    
+    def get_last_game_history_id(self):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM game_history')
+        last_id = cursor.fetchone()[0]
         conn.close()
         
-        return affected > 0
+        return last_id
+    
+    def rebuild_stats(self, chunk_size=10000, progress=None):
+        """Recalcule les agrégats de statistiques depuis l'historique (rattrapage, admin)
+        
+        L'historique est agrégé par tranches d'id dans une table temporaire,
+        chaque tranche dans sa propre transaction de lecture : les parties qui
+        se terminent pendant le calcul ne sont pas bloquées. Seul le
+        remplacement final des agrégats, qui rattrape aussi les parties
+        enregistrées entre-temps, prend le verrou d'écriture. Retourne le
+        nombre de parties agrégées.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        insert = '''
+            INSERT INTO stats_rebuild (day, game_mode, ai_difficulty, games,
+                                       player1_wins, player2_wins, draws, moves_total)
+            {select}
+        ''' + STATS_ROLLUP_MERGE
+        
+        try:
+            cursor.execute('''
+                CREATE TEMP TABLE IF NOT EXISTS stats_rebuild (
+                    day, game_mode, ai_difficulty, games, player1_wins, player2_wins, draws, moves_total,
+                    PRIMARY KEY (day, game_mode, ai_difficulty)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('DELETE FROM stats_rebuild')
+            conn.commit()
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM game_history')
+            last_id = cursor.fetchone()[0]
+            for start in range(0, last_id, chunk_size):
+                cursor.execute(insert.format(select=STATS_ROLLUP_SELECT.format(where='id > ? AND id <= ?')),
+                               (start, start + chunk_size))
+                conn.commit()
+                if progress:
+                    progress(min(start + chunk_size, last_id))
+            
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(insert.format(select=STATS_ROLLUP_SELECT.format(where='id > ?')), (last_id,))
+            cursor.execute('DELETE FROM stats_daily')
+            cursor.execute('INSERT INTO stats_daily SELECT * FROM stats_rebuild')
+            cursor.execute('SELECT COALESCE(SUM(games), 0) FROM stats_daily')
+            games = cursor.fetchone()[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        return games
+    
+    def get_stats(self, since=None, until=None):
+        """Statistiques de jeu lues uniquement dans les agrégats journaliers (admin)
+        
+        Coût proportionnel au nombre de jours x modes x difficultés de la
+        période, indépendant du nombre de parties de l'historique.
+        """
+        clauses = []
+        params = []
+        if since:
+            clauses.append('day >= ?')
+            params.append(since)
+        if until:
+            clauses.append('day <= ?')
+            params.append(until)
+        where = f'WHERE {" AND ".join(clauses)}' if clauses else ''
+        totals = 'SUM(games), SUM(player1_wins), SUM(player2_wins), SUM(draws), SUM(moves_total)'
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT day, {totals} FROM stats_daily {where} GROUP BY day ORDER BY day', params)
+        per_day = cursor.fetchall()
+        cursor.execute(f'SELECT game_mode, {totals} FROM stats_daily {where} GROUP BY game_mode', params)
+        per_mode = cursor.fetchall()
+        ai_where = f'{where} AND' if where else 'WHERE'
+        cursor.execute(f'''
+            SELECT ai_difficulty, {totals} FROM stats_daily
+            {ai_where} game_mode = 'ai' GROUP BY ai_difficulty
+        ''', params)
+        per_difficulty = cursor.fetchall()
+        conn.close()
+        
+        def summary(row):
+            games, player1_wins, player2_wins, draws, moves_total = row
+            decided = player1_wins + player2_wins + draws
+            return {
+                'games': games,
+                'player1_wins': player1_wins,
+                'player2_wins': player2_wins,
+                'draws': draws,
+                'unknown': games - decided,
+                'player1_win_rate': round(player1_wins / decided, 4) if decided else None,
+                'player2_win_rate': round(player2_wins / decided, 4) if decided else None,
+                'draw_rate': round(draws / decided, 4) if decided else None,
+                'avg_moves': round(moves_total / games, 2) if games else None
+            }
+        
+        # En mode IA, le joueur humain occupe la place 1 et l'IA la place 2
+        ai = {}
+        for row in per_difficulty:
+            stats = summary(row[1:])
+            stats['ai_win_rate'] = stats.pop('player2_win_rate')
+            stats['human_win_rate'] = stats.pop('player1_win_rate')
+            ai[row[0] or 'unknown'] = stats
+        
+        return {
+            'per_day': [{'day': row[0], 'games': row[1], 'avg_moves': round(row[5] / row[1], 2) if row[1] else None}
+                        for row in per_day],
+            'per_mode': {row[0]: summary(row[1:]) for row in per_mode},
+            'ai_by_difficulty': ai,
+            'overall': summary([sum(row[i] for row in per_mode) for i in range(1, 6)])
+        }
     
     def toggle_user_admin(self, user_id, is_admin):
         """Active/désactive le statut admin d'un utilisateur"""
@@ -0,0 +1,271 @@
+import os
+import json
+import queue
+import threading
+import time
+import atexit
+from game import Puissance4
+
+SEGMENT_PREFIX = 'events-'
+SEGMENT_SUFFIX = '.log'
+
+
+class GameEventLog:
+    """Journal append-only des événements de partie (reprise après crash)
+
+    Chaque événement (création, place prise, coup, reset, fin, suppression)
+    est une ligne JSON `[horodatage, game_id, type, données]` ajoutée au
+    segment courant par un thread d'écriture unique. Les événements arrivés
+    pendant la fenêtre `EVENT_LOG_FLUSH_MS` sont écrits ensemble et suivis
+    d'un seul fsync (group commit). Un segment est supprimé dès que toutes
+    les parties qu'il mentionne ont disparu ; au redémarrage, les segments
+    sont rejoués puis remplacés par un point de reprise compact (un
+    événement `created` par partie vivante, portant son instantané).
+    """
+
+    def __init__(self, directory=None, segment_bytes=None, flush_interval=None, batch_size=None):
+        self.directory = directory or os.getenv('EVENT_LOG_DIR', 'game_events')
+        self.segment_bytes = segment_bytes or int(os.getenv('EVENT_LOG_SEGMENT_BYTES', 16 * 1024 * 1024))
+        self.flush_interval = flush_interval or float(os.getenv('EVENT_LOG_FLUSH_MS', 20)) / 1000
+        self.batch_size = batch_size or int(os.getenv('EVENT_LOG_BATCH_SIZE', 1000))
+        self.enabled = os.getenv('EVENT_LOG_ENABLED', 'true').lower() == 'true'
+
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._file = None
+        self._segment = 0
+        self._size = 0
+        # Numéro de segment -> parties encore vivantes qui y figurent, et l'inverse
+        self._segments = {}
+        self._game_segments = {}
+        self._done = threading.Condition()
+        self._queued = 0
+        self._handled = 0
+        self.appended_count = 0
+        self.commit_count = 0
+        self.failed_count = 0
+
+    def start(self):
+        """Démarre le thread d'écriture (idempotent)"""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name='event-log-writer', daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def append(self, game_id, kind, data=None):
+        if not self.enabled:
+            return
+        self.start()
+        with self._done:
+            self._queued += 1
+        self._queue.put((round(time.time(), 3), game_id, kind, data))
+
+    def created(self, game_id, game):
+        self.append(game_id, 'created', game.snapshot())
+
+    def seated(self, game_id, number, name, user_id, token):
+        self.append(game_id, 'seat', [number, name, user_id, token])
+
+    def moved(self, game_id, game, col, player):
+        clock = game.clock
+        self.append(game_id, 'move', [col, player] + ([clock.remaining[1], clock.remaining[2]] if clock else []))
+
+    def reset(self, game_id):
+        self.append(game_id, 'reset')
+
+    def ended(self, game_id, winner):
+        self.append(game_id, 'end', winner)
+
+    def removed(self, game_id):
+        self.append(game_id, 'removed')
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        """Écrit et synchronise immédiatement tous les événements en attente"""
+        target = self._queued
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._commit(batch)
+        # Attend aussi le lot déjà dépilé par le thread d'écriture mais pas encore écrit
+        with self._done:
+            self._handled += len(batch)
+            self._done.wait_for(lambda: self._handled >= target)
+
+    def replay(self, games):
+        """Reconstruit les parties à partir des segments ; retourne le nombre de parties restaurées"""
+        if not self.enabled or not os.path.isdir(self.directory):
+            return 0
+
+        restored = {}
+        events = 0
+        for number, path in self._segment_paths():
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        _, game_id, kind, data = json.loads(line)
+                    except ValueError:
+                        # Dernière ligne tronquée par le crash : le reste du segment est perdu
+                        break
+                    self._apply(restored, game_id, kind, data)
+                    events += 1
+
+        for game in restored.values():
+            # La pendule du joueur au trait repart avec le temps qui lui restait au dernier coup
+            if game.clock and not game.game_over and game.clock.running is None \
+                    and (game.moves or len(game.reserved_slots) == 2):
+                game.clock.start(game.current_player)
+
+        games.update(restored)
+        print(f"📼 Journal des parties rejoué : {events} événements, {len(restored)} parties restaurées")
+        return len(restored)
+
+    def checkpoint(self, games):
+        """Remplace tous les segments par un segment neuf contenant l'état des parties vivantes"""
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        old = self._segment_paths()
+        with self._file_lock:
+            self._segments.clear()
+            self._game_segments.clear()
+            self._open_segment((old[-1][0] if old else 0) + 1)
+        self._commit([(round(time.time(), 3), game_id, 'created', game.snapshot())
+                      for game_id, game in list(games.items())])
+        for _, path in old:
+            os.remove(path)
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'directory': self.directory,
+            'segment': self._segment,
+            'segments': len(self._segments),
+            'pending': self.pending(),
+            'appended_total': self.appended_count,
+            'commits_total': self.commit_count,
+            'failed_total': self.failed_count
+        }
+
+    def _apply(self, restored, game_id, kind, data):
+        if kind == 'created':
+            restored[game_id] = Puissance4.from_snapshot(data)
+            return
+        game = restored.get(game_id)
+        if game is None:
+            return
+        if kind == 'seat':
+            number, name, user_id, token = data
+            game.reserved_slots[number] = {'name': name, 'user_id': user_id, 'token': token, 'held': True}
+        elif kind == 'move':
+            col, player = data[0], data[1]
+            game.drop_piece(col, player)
+            game.current_player = 3 - player
+            if game.clock and len(data) == 4:
+                game.clock.remaining = {1: data[2], 2: data[3]}
+        elif kind == 'reset':
+            game.reset_game()
+        elif kind == 'end':
+            game.game_over = True
+            game.winner = data
+            game.update_score(data)
+            game.result_saved = True
+            if game.clock:
+                game.clock.stop()
+        elif kind == 'removed':
+            del restored[game_id]
+
+    def _segment_paths(self):
+        if not os.path.isdir(self.directory):
+            return []
+        numbers = sorted(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) for name in os.listdir(self.directory)
+                         if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX))
+        return [(number, self._segment_path(number)) for number in numbers]
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f'{SEGMENT_PREFIX}{number:08d}{SEGMENT_SUFFIX}')
+
+    def _open_segment(self, number):
+        if self._file is not None:
+            self._file.close()
+            if not self._segments.get(self._segment):
+                self._drop_segment(self._segment)
+        self._segment = number
+        self._segments[number] = set()
+        self._file = open(self._segment_path(number), 'ab')
+        self._size = self._file.tell()
+
+    def _drop_segment(self, number):
+        self._segments.pop(number, None)
+        try:
+            os.remove(self._segment_path(number))
+        except OSError:
+            pass
+
+    def _track(self, game_id, kind):
+        if kind == 'removed':
+            for number in self._game_segments.pop(game_id, ()):
+                live = self._segments.get(number)
+                if live is None:
+                    continue
+                live.discard(game_id)
+                if not live and number != self._segment:
+                    self._drop_segment(number)
+        else:
+            self._segments[self._segment].add(game_id)
+            self._game_segments.setdefault(game_id, set()).add(self._segment)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Regroupe les événements arrivés pendant la fenêtre de commit
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._commit(batch)
+            with self._done:
+                self._handled += len(batch)
+                self._done.notify_all()
+
+    def _commit(self, batch):
+        if not batch:
+            return
+        with self._file_lock:
+            try:
+                if self._file is None:
+                    os.makedirs(self.directory, exist_ok=True)
+                    paths = self._segment_paths()
+                    self._open_segment((paths[-1][0] if paths else 0) + 1)
+                elif self._size >= self.segment_bytes:
+                    self._open_segment(self._segment + 1)
+
+                payload = ''.join(json.dumps(event, separators=(',', ':')) + '\n' for event in batch).encode('utf-8')
+                self._file.write(payload)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._size += len(payload)
+                for _, game_id, kind, _ in batch:
+                    self._track(game_id, kind)
+                self.appended_count += len(batch)
+                self.commit_count += 1
+            except (OSError, TypeError, ValueError) as e:
+                self.failed_count += len(batch)
+                print(f"⚠️  Erreur d'écriture du journal des parties ({len(batch)} événements) : {e}")
+
+
+# Instance globale du journal des parties
+game_log = GameEventLog()
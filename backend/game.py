@@ -0,0 +1,212 @@
+import secrets
+from itertools import product
+from ai import PuissanceAI
+from clock import GameClock
+
+# Décodage des lignes d'un instantané : les 3^7 lignes possibles sont précalculées
+_ROWS = {''.join(cells): tuple(int(cell) for cell in cells) for cells in product('012', repeat=7)}
+
+class Puissance4:
+    def __init__(self, ai_enabled=False, difficulty='medium'):
+        self.rows = 6
+        self.cols = 7
+        self.board = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
+        self.current_player = 1
+        self.players = {}
+        self.spectators = {}
+        self.game_over = False
+        self.winner = None
+        self.ai_enabled = ai_enabled
+        self.ai = PuissanceAI(difficulty) if ai_enabled else None
+        self.global_score = {'player1': 0, 'player2': 0, 'draws': 0}
+        self.result_saved = False
+        self.reserved_slots = {}
+        # Coups de la manche en cours, envoyés d'un bloc aux spectateurs qui arrivent
+        self.moves = []
+        # Pendule des parties multijoueur (None : pas de contrôle du temps)
+        self.clock = None if ai_enabled else GameClock.from_env()
+        
+    def drop_piece(self, col, player):
+        if col < 0 or col >= self.cols or self.game_over:
+            return False
+        
+        for row in range(self.rows - 1, -1, -1):
+            if self.board[row][col] == 0:
+                self.board[row][col] = player
+                self.moves.append({'player': player, 'column': col, 'row': row})
+                return True
+        return False
+    
+    def check_winner(self):
+        for row in range(self.rows):
+            for col in range(self.cols - 3):
+                if self.board[row][col] != 0 and \
+                   self.board[row][col] == self.board[row][col+1] == \
+                   self.board[row][col+2] == self.board[row][col+3]:
+                    return self.board[row][col]
+        
+        for row in range(self.rows - 3):
+            for col in range(self.cols):
+                if self.board[row][col] != 0 and \
+                   self.board[row][col] == self.board[row+1][col] == \
+                   self.board[row+2][col] == self.board[row+3][col]:
+                    return self.board[row][col]
+        
+        for row in range(self.rows - 3):
+            for col in range(self.cols - 3):
+                if self.board[row][col] != 0 and \
+                   self.board[row][col] == self.board[row+1][col+1] == \
+                   self.board[row+2][col+2] == self.board[row+3][col+3]:
+                    return self.board[row][col]
+        
+        for row in range(3, self.rows):
+            for col in range(self.cols - 3):
+                if self.board[row][col] != 0 and \
+                   self.board[row][col] == self.board[row-1][col+1] == \
+                   self.board[row-2][col+2] == self.board[row-3][col+3]:
+                    return self.board[row][col]
+        
+        return None
+    
+    def is_board_full(self):
+        return all(self.board[0][col] != 0 for col in range(self.cols))
+    
+    def reset_game(self):
+        self.board = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
+        self.current_player = 1
+        self.game_over = False
+        self.winner = None
+        self.result_saved = False
+        self.moves = []
+        if self.clock:
+            self.clock.reset()
+    
+    def to_dict(self):
+        return {
+            'board': self.board,
+            'current_player': self.current_player,
+            # Les jetons de reprise ne sont communiqués qu'à leur titulaire
+            'players': {sid: {key: value for key, value in player.items() if key != 'token'}
+                        for sid, player in self.players.items()},
+            'spectators': self.spectators,
+            'game_over': self.game_over,
+            'winner': self.winner,
+            'ai_enabled': self.ai_enabled,
+            'global_score': self.global_score,
+            'clock': self.clock.to_dict() if self.clock else None
+        }
+    
+    def update_score(self, winner):
+        """Met à jour le score global après une victoire"""
+        if winner == 1:
+            self.global_score['player1'] += 1
+        elif winner == 2:
+            self.global_score['player2'] += 1
+        elif winner == 0:
+            self.global_score['draws'] += 1
+    
+    def reserve_slot(self, number, name, user_id=None):
+        """Réserve une place pour un joueur attendu ; retourne le jeton de réclamation"""
+        token = secrets.token_urlsafe(16)
+        self.reserved_slots[number] = {'name': name, 'user_id': user_id, 'token': token}
+        return token
+    
+    def claim_slot(self, user_id=None, token=None):
+        """Attribue une place réservée correspondant au jeton ou à l'utilisateur"""
+        for number, slot in list(self.reserved_slots.items()):
+            if (token and slot['token'] == token) or (user_id is not None and slot['user_id'] == user_id):
+                del self.reserved_slots[number]
+                return number
+        return None
+    
+    def hold_slot(self, sid):
+        """Retire un joueur déconnecté en gardant sa place pour une reprise ; retourne (numéro, jeton)"""
+        player = self.players.get(sid)
+        if player is None:
+            return None, None
+        token = self.session_token(sid)
+        del self.players[sid]
+        self.reserved_slots[player['number']] = {
+            'name': player['name'], 'user_id': player.get('user_id'), 'token': token, 'held': True
+        }
+        return player['number'], token
+    
+    def resume_slot(self, user_id=None, token=None):
+        """Comme claim_slot, mais seulement pour une place gardée après une déconnexion"""
+        for number, slot in list(self.reserved_slots.items()):
+            if not slot.get('held'):
+                continue
+            if (token and slot['token'] == token) or (user_id is not None and slot['user_id'] == user_id):
+                del self.reserved_slots[number]
+                return number
+        return None
+    
+    def free_slot_number(self):
+        """Retourne la première place ni occupée ni réservée, ou None"""
+        taken = {player['number'] for player in self.players.values()}
+        for number in (1, 2):
+            if number not in taken and number not in self.reserved_slots:
+                return number
+        return None
+    
+    def session_token(self, sid):
+        """Retourne le jeton de reprise de la place occupée par ce sid (créé au besoin)"""
+        player = self.players.get(sid)
+        if player is None:
+            return None
+        if not player.get('token'):
+            player['token'] = secrets.token_urlsafe(16)
+        return player['token']
+    
+    def snapshot(self):
+        """Sérialise l'état de la partie sous forme compacte (liste JSON)
+        
+        Les joueurs connectés deviennent des places réservées : leur sid ne
+        survit pas au redémarrage, ils réclament leur place avec leur jeton.
+        """
+        seats = [[p['number'], p['name'], p.get('user_id'), p.get('token')] for p in self.players.values()]
+        seats.extend([number, slot['name'], slot['user_id'], slot['token']]
+                     for number, slot in self.reserved_slots.items())
+        return [
+            ''.join([str(cell) for row in self.board for cell in row]),
+            self.current_player,
+            self.game_over,
+            self.winner,
+            self.ai.difficulty if self.ai_enabled else None,
+            [self.global_score['player1'], self.global_score['player2'], self.global_score['draws']],
+            seats,
+            self.result_saved,
+            self.clock.snapshot() if self.clock else None,
+            ''.join(str(move['column']) for move in self.moves)
+        ]
+    
+    @classmethod
+    def from_snapshot(cls, data):
+        """Reconstruit une partie à partir de snapshot()"""
+        cells, current_player, game_over, winner, difficulty, score, seats, result_saved = data[:8]
+        game = cls(ai_enabled=difficulty is not None, difficulty=difficulty or 'medium')
+        game.board = [list(_ROWS[cells[start:start + game.cols]])
+                      for start in range(0, game.rows * game.cols, game.cols)]
+        game.current_player = current_player
+        game.game_over = game_over
+        game.winner = winner
+        game.global_score = {'player1': score[0], 'player2': score[1], 'draws': score[2]}
+        game.result_saved = result_saved
+        clock = data[8] if len(data) > 8 else None
+        game.clock = GameClock.from_snapshot(clock) if clock else None
+        # Les joueurs alternent depuis le joueur 1 : seules les colonnes sont gardées
+        rows_used = [game.rows] * game.cols
+        for index, col in enumerate(data[9] if len(data) > 9 else ''):
+            col = int(col)
+            rows_used[col] -= 1
+            game.moves.append({'player': index % 2 + 1, 'column': col, 'row': rows_used[col]})
+        for number, name, user_id, token in seats:
+            game.reserved_slots[number] = {'name': name, 'user_id': user_id, 'token': token, 'held': True}
+        return game
+    
+    def get_player(self, number):
+        """Retourne le joueur occupant la place donnée, ou None"""
+        for player in self.players.values():
+            if player['number'] == number:
+                return player
+        return None
@@ -0,0 +1,135 @@
+import os
+import hmac
+import hashlib
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from profiling import tracer
+
+LEGACY_ITERATIONS = 100000
+
+
+class HasherBusy(Exception):
+    """Levée quand trop de calculs de hash sont déjà en cours"""
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations).hex()
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+                          maxmem=256 * n * r + 1024 * 1024).hex()
+
+
+class PasswordHasher:
+    """Hachage des mots de passe exécuté hors du thread de requête
+
+    Formats stockés :
+    - `salt:hash` (historique, PBKDF2-SHA256 à 100 000 itérations)
+    - `pbkdf2_sha256$iterations$salt$hash`
+    - `scrypt$n$r$p$salt$hash` (opt-in via PASSWORD_HASH_SCHEME=scrypt)
+    """
+
+    def __init__(self):
+        self.scheme = os.getenv('PASSWORD_HASH_SCHEME', 'pbkdf2_sha256')
+        self.iterations = int(os.getenv('PASSWORD_HASH_ITERATIONS', LEGACY_ITERATIONS))
+        self.scrypt_n = int(os.getenv('PASSWORD_SCRYPT_N', 2 ** 14))
+        self.scrypt_r = int(os.getenv('PASSWORD_SCRYPT_R', 8))
+        self.scrypt_p = int(os.getenv('PASSWORD_SCRYPT_P', 1))
+        self.rehash_on_login = os.getenv('PASSWORD_REHASH_ON_LOGIN', 'true').lower() == 'true'
+
+        workers = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+        self.max_pending = int(os.getenv('LOGIN_MAX_CONCURRENCY', 16))
+        self.wait_timeout = float(os.getenv('LOGIN_QUEUE_TIMEOUT', 2))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self.rejected = 0
+
+    @tracer.traced('hasher.hash')
+    def hash(self, password):
+        """Hash un mot de passe avec le schéma configuré"""
+        return self._hash_with(self._run, password)
+
+    def rehash_in_background(self, password, on_done):
+        """Recalcule le hash au schéma configuré sans bloquer l'appelant, puis appelle on_done(hash)
+
+        Abandonné (retourne False) si le pool est saturé : la migration sera
+        retentée à la prochaine connexion, sans jamais faire échouer celle-ci.
+        """
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._pending_lock:
+            self._pending += 1
+
+        def work():
+            try:
+                on_done(self._hash_with(lambda fn, *args: fn(*args), password))
+            except Exception as e:
+                print(f"⚠️  Migration du hash de mot de passe impossible : {e}")
+            finally:
+                with self._pending_lock:
+                    self._pending -= 1
+                self._slots.release()
+
+        self._executor.submit(work)
+        return True
+
+    @tracer.traced('hasher.verify')
+    def verify(self, password, hashed):
+        """Vérifie un mot de passe quel que soit le format stocké"""
+        try:
+            if hashed.startswith('scrypt$'):
+                _, n, r, p, salt, expected = hashed.split('$')
+                digest = self._run(_scrypt, password, salt, int(n), int(r), int(p))
+            elif hashed.startswith('pbkdf2_sha256$'):
+                _, iterations, salt, expected = hashed.split('$')
+                digest = self._run(_pbkdf2, password, salt, int(iterations))
+            else:
+                salt, expected = hashed.split(':')
+                digest = self._run(_pbkdf2, password, salt, LEGACY_ITERATIONS)
+        except (ValueError, AttributeError):
+            return False
+
+        return hmac.compare_digest(digest, expected)
+
+    def needs_rehash(self, hashed):
+        """Indique si le hash stocké ne correspond plus à la configuration actuelle"""
+        if not self.rehash_on_login:
+            return False
+        if self.scheme == 'scrypt':
+            return not hashed.startswith(f"scrypt${self.scrypt_n}${self.scrypt_r}${self.scrypt_p}$")
+        return not hashed.startswith(f"pbkdf2_sha256${self.iterations}$")
+
+    def pending(self):
+        return self._pending
+
+    def _hash_with(self, run, password):
+        salt = secrets.token_hex(16)
+        if self.scheme == 'scrypt':
+            n, r, p = self.scrypt_n, self.scrypt_r, self.scrypt_p
+            digest = run(_scrypt, password, salt, n, r, p)
+            return f"scrypt${n}${r}${p}${salt}${digest}"
+
+        digest = run(_pbkdf2, password, salt, self.iterations)
+        return f"pbkdf2_sha256${self.iterations}${salt}${digest}"
+
+    def _run(self, fn, *args):
+        """Exécute le calcul dans le pool borné ; refuse s'il y a trop d'attente"""
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            self.rejected += 1
+            raise HasherBusy()
+        with self._pending_lock:
+            self._pending += 1
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+            self._slots.release()
+
+
+# Instance globale du hacheur de mots de passe
+password_hasher = PasswordHasher()
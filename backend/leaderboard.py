@@ -0,0 +1,104 @@
+import bisect
+import threading
+
+DEFAULT_RATING = 1200
+
+
+def elo_update(rating_a, rating_b, score_a, games_a=0, games_b=0):
+    """Calcule les nouveaux classements Elo après une partie (score_a : 1, 0.5 ou 0)"""
+    expected_a = 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
+    # Facteur K plus élevé tant que le classement est provisoire
+    k_a = 40 if games_a < 30 else 20
+    k_b = 40 if games_b < 30 else 20
+    new_a = rating_a + k_a * (score_a - expected_a)
+    new_b = rating_b + k_b * ((1 - score_a) - (1 - expected_a))
+    return round(new_a, 1), round(new_b, 1)
+
+
+class Leaderboard:
+    """Classement en mémoire maintenu sous forme d'index trié
+
+    Les clés (-classement, user_id) sont gardées triées : le rang d'un joueur
+    s'obtient par bisection et le top N par découpage, sans trier la table
+    `users`. Les classements étant persistés à chaque résultat, l'index est
+    reconstruit au démarrage par une seule lecture de la colonne indexée.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def ensure_loaded(self):
+        if self._loaded:
+            return
+        from database import db
+
+        rows = db.get_rated_users()
+        with self._lock:
+            if self._loaded:
+                return
+            for user_id, username, rating in rows:
+                self._entries[user_id] = (rating, username)
+            self._keys = sorted((-rating, user_id) for user_id, (rating, _) in self._entries.items())
+            self._loaded = True
+
+    def update(self, user_id, rating, username=None):
+        self.ensure_loaded()
+        with self._lock:
+            previous = self._entries.get(user_id)
+            if previous is not None:
+                self._remove_key((-previous[0], user_id))
+                username = username or previous[1]
+            self._entries[user_id] = (rating, username)
+            bisect.insort(self._keys, (-rating, user_id))
+
+    def remove(self, user_id):
+        self.ensure_loaded()
+        with self._lock:
+            previous = self._entries.pop(user_id, None)
+            if previous is not None:
+                self._remove_key((-previous[0], user_id))
+
+    def get_rating(self, user_id):
+        self.ensure_loaded()
+        entry = self._entries.get(user_id)
+        return entry[0] if entry else DEFAULT_RATING
+
+    def rank(self, user_id):
+        """Retourne le rang (à partir de 1) d'un joueur classé, ou None"""
+        self.ensure_loaded()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            # Les ex aequo partagent le meilleur rang
+            return bisect.bisect_left(self._keys, (-entry[0],)) + 1
+
+    def top(self, limit=10, offset=0):
+        self.ensure_loaded()
+        with self._lock:
+            keys = self._keys[offset:offset + limit]
+            result = []
+            for negative_rating, user_id in keys:
+                result.append({
+                    'rank': bisect.bisect_left(self._keys, (negative_rating,)) + 1,
+                    'user_id': user_id,
+                    'username': self._entries[user_id][1],
+                    'rating': -negative_rating
+                })
+            return result
+
+    def __len__(self):
+        self.ensure_loaded()
+        return len(self._keys)
+
+    def _remove_key(self, key):
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+
+
+# Instance globale du classement
+leaderboard = Leaderboard()
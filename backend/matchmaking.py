@@ -0,0 +1,168 @@
+import os
+import bisect
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from leaderboard import DEFAULT_RATING
+
+
+class QueueEntry:
+    __slots__ = ('sid', 'user_id', 'name', 'rating', 'enqueued_at', 'key')
+
+    def __init__(self, sid, user_id, name, rating, enqueued_at, key):
+        self.sid = sid
+        self.user_id = user_id
+        self.name = name
+        self.rating = rating
+        self.enqueued_at = enqueued_at
+        self.key = key
+
+
+class MatchmakingQueue:
+    """File d'attente de matchmaking appariant les joueurs par tranche de classement
+
+    Les joueurs sont gardés triés par classement. Deux voisins deviennent
+    appariables quand leur écart tient dans la tranche du joueur qui attend
+    depuis le plus longtemps ; cette tranche s'élargit avec l'attente. Pour
+    chaque paire de voisins, l'instant où elle devient appariable est calculé
+    une fois et placé dans un tas : le tick ne dépile que les paires prêtes.
+    La position d'un joueur est trouvée par bisection en O(log n) ; son
+    insertion ou son retrait de la liste triée décale les éléments suivants,
+    en O(n) (un memmove, négligeable aux tailles de file attendues).
+    Un compte authentifié n'a qu'une entrée, quel que soit son nombre de sessions.
+    """
+
+    def __init__(self, base_band=None, widen_rate=None, max_band=None):
+        self.base_band = base_band or float(os.getenv('MATCHMAKING_BASE_BAND', 50))
+        self.widen_rate = widen_rate or float(os.getenv('MATCHMAKING_BAND_WIDEN_PER_SECOND', 10))
+        self.max_band = max_band or float(os.getenv('MATCHMAKING_MAX_BAND', 400))
+
+        self._sorted = []              # clés (classement, séquence) triées
+        self._by_key = {}              # clé -> QueueEntry
+        self._by_sid = OrderedDict()   # sid -> QueueEntry, dans l'ordre d'arrivée
+        self._by_user = {}             # user_id -> QueueEntry (comptes authentifiés)
+        self._candidates = []          # tas (prêt_à, clé_a, clé_b) de voisins
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+        self.matches_made = 0
+        self.total_wait_matched = 0.0
+        self.max_wait_matched = 0.0
+
+    def band(self, entry, now):
+        """Écart de classement toléré pour un joueur après son temps d'attente"""
+        return min(self.max_band, self.base_band + self.widen_rate * (now - entry.enqueued_at))
+
+    def enqueue(self, sid, rating=DEFAULT_RATING, user_id=None, name=None, now=None):
+        """Ajoute un joueur et retourne les paires immédiatement formées
+
+        Retourne None si le compte est déjà en file depuis une autre session.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if sid in self._by_sid:
+                return []
+            if user_id is not None and user_id in self._by_user:
+                return None
+
+            key = (rating, next(self._seq))
+            entry = QueueEntry(sid, user_id, name, rating, now, key)
+            index = bisect.bisect_left(self._sorted, key)
+            self._sorted.insert(index, key)
+            self._by_key[key] = entry
+            self._by_sid[sid] = entry
+            if user_id is not None:
+                self._by_user[user_id] = entry
+
+            if index > 0:
+                self._push_candidate(self._sorted[index - 1], key)
+            if index + 1 < len(self._sorted):
+                self._push_candidate(key, self._sorted[index + 1])
+
+            return self._pop_ready(now)
+
+    def remove(self, sid):
+        """Retire un joueur de la file (départ volontaire ou déconnexion)"""
+        with self._lock:
+            entry = self._by_sid.get(sid)
+            if entry is None:
+                return False
+            self._unlink(entry)
+            return True
+
+    def tick(self, now=None):
+        """Retourne les paires devenues appariables depuis le dernier tick"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return self._pop_ready(now)
+
+    def __contains__(self, sid):
+        return sid in self._by_sid
+
+    def __len__(self):
+        return len(self._by_sid)
+
+    def stats(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            oldest = next(iter(self._by_sid.values()), None)
+            return {
+                'queue_depth': len(self._by_sid),
+                'oldest_wait_seconds': round(now - oldest.enqueued_at, 3) if oldest else 0.0,
+                'matches_made': self.matches_made,
+                'avg_wait_seconds': round(self.total_wait_matched / (2 * self.matches_made), 3)
+                                    if self.matches_made else 0.0,
+                'max_wait_seconds': round(self.max_wait_matched, 3),
+                'pending_candidates': len(self._candidates)
+            }
+
+    def _push_candidate(self, left_key, right_key):
+        left, right = self._by_key[left_key], self._by_key[right_key]
+        gap = right.rating - left.rating
+        if gap > self.max_band:
+            return
+        earliest = min(left.enqueued_at, right.enqueued_at)
+        ready_at = earliest + max(0.0, gap - self.base_band) / self.widen_rate
+        heapq.heappush(self._candidates, (max(ready_at, left.enqueued_at, right.enqueued_at),
+                                          left_key, right_key))
+
+    def _unlink(self, entry):
+        index = bisect.bisect_left(self._sorted, entry.key)
+        del self._sorted[index]
+        del self._by_key[entry.key]
+        del self._by_sid[entry.sid]
+        if entry.user_id is not None:
+            del self._by_user[entry.user_id]
+        if 0 < index < len(self._sorted):
+            self._push_candidate(self._sorted[index - 1], self._sorted[index])
+
+    def _pop_ready(self, now):
+        pairs = []
+        while self._candidates and self._candidates[0][0] <= now:
+            _, left_key, right_key = heapq.heappop(self._candidates)
+            left = self._by_key.get(left_key)
+            right = self._by_key.get(right_key)
+            if left is None or right is None:
+                continue
+
+            # Les candidats périmés (paire qui n'est plus voisine) sont ignorés
+            index = bisect.bisect_left(self._sorted, left_key)
+            if index + 1 >= len(self._sorted) or self._sorted[index + 1] != right_key:
+                continue
+
+            self._unlink(right)
+            self._unlink(left)
+
+            for entry in (left, right):
+                wait = now - entry.enqueued_at
+                self.total_wait_matched += wait
+                self.max_wait_matched = max(self.max_wait_matched, wait)
+            self.matches_made += 1
+            pairs.append((left, right))
+        return pairs
+
+
+# Instance globale de la file de matchmaking
+matchmaking_queue = MatchmakingQueue()
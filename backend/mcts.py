@@ -0,0 +1,189 @@
+import os
+import math
+import time
+import numpy as np
+
+ROWS, COLS = 6, 7
+
+
+def _four_in_a_row(stones):
+    """Pour un lot de masques (N, 6, 7) : indique lesquels contiennent 4 pions alignés"""
+    horizontal = stones[:, :, :-3] & stones[:, :, 1:-2] & stones[:, :, 2:-1] & stones[:, :, 3:]
+    vertical = stones[:, :-3, :] & stones[:, 1:-2, :] & stones[:, 2:-1, :] & stones[:, 3:, :]
+    diagonal = stones[:, :-3, :-3] & stones[:, 1:-2, 1:-2] & stones[:, 2:-1, 2:-1] & stones[:, 3:, 3:]
+    anti_diagonal = stones[:, 3:, :-3] & stones[:, 2:-1, 1:-2] & stones[:, 1:-2, 2:-1] & stones[:, :-3, 3:]
+    return (horizontal.any(axis=(1, 2)) | vertical.any(axis=(1, 2))
+            | diagonal.any(axis=(1, 2)) | anti_diagonal.any(axis=(1, 2)))
+
+
+def random_playouts(boards, to_move, rng):
+    """Joue une partie aléatoire depuis chacun des plateaux (N, 6, 7) en un seul lot vectorisé
+
+    Tous les plateaux avancent d'un demi-coup par itération ; seuls ceux
+    encore en jeu sont touchés. Retourne le gagnant de chaque partie (0 = nul).
+    """
+    boards = boards.copy()
+    heights = (boards != 0).sum(axis=1)
+    winners = np.zeros(len(boards), dtype=np.int8)
+    active = np.arange(len(boards))
+    player = to_move
+
+    while active.size:
+        legal = heights[active] < ROWS
+        scores = rng.random((active.size, COLS))
+        scores[~legal] = -1.0
+        cols = scores.argmax(axis=1)
+        rows = ROWS - 1 - heights[active, cols]
+        boards[active, rows, cols] = player
+        heights[active, cols] += 1
+
+        won = _four_in_a_row(boards[active] == player)
+        winners[active[won]] = player
+        full = (heights[active] == ROWS).all(axis=1)
+        active = active[~(won | full)]
+        player = 3 - player
+
+    return winners
+
+
+class _Node:
+    __slots__ = ('board', 'to_move', 'parent', 'move', 'children', 'untried', 'visits', 'wins', 'winner')
+
+    def __init__(self, board, to_move, parent=None, move=None, winner=0):
+        self.board = board
+        self.to_move = to_move
+        self.parent = parent
+        self.move = move
+        self.children = []
+        self.winner = winner
+        full = bool((board[0] != 0).all())
+        self.untried = [] if winner or full else [col for col in range(COLS) if board[0, col] == 0]
+        self.visits = 0
+        # Points (victoire 1, nul 0,5) du joueur qui vient de jouer pour arriver ici
+        self.wins = 0.0
+
+    @property
+    def terminal(self):
+        return not self.untried and not self.children
+
+    def child_for(self, col):
+        board = self.board.copy()
+        row = ROWS - 1 - int((board[:, col] != 0).sum())
+        board[row, col] = self.to_move
+        winner = self.to_move if _four_in_a_row(board[np.newaxis] == self.to_move)[0] else 0
+        return _Node(board, 3 - self.to_move, self, col, winner)
+
+
+class MCTSSearch:
+    """Recherche Monte Carlo (UCT) à budget de temps, réutilisée d'un coup à l'autre
+
+    Chaque itération sélectionne plusieurs feuilles (avec perte virtuelle
+    pour les diversifier), puis joue toutes leurs parties aléatoires dans un
+    seul lot NumPy. Le budget est en temps (AI_MCTS_BUDGET_MS) avec un
+    plafond de parties (AI_MCTS_MAX_PLAYOUTS) : sous charge, l'IA joue
+    moins de parties et reste juste un peu moins forte. L'arbre est gardé
+    entre deux coups d'une même partie : le sous-arbre de la position
+    atteinte devient la nouvelle racine.
+    """
+
+    def __init__(self, budget_ms=None, max_playouts=None, leaves_per_batch=None, playouts_per_leaf=None,
+                 exploration=None, seed=None):
+        self.budget_ms = budget_ms or float(os.getenv('AI_MCTS_BUDGET_MS', 500))
+        self.max_playouts = max_playouts or int(os.getenv('AI_MCTS_MAX_PLAYOUTS', 200000))
+        self.leaves_per_batch = leaves_per_batch or int(os.getenv('AI_MCTS_LEAVES_PER_BATCH', 8))
+        self.playouts_per_leaf = playouts_per_leaf or int(os.getenv('AI_MCTS_PLAYOUTS_PER_LEAF', 32))
+        self.exploration = exploration or float(os.getenv('AI_MCTS_EXPLORATION', 1.4))
+        self.rng = np.random.default_rng(seed)
+        self.root = None
+        self.playouts = 0
+        self.reused_visits = 0
+
+    def get_move(self, board, player):
+        """Retourne la colonne la plus visitée après le budget de recherche"""
+        position = np.array(board, dtype=np.int8)
+        self.root = self._reuse(position, player) or _Node(position, player)
+        self.root.parent = None
+        self.reused_visits = self.root.visits
+        if self.root.terminal:
+            return None
+
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        self.playouts = 0
+        while self.playouts < self.max_playouts and time.perf_counter() < deadline:
+            self._iterate()
+
+        best = max(self.root.children, key=lambda child: child.visits)
+        return best.move
+
+    def _reuse(self, position, player):
+        """Cherche la position parmi les enfants et petits-enfants de l'ancienne racine"""
+        if self.root is None:
+            return None
+        frontier = [self.root]
+        for _ in range(2):
+            frontier = [child for node in frontier for child in node.children]
+            for node in frontier:
+                if node.to_move == player and np.array_equal(node.board, position):
+                    return node
+        return None
+
+    def _iterate(self):
+        leaves = []
+        for _ in range(self.leaves_per_batch):
+            node = self._select()
+            if node.untried:
+                node = self._expand(node)
+            # Perte virtuelle : la feuille compte déjà ses parties, sans points
+            walker = node
+            while walker is not None:
+                walker.visits += self.playouts_per_leaf
+                walker = walker.parent
+            leaves.append(node)
+
+        # Un lot par joueur au trait : toutes les parties d'un lot alternent au même rythme
+        per_leaf = self.playouts_per_leaf
+        by_player = {}
+        for node in leaves:
+            if not node.terminal:
+                by_player.setdefault(node.to_move, []).append(node)
+        results = {}
+        for to_move, nodes in by_player.items():
+            boards = np.repeat(np.stack([node.board for node in nodes]), per_leaf, axis=0)
+            winners = random_playouts(boards, to_move, self.rng).reshape(len(nodes), per_leaf)
+            for node, node_winners in zip(nodes, winners):
+                results[id(node)] = node_winners
+
+        for node in leaves:
+            if node.terminal:
+                self._backpropagate(node, np.full(per_leaf, node.winner, dtype=np.int8))
+            else:
+                self._backpropagate(node, results[id(node)])
+        self.playouts += len(leaves) * per_leaf
+
+    def _select(self):
+        node = self.root
+        log = math.log
+        sqrt = math.sqrt
+        while not node.untried and node.children:
+            log_visits = log(node.visits)
+            node = max(node.children, key=lambda child: (
+                child.wins / child.visits + self.exploration * sqrt(log_visits / child.visits)
+            ))
+        return node
+
+    def _expand(self, node):
+        col = node.untried.pop(self.rng.integers(len(node.untried)))
+        child = node.child_for(col)
+        node.children.append(child)
+        return child
+
+    def _backpropagate(self, node, winners):
+        draws = int((winners == 0).sum())
+        points = {
+            1: int((winners == 1).sum()) + draws * 0.5,
+            2: int((winners == 2).sum()) + draws * 0.5
+        }
+        while node is not None:
+            # Les visites ont déjà été comptées par la perte virtuelle
+            node.wins += points[3 - node.to_move]
+            node = node.parent
@@ -0,0 +1,196 @@
+import bisect
+import threading
+import time
+from functools import wraps
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    """Compteur monotone, éventuellement étiqueté"""
+
+    kind = 'counter'
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in values.items():
+            yield self.name, _format_labels(self.labels, label_values), value
+
+
+class Histogram:
+    """Histogramme à seaux fixes ; une observation = une bisection + une section critique courte"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *label_values):
+        return _Timer(self, label_values)
+
+    def timed(self, *label_values):
+        """Décorateur mesurant la durée d'exécution de la fonction"""
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return f(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, *label_values)
+            return wrapper
+        return decorator
+
+    def samples(self):
+        with self._lock:
+            series = {labels: ([*counts], total, count) for labels, (counts, total, count) in self._series.items()}
+        for label_values, (counts, total, count) in series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield f'{self.name}_bucket', _format_labels(self.labels, label_values, [('le', le)]), cumulative
+            yield f'{self.name}_sum', _format_labels(self.labels, label_values), total
+            yield f'{self.name}_count', _format_labels(self.labels, label_values), count
+
+
+class CallbackGauge:
+    """Jauge évaluée uniquement au moment de la collecte (aucun coût sur le chemin critique)
+
+    La fonction retourne un nombre, ou un dict {tuple d'étiquettes: valeur}.
+    `kind='counter'` expose une valeur monotone déjà comptée ailleurs.
+    """
+
+    def __init__(self, name, description, fn, labels=(), kind='gauge'):
+        self.kind = kind
+        self.name = name
+        self.description = description
+        self.fn = fn
+        self.labels = tuple(labels)
+
+    def samples(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return
+        if isinstance(value, dict):
+            for label_values, sample in value.items():
+                if not isinstance(label_values, tuple):
+                    label_values = (label_values,)
+                yield self.name, _format_labels(self.labels, label_values), sample
+        else:
+            yield self.name, '', value
+
+
+class _Timer:
+    __slots__ = ('histogram', 'label_values', 'start')
+
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.label_values)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and not isinstance(metric, CallbackGauge):
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, description, labels=()):
+        return self._register(Counter(name, description, labels))
+
+    def histogram(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def gauge(self, name, description, fn, labels=(), kind='gauge'):
+        return self._register(CallbackGauge(name, description, fn, labels, kind))
+
+    def render(self):
+        """Produit le format d'exposition texte de Prometheus"""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.description}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def instrument_methods(histogram, exclude=()):
+    """Décorateur de classe : chronomètre chaque méthode publique, étiquetée par son nom"""
+    def decorator(cls):
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith('_') or name in exclude or not callable(attribute):
+                continue
+            setattr(cls, name, histogram.timed(name)(attribute))
+        return cls
+    return decorator
+
+
+# Registre global des métriques
+registry = MetricsRegistry()
+
+MOVE_SECONDS = registry.histogram(
+    'puissance4_move_handling_seconds', "Durée de traitement d'un événement make_move")
+AI_THINK_SECONDS = registry.histogram(
+    'puissance4_ai_think_seconds', "Temps de réflexion de l'IA par difficulté", labels=('difficulty',))
+BROADCAST_FANOUT = registry.histogram(
+    'puissance4_broadcast_fanout', 'Nombre de destinataires par diffusion dans une salle',
+    buckets=(1, 2, 3, 5, 10, 25, 50, 100, 250, 1000))
+DB_QUERY_SECONDS = registry.histogram(
+    'puissance4_db_query_seconds', 'Durée des appels à la base SQLite par méthode', labels=('method',))
@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import threading
+from game import Puissance4
+
+SNAPSHOT_VERSION = 1
+
+
+class DrainController:
+    """Drainage du serveur et migration des parties en cours vers un nouveau processus
+
+    En mode drainage, le serveur refuse les nouvelles parties mais laisse
+    vivre celles en cours. À l'arrêt, l'état de chaque partie est écrit dans
+    un instantané compact que le processus de remplacement recharge au
+    démarrage ; les joueurs récupèrent leur place avec leur jeton de reprise.
+    """
+
+    def __init__(self, snapshot_path=None):
+        self.snapshot_path = snapshot_path or os.getenv('MIGRATION_SNAPSHOT_PATH', 'games_snapshot.json')
+        self.draining = False
+        self.drain_started_at = None
+        # Pendant l'arrêt, les déconnexions ne terminent plus les parties
+        self.shutting_down = False
+        self._lock = threading.Lock()
+
+    def start_drain(self):
+        with self._lock:
+            if not self.draining:
+                self.draining = True
+                self.drain_started_at = time.time()
+                print("🚧 Mode drainage activé : plus aucune nouvelle partie n'est acceptée")
+
+    def stop_drain(self):
+        with self._lock:
+            self.draining = False
+            self.drain_started_at = None
+            print("✅ Mode drainage désactivé")
+
+    def issue_tokens(self, games):
+        """Attribue un jeton de reprise à chaque joueur assis ; retourne [(sid, message)]"""
+        notices = []
+        for game_id, game in list(games.items()):
+            for sid, player in list(game.players.items()):
+                notices.append((sid, {
+                    'game_id': game_id,
+                    'player_number': player['number'],
+                    'slot_token': game.session_token(sid)
+                }))
+        return notices
+
+    def snapshot(self, games, path=None):
+        """Écrit l'état de toutes les parties (écriture atomique) ; retourne un résumé"""
+        path = path or self.snapshot_path
+        started = time.perf_counter()
+        payload = {
+            'version': SNAPSHOT_VERSION,
+            'created_at': time.time(),
+            'games': {game_id: game.snapshot() for game_id, game in list(games.items())}
+        }
+
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        summary = {
+            'games': len(payload['games']),
+            'bytes': os.path.getsize(path),
+            'seconds': round(time.perf_counter() - started, 3),
+            'path': path
+        }
+        print(f"💾 Instantané de {summary['games']} parties écrit en {summary['seconds']}s ({path})")
+        return summary
+
+    def restore(self, games, path=None):
+        """Recharge les parties d'un instantané puis le renomme pour éviter une double restauration"""
+        path = path or self.snapshot_path
+        if not os.path.exists(path):
+            return 0
+
+        started = time.perf_counter()
+        try:
+            with open(path) as f:
+                payload = json.load(f)
+            if payload.get('version') != SNAPSHOT_VERSION:
+                raise ValueError(f"version d'instantané non prise en charge : {payload.get('version')}")
+            restored = {game_id: Puissance4.from_snapshot(data) for game_id, data in payload['games'].items()}
+        except Exception as e:
+            print(f"⚠️  Instantané de parties illisible ({path}) : {e}")
+            return 0
+
+        games.update(restored)
+        os.replace(path, f'{path}.restored')
+        print(f"♻️  {len(restored)} parties restaurées en {time.perf_counter() - started:.3f}s")
+        return len(restored)
+
+    def status(self, games):
+        return {
+            'draining': self.draining,
+            'drain_started_at': self.drain_started_at,
+            'active_games': len(games),
+            'games_in_progress': sum(1 for game in list(games.values()) if not game.game_over),
+            'snapshot_path': self.snapshot_path
+        }
+
+
+# Instance globale du contrôleur de drainage
+drain_controller = DrainController()
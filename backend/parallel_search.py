@@ -0,0 +1,288 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from ai import PuissanceAI
+
+EXACT, LOWER, UPPER = 0, 1, 2
+VALUE_OFFSET = 2 ** 31
+KEY_SENTINEL = 1 << 60
+
+
+def position_key(board, player):
+    """Clé entière unique d'une position (bitboard pions + masque) et du camp de l'IA"""
+    mask = 0
+    stones = 0
+    for col in range(7):
+        for height in range(6):
+            cell = board[5 - height][col]
+            if cell == 0:
+                break
+            bit = 1 << (col * 7 + height)
+            mask |= bit
+            if cell == player:
+                stones |= bit
+    return KEY_SENTINEL | ((stones + mask) << 1) | (player - 1)
+
+
+def default_start_method():
+    """forkserver là où il existe (Linux, macOS), spawn sinon"""
+    return 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class _SharedSearch(PuissanceAI):
+    """Minimax d'un processus de travail : table de transposition et bornes alpha partagées
+
+    La table vit en mémoire partagée sans verrou : chaque entrée stocke
+    `clé ^ données` à côté des données, une écriture concurrente à moitié
+    faite est donc simplement vue comme une absence. Une entrée n'est
+    utilisée qu'à profondeur restante identique, et une valeur calculée
+    pendant que la borne partagée montait n'y est jamais rangée comme
+    exacte, pour que le coup choisi reste celui de la recherche séquentielle.
+    """
+
+    def __init__(self, tt_checks, tt_data, alphas, alpha_lock):
+        super().__init__('hard')
+        self._tt_checks = tt_checks
+        self._tt_data = tt_data
+        self._tt_size = len(tt_data)
+        self._alphas = alphas
+        self._alpha_lock = alpha_lock
+        self._slot = 0
+        self._alpha_seen = -float('inf')
+
+    def search_root_move(self, slot, board, col, depth, player):
+        """Évalue un coup racine ; retourne (colonne, score, exact, nœuds)"""
+        self._slot = slot
+        self._alpha_seen = -float('inf')
+        self.nodes = 0
+        child = self._simulate_move(board, col, player)
+        score, _ = self._minimax(child, depth - 1, -float('inf'), float('inf'), False, player)
+
+        # Un score sous la meilleure borne vue n'est qu'un majorant : il ne peut pas gagner
+        exact = score > self._alpha_seen
+        if exact:
+            with self._alpha_lock:
+                if score > self._alphas[slot]:
+                    self._alphas[slot] = score
+        return col, score, exact, self.nodes
+
+    def _minimax(self, board, depth, alpha, beta, maximizing_player, player):
+        # Borne publiée par les autres coups racine ; le -1 garde les égalités exactes,
+        # départagées ensuite par l'ordre des colonnes comme en séquentiel
+        shared = self._alphas[self._slot] - 1
+        if shared > alpha:
+            alpha = shared
+        if shared > self._alpha_seen:
+            self._alpha_seen = shared
+
+        if depth < 2:
+            return super()._minimax(board, depth, alpha, beta, maximizing_player, player)
+
+        key = position_key(board, player)
+        entry = self._probe(key, depth)
+        if entry is not None:
+            value, flag = entry
+            if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+                self.nodes += 1
+                return value, None
+
+        seen = self._alpha_seen
+        value, best_col = self._search_children(board, depth, alpha, beta, maximizing_player, player)
+        if self._alpha_seen > seen:
+            # Borne relevée par un coup racine frère pendant la recherche : des enfants ont pu
+            # échouer bas contre elle, la valeur n'est jamais rangée comme exacte
+            bound = max(alpha, self._alphas[self._slot] - 1)
+            flag = UPPER if value <= bound else LOWER if value >= beta else None
+        elif value <= alpha:
+            flag = UPPER
+        elif value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if flag is not None:
+            self._store(key, depth, value, flag)
+        return value, best_col
+
+    def _search_children(self, board, depth, alpha, beta, maximizing_player, player):
+        self.nodes += 1
+        winner = self._check_winner(board)
+        if winner != 0 or self._is_board_full(board):
+            return self._evaluate_board(board, player), None
+
+        valid_moves = self._get_valid_moves(board)
+        best_col = valid_moves[0]
+
+        if maximizing_player:
+            best = -float('inf')
+            for col in valid_moves:
+                eval_score, _ = self._minimax(self._simulate_move(board, col, player),
+                                              depth - 1, alpha, beta, False, player)
+                if eval_score > best:
+                    best = eval_score
+                    best_col = col
+                alpha = max(alpha, eval_score)
+                if beta <= alpha:
+                    break
+        else:
+            best = float('inf')
+            opponent = 1 if player == 2 else 2
+            for col in valid_moves:
+                eval_score, _ = self._minimax(self._simulate_move(board, col, opponent),
+                                              depth - 1, alpha, beta, True, player)
+                if eval_score < best:
+                    best = eval_score
+                    best_col = col
+                beta = min(beta, eval_score)
+                if beta <= alpha:
+                    break
+
+        return best, best_col
+
+    def _probe(self, key, depth):
+        index = key % self._tt_size
+        data = self._tt_data[index]
+        if self._tt_checks[index] ^ data != key or (data >> 8) & 0xFF != depth:
+            return None
+        return (data >> 16) - VALUE_OFFSET, data & 0xFF
+
+    def _store(self, key, depth, value, flag):
+        index = key % self._tt_size
+        data = ((int(value) + VALUE_OFFSET) << 16) | (depth << 8) | flag
+        self._tt_data[index] = data
+        self._tt_checks[index] = key ^ data
+
+
+_searcher = None
+
+
+def _init_worker(tt_checks, tt_data, alphas, alpha_lock):
+    global _searcher
+    _searcher = _SharedSearch(tt_checks, tt_data, alphas, alpha_lock)
+
+
+def _search_root_move(slot, board, col, depth, player):
+    return _searcher.search_root_move(slot, board, col, depth, player)
+
+
+class ParallelSearch:
+    """Recherche minimax répartie par coup racine sur un pool de processus
+
+    Le premier coup racine (frère aîné) est cherché seul pour établir une
+    borne alpha, puis les autres sont répartis entre les processus, qui se
+    partagent cette borne et une table de transposition. Chaque coup
+    réserve au plus AI_PARALLEL_MOVE_WORKERS processus parmi les
+    AI_PARALLEL_WORKERS du pool ; sans processus libre, la recherche reste
+    séquentielle dans le thread appelant, une partie ne peut donc pas
+    affamer les autres.
+    """
+
+    def __init__(self, workers=None, move_workers=None, min_depth=None, tt_size=None, start_method=None):
+        self.workers = workers if workers is not None else int(os.getenv('AI_PARALLEL_WORKERS', 0))
+        self.move_workers = move_workers or int(os.getenv('AI_PARALLEL_MOVE_WORKERS', 4))
+        self.min_depth = min_depth or int(os.getenv('AI_PARALLEL_MIN_DEPTH', 5))
+        self.tt_size = tt_size or int(os.getenv('AI_PARALLEL_TT_SIZE', 1 << 20))
+        # Le pool est créé à la demande dans un processus déjà multithread (chat, hachage, roue...) :
+        # fork pourrait copier un verrou tenu par un autre thread, les processus partent donc d'un serveur propre
+        self.start_method = start_method or os.getenv('AI_MP_START_METHOD', default_start_method())
+        self._executor = None
+        self._alphas = None
+        self._free_workers = self.workers
+        self._free_slots = list(range(self.workers))
+        self._lock = threading.Lock()
+        self.parallel_searches = 0
+        self.sequential_fallbacks = 0
+
+    @property
+    def enabled(self):
+        return self.workers > 1
+
+    def search(self, board, depth, player):
+        """Retourne (score, colonne, nœuds), ou None si la recherche doit rester séquentielle
+
+        La position racine ne doit pas être terminale.
+        """
+        if not self.enabled or depth < self.min_depth:
+            return None
+
+        moves = [col for col in range(7) if board[0][col] == 0]
+        if not moves:
+            return None
+
+        slot, budget = self._reserve()
+        if slot is None:
+            self.sequential_fallbacks += 1
+            return None
+
+        try:
+            results = self._run(slot, budget, board, moves, depth, player)
+        except Exception as e:
+            print(f"⚠️  Recherche parallèle indisponible, repli séquentiel : {e}")
+            self.sequential_fallbacks += 1
+            return None
+        finally:
+            self._release(slot, budget)
+
+        self.parallel_searches += 1
+        order = {col: index for index, col in enumerate(moves)}
+        col, score, _, _ = max((r for r in results if r[2]), key=lambda r: (r[1], -order[r[0]]))
+        return score, col, sum(r[3] for r in results)
+
+    def stats(self):
+        with self._lock:
+            busy = self.workers - self._free_workers
+        return {
+            'workers': self.workers,
+            'busy_workers': busy,
+            'move_workers': self.move_workers,
+            'parallel_searches': self.parallel_searches,
+            'sequential_fallbacks': self.sequential_fallbacks
+        }
+
+    def _run(self, slot, budget, board, moves, depth, player):
+        executor = self._ensure_executor()
+        self._alphas[slot] = -float('inf')
+
+        # Frère aîné d'abord : sa valeur sert de borne aux coups suivants
+        results = [executor.submit(_search_root_move, slot, board, moves[0], depth, player).result()]
+        queue = list(moves[1:])
+        pending = set()
+        while queue or pending:
+            while queue and len(pending) < budget:
+                pending.add(executor.submit(_search_root_move, slot, board, queue.pop(0), depth, player))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            results.extend(future.result() for future in done)
+        return results
+
+    def _reserve(self):
+        with self._lock:
+            budget = min(self.move_workers, self._free_workers)
+            if budget < 2 or not self._free_slots:
+                return None, 0
+            self._free_workers -= budget
+            return self._free_slots.pop(), budget
+
+    def _release(self, slot, budget):
+        with self._lock:
+            self._free_workers += budget
+            self._free_slots.append(slot)
+
+    def _ensure_executor(self):
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context(self.start_method)
+                tt_checks = context.RawArray('q', self.tt_size)
+                tt_data = context.RawArray('q', self.tt_size)
+                self._alphas = context.RawArray('d', self.workers)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(tt_checks, tt_data, self._alphas, context.Lock())
+                )
+                print(f"🧵 Recherche IA parallèle : {self.workers} processus ({self.start_method})")
+            return self._executor
+
+
+# Instance globale de la recherche parallèle
+parallel_search = ParallelSearch()
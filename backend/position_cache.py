@@ -0,0 +1,68 @@
+import os
+from cache import LRUCache
+
+
+def canonical_position(board):
+    """Retourne (clé canonique, miroir) : la plus petite des deux lectures gauche-droite du plateau"""
+    direct = bytes(cell for row in board for cell in row)
+    mirrored = bytes(cell for row in board for cell in reversed(row))
+    if mirrored < direct:
+        return mirrored, True
+    return direct, False
+
+
+class PositionCache:
+    """Cache des coups de l'IA partagé par toutes les parties du processus
+
+    Les parties contre l'IA passent très souvent par les mêmes positions
+    (ouvertures, réponses courantes) : le coup choisi et son score sont
+    gardés par (position canonique, joueur, difficulté). Une position et
+    son symétrique gauche-droite partagent la même entrée, le coup est
+    retourné en miroir au besoin. Seules les difficultés déterministes
+    (AI_CACHE_DIFFICULTIES) sont mises en cache : `easy` garde son hasard.
+    """
+
+    def __init__(self, maxsize=None, difficulties=None):
+        maxsize = maxsize if maxsize is not None else int(os.getenv('AI_CACHE_SIZE', 100000))
+        self.difficulties = set(difficulties or os.getenv('AI_CACHE_DIFFICULTIES', 'medium,hard').split(','))
+        self.difficulties.discard('easy')
+        self.enabled = maxsize > 0
+        self._entries = LRUCache(maxsize=max(maxsize, 1))
+
+    def get(self, board, player, difficulty):
+        """Retourne (colonne, score) si la position est connue pour cette difficulté, sinon None"""
+        if not self.enabled or difficulty not in self.difficulties:
+            return None
+        key, mirrored = canonical_position(board)
+        entry = self._entries.get((key, player, difficulty))
+        if entry is None:
+            return None
+        col, score = entry
+        return (6 - col if mirrored else col), score
+
+    def set(self, board, player, difficulty, col, score=None):
+        if not self.enabled or difficulty not in self.difficulties or col is None:
+            return
+        key, mirrored = canonical_position(board)
+        self._entries.set((key, player, difficulty), (6 - col if mirrored else col, score))
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hits(self):
+        return self._entries.hits
+
+    @property
+    def misses(self):
+        return self._entries.misses
+
+    def stats(self):
+        return dict(self._entries.stats(), enabled=self.enabled, difficulties=sorted(self.difficulties))
+
+
+# Instance globale du cache des coups de l'IA
+position_cache = PositionCache()
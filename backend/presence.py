@@ -0,0 +1,140 @@
+import threading
+from database import db
+
+
+class PresenceService:
+    """Présence en ligne des utilisateurs, diffusée à leurs seuls amis
+
+    Index en mémoire : utilisateur -> sids connectés, utilisateur -> partie en
+    cours, et un index inversé des abonnés (`_followers[u]` = amis connectés
+    de u). Les amis d'un utilisateur sont lus une fois en base à sa première
+    connexion ; un changement de statut est ensuite poussé en un seul emit
+    aux sids de ses abonnés, en O(amis), sans parcourir les connectés.
+    """
+
+    def __init__(self):
+        self._sids = {}
+        self._friends = {}
+        self._followers = {}
+        self._games = {}
+        self._lock = threading.Lock()
+        self._socketio = None
+        self.notifications = 0
+
+    def attach(self, socketio):
+        self._socketio = socketio
+
+    def connect(self, user_id, sid):
+        """Enregistre une session ; retourne le statut des amis pour ce sid"""
+        with self._lock:
+            first = user_id not in self._sids
+            self._sids.setdefault(user_id, set()).add(sid)
+
+        if first:
+            # Lecture en base hors du verrou ; une seule fois par utilisateur connecté
+            friends = set(db.get_friend_ids(user_id))
+            with self._lock:
+                if user_id in self._sids and user_id not in self._friends:
+                    self._friends[user_id] = friends
+                    for friend_id in friends:
+                        self._followers.setdefault(friend_id, set()).add(user_id)
+            self._notify(user_id)
+        return self.friends_status(user_id)
+
+    def disconnect(self, user_id, sid):
+        with self._lock:
+            sids = self._sids.get(user_id)
+            if sids is None:
+                return
+            sids.discard(sid)
+            if sids:
+                return
+            del self._sids[user_id]
+            self._games.pop(user_id, None)
+            for friend_id in self._friends.pop(user_id, ()):
+                self._unfollow(user_id, friend_id)
+        self._notify(user_id)
+
+    def set_game(self, user_id, game_id):
+        """Met à jour la partie en cours d'un utilisateur connecté (None : plus en partie)"""
+        with self._lock:
+            if user_id not in self._sids or self._games.get(user_id) == game_id:
+                return
+            if game_id is None:
+                del self._games[user_id]
+            else:
+                self._games[user_id] = game_id
+        self._notify(user_id)
+
+    def add_friendship(self, user_id, friend_id):
+        """Nouvelle amitié : abonnements croisés des deux côtés connectés et statuts échangés"""
+        with self._lock:
+            for follower, followed in ((user_id, friend_id), (friend_id, user_id)):
+                if follower in self._friends:
+                    self._friends[follower].add(followed)
+                    self._followers.setdefault(followed, set()).add(follower)
+        self.send_to(user_id, 'friend_status', self.status(friend_id))
+        self.send_to(friend_id, 'friend_status', self.status(user_id))
+
+    def remove_friendship(self, user_id, friend_id):
+        with self._lock:
+            for follower, followed in ((user_id, friend_id), (friend_id, user_id)):
+                if follower in self._friends:
+                    self._friends[follower].discard(followed)
+                    self._unfollow(follower, followed)
+        self.send_to(friend_id, 'friend_removed', {'user_id': user_id})
+
+    def status(self, user_id):
+        with self._lock:
+            return self._status(user_id)
+
+    def friends_status(self, user_id):
+        with self._lock:
+            return [self._status(friend_id) for friend_id in self._friends.get(user_id, ())]
+
+    def is_online(self, user_id):
+        return user_id in self._sids
+
+    def send_to(self, user_id, event, payload):
+        """Émet vers toutes les sessions d'un utilisateur (aucune s'il est hors ligne)"""
+        with self._lock:
+            sids = list(self._sids.get(user_id, ()))
+        if sids and self._socketio is not None:
+            self._socketio.emit(event, payload, to=sids)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'online_users': len(self._sids),
+                'sessions': sum(len(sids) for sids in self._sids.values()),
+                'in_game': len(self._games),
+                'follow_edges': sum(len(followers) for followers in self._followers.values()),
+                'notifications_total': self.notifications
+            }
+
+    def _status(self, user_id):
+        if user_id not in self._sids:
+            return {'user_id': user_id, 'status': 'offline', 'game_id': None}
+        game_id = self._games.get(user_id)
+        return {'user_id': user_id, 'status': 'in_game' if game_id else 'online', 'game_id': game_id}
+
+    def _unfollow(self, follower, followed):
+        followers = self._followers.get(followed)
+        if followers is not None:
+            followers.discard(follower)
+            if not followers:
+                del self._followers[followed]
+
+    def _notify(self, user_id):
+        """Pousse le statut de l'utilisateur à ses amis connectés, en un seul emit"""
+        with self._lock:
+            sids = [sid for follower in self._followers.get(user_id, ())
+                    for sid in self._sids.get(follower, ())]
+            payload = self._status(user_id)
+        if sids and self._socketio is not None:
+            self.notifications += 1
+            self._socketio.emit('friend_status', payload, to=sids)
+
+
+# Instance globale du service de présence
+presence = PresenceService()
@@ -0,0 +1,181 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from functools import wraps
+
+# Feuilles de pile d'un thread bloqué en attente (ignorées par défaut)
+IDLE_LEAVES = ('threading.py:wait', 'queue.py:get', 'selectors.py:select', 'thread.py:_worker',
+               'socket.py:accept', 'socket.py:readinto', 'socketserver.py:serve_forever')
+
+
+class Tracer:
+    """Spans de chronométrage optionnels, activables à chaud
+
+    Désactivé, un span coûte un test de booléen. Activé, chaque span est
+    agrégé par nom (nombre, total, max) ; les spans ouverts dans un même
+    thread forment une trace (un événement Socket.IO et ses appels SQLite,
+    IA, hachage...) conservée dans un tampon circulaire.
+    """
+
+    def __init__(self, enabled=None, buffer_size=None, slow_threshold_ms=None):
+        if enabled is None:
+            enabled = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+        self.enabled = enabled
+        self.slow_threshold = (slow_threshold_ms if slow_threshold_ms is not None
+                               else float(os.getenv('PROFILING_SLOW_TRACE_MS', 0))) / 1000
+        self._traces = deque(maxlen=buffer_size or int(os.getenv('PROFILING_TRACE_BUFFER', 200)))
+        self._aggregates = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sampling = threading.Lock()
+
+    def set_enabled(self, enabled):
+        self.enabled = bool(enabled)
+
+    def traced(self, name):
+        """Décorateur ouvrant un span autour de la fonction"""
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return f(*args, **kwargs)
+                with self.span(name):
+                    return f(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def _start(self, name):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        record = {'name': name, 'start': time.perf_counter(), 'children': []}
+        if stack:
+            stack[-1]['children'].append(record)
+        stack.append(record)
+        return record
+
+    def _finish(self, record, error):
+        duration = time.perf_counter() - record.pop('start')
+        record['ms'] = round(duration * 1000, 3)
+        if error:
+            record['error'] = error
+        stack = self._local.stack
+        stack.pop()
+
+        with self._lock:
+            aggregate = self._aggregates.get(record['name'])
+            if aggregate is None:
+                aggregate = self._aggregates[record['name']] = [0, 0.0, 0.0, 0]
+            aggregate[0] += 1
+            aggregate[1] += duration
+            aggregate[2] = max(aggregate[2], duration)
+            if error:
+                aggregate[3] += 1
+            if not stack and duration >= self.slow_threshold:
+                record['at'] = time.time()
+                self._traces.append(record)
+
+    def stats(self):
+        with self._lock:
+            spans = {
+                name: {
+                    'count': count,
+                    'total_ms': round(total * 1000, 3),
+                    'avg_ms': round(total * 1000 / count, 3),
+                    'max_ms': round(maximum * 1000, 3),
+                    'errors': errors
+                }
+                for name, (count, total, maximum, errors) in self._aggregates.items()
+            }
+        return {'enabled': self.enabled, 'slow_threshold_ms': self.slow_threshold * 1000, 'spans': spans}
+
+    def recent_traces(self, limit=50):
+        with self._lock:
+            traces = list(self._traces)
+        return traces[-limit:][::-1]
+
+    def reset(self):
+        with self._lock:
+            self._aggregates.clear()
+            self._traces.clear()
+
+    def sample_stacks(self, seconds, interval=0.005, limit=50, include_idle=False):
+        """Échantillonne les piles de tous les threads pendant `seconds` secondes
+
+        Retourne les piles les plus fréquentes au format « replié »
+        (fonction;fonction;... nombre), directement lisible par flamegraph.pl
+        ou speedscope. Les threads en attente sont ignorés sauf avec
+        `include_idle`. Un seul échantillonnage à la fois.
+        """
+        if not self._sampling.acquire(blocking=False):
+            return None
+
+        try:
+            own_thread = threading.get_ident()
+            stacks = Counter()
+            samples = 0
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    stack = _collapse(frame)
+                    if include_idle or not stack.endswith(IDLE_LEAVES):
+                        stacks[stack] += 1
+                samples += 1
+                time.sleep(interval)
+        finally:
+            self._sampling.release()
+
+        return {
+            'seconds': seconds,
+            'interval': interval,
+            'samples': samples,
+            'stacks': [{'stack': stack, 'count': count} for stack, count in stacks.most_common(limit)],
+            'collapsed': '\n'.join(f'{stack} {count}' for stack, count in stacks.most_common())
+        }
+
+
+def _collapse(frame):
+    entries = traceback.extract_stack(frame)
+    return ';'.join(f'{os.path.basename(entry.filename)}:{entry.name}' for entry in entries)
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'record')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.record = None
+
+    def __enter__(self):
+        if self.tracer.enabled:
+            self.record = self.tracer._start(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.record is not None:
+            self.tracer._finish(self.record, exc_type.__name__ if exc_type else None)
+        return False
+
+
+def trace_methods(prefix, exclude=()):
+    """Décorateur de classe : un span par méthode publique, nommé `prefix.méthode`"""
+    def decorator(cls):
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith('_') or name in exclude or not callable(attribute):
+                continue
+            setattr(cls, name, tracer.traced(f'{prefix}.{name}')(attribute))
+        return cls
+    return decorator
+
+
+# Instance globale du traceur
+tracer = Tracer()
@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+
+# Limites par défaut : (jetons par seconde, capacité du seau)
+DEFAULT_LIMITS = {
+    'make_move': (5.0, 10),
+    'send_private_message': (2.0, 5),
+    'join_game': (1.0, 5),
+    'reset_game': (0.2, 2),
+    'join_queue': (0.5, 3)
+}
+
+
+def parse_limits(spec):
+    """Parse une configuration du type 'make_move=5:10,reset_game=0.2:2'"""
+    limits = {}
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        event, _, values = item.partition('=')
+        rate, _, burst = values.partition(':')
+        rate = float(rate)
+        limits[event.strip()] = (rate, int(burst) if burst else max(1, int(rate)))
+    return limits
+
+
+class TokenBucketLimiter:
+    """Limiteur à seau de jetons par (sid, événement) et (utilisateur, événement)
+
+    Chaque seau tient dans une liste [jetons, dernier_remplissage] : le coût par
+    événement est O(1) et les seaux pleins inactifs sont purgés périodiquement.
+    """
+
+    PRUNE_EVERY = 4096
+
+    def __init__(self, limits=None):
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits if limits is not None else parse_limits(os.getenv('SOCKET_RATE_LIMITS')))
+        self.enabled = os.getenv('SOCKET_RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+        self.dropped = {event: 0 for event in self.limits}
+        self.allowed = {event: 0 for event in self.limits}
+
+    def allow(self, event, sid, user_id=None):
+        """Consomme un jeton pour l'événement ; retourne False si le client dépasse sa limite"""
+        limit = self.limits.get(event)
+        if not self.enabled or limit is None:
+            return True
+
+        rate, burst = limit
+        now = time.monotonic()
+
+        with self._lock:
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                self._prune(now)
+
+            keys = [('sid', sid, event)]
+            if user_id is not None:
+                keys.append(('user', user_id, event))
+
+            buckets = []
+            for key in keys:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = [float(burst), now]
+                else:
+                    bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                    bucket[1] = now
+                buckets.append(bucket)
+
+            if any(bucket[0] < 1 for bucket in buckets):
+                self.dropped[event] += 1
+                return False
+
+            for bucket in buckets:
+                bucket[0] -= 1
+            self.allowed[event] += 1
+            return True
+
+    def forget(self, sid):
+        """Libère les seaux d'un sid déconnecté"""
+        with self._lock:
+            for event in self.limits:
+                self._buckets.pop(('sid', sid, event), None)
+
+    def _prune(self, now):
+        """Supprime les seaux qui seraient de nouveau pleins (équivalents à un seau absent)"""
+        stale = []
+        for key, (tokens, last) in self._buckets.items():
+            rate, burst = self.limits[key[2]]
+            if tokens + (now - last) * rate >= burst:
+                stale.append(key)
+        for key in stale:
+            del self._buckets[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'limits': {event: {'rate': rate, 'burst': burst} for event, (rate, burst) in self.limits.items()},
+                'allowed': dict(self.allowed),
+                'dropped': dict(self.dropped),
+                'buckets': len(self._buckets)
+            }
+
+
+# Instance globale du limiteur Socket.IO
+socket_limiter = TokenBucketLimiter()
@@ -1,5 +1,12 @@
 from .auth_routes import auth_bp
 from .admin_routes import admin_bp, init_admin_routes
-from .game_routes import game_bp, init_socketio_handlers, init_game_routes
+from .game_routes import game_bp, init_socketio_handlers, init_game_routes, schedule_grace_expiry, arm_clock
+from .matchmaking_routes import init_matchmaking_handlers
+from .leaderboard_routes import leaderboard_bp
+from .metrics_routes import metrics_bp, init_metrics_routes
+from .tournament_routes import tournament_bp, init_tournament_handlers
+from .social_routes import social_bp, init_social_routes
 
-__all__ = ['auth_bp', 'admin_bp', 'game_bp', 'init_socketio_handlers', 'init_admin_routes', 'init_game_routes']
+__all__ = ['auth_bp', 'admin_bp', 'game_bp', 'init_socketio_handlers', 'init_admin_routes', 'init_game_routes',
+           'schedule_grace_expiry', 'arm_clock', 'init_matchmaking_handlers', 'leaderboard_bp', 'metrics_bp', 'init_metrics_routes',
+           'tournament_bp', 'init_tournament_handlers', 'social_bp', 'init_social_routes']
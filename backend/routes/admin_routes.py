@@ -1,6 +1,21 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+from flask_socketio import ConnectionRefusedError, emit
+import os
+from datetime import datetime, timedelta
 from database import db
-from auth import admin_required
+from chat import chat_pipeline
+from ratelimit import socket_limiter
+from matchmaking import matchmaking_queue
+from leaderboard import leaderboard
+from profiling import tracer
+from admin_feed import admin_feed, ADMIN_NAMESPACE
+from bulk import bulk_jobs
+from migration import drain_controller
+from presence import presence
+from position_cache import position_cache
+from parallel_search import parallel_search
+from auth import admin_required, auth_manager
+from .game_routes import remove_game
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -14,6 +29,24 @@ def init_admin_routes(games, socketio, connected_users):
     _games = games
     _socketio = socketio
     _connected_users = connected_users
+    admin_feed.attach(socketio, games, connected_users)
+    
+    @socketio.on('connect', namespace=ADMIN_NAMESPACE)
+    def on_admin_connect(auth=None):
+        token = (auth or {}).get('token') or request.args.get('token')
+        user = auth_manager.get_user_from_token(token) if token else None
+        if not user or not auth_manager.is_admin(user['user_id']):
+            raise ConnectionRefusedError('Accès refusé - Droits administrateur requis')
+        
+        emit('snapshot', admin_feed.add_admin(request.sid, user['user_id']))
+    
+    @socketio.on('request_snapshot', namespace=ADMIN_NAMESPACE)
+    def on_admin_request_snapshot(data=None):
+        emit('snapshot', admin_feed.snapshot())
+    
+    @socketio.on('disconnect', namespace=ADMIN_NAMESPACE)
+    def on_admin_disconnect():
+        admin_feed.remove_admin(request.sid)
 
 @admin_bp.route('/users', methods=['GET'])
 @admin_required
@@ -23,6 +56,48 @@ def admin_get_users():
     
     return jsonify({'users': users})
 
+def _search_args():
+    """Paramètres communs des recherches : (requête, limit, offset, préfixe) ou une réponse d'erreur"""
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return None, (jsonify({'error': 'Paramètre q requis'}), 400)
+    if not db.fts_enabled:
+        return None, (jsonify({'error': 'Recherche plein texte indisponible (SQLite sans FTS5)'}), 501)
+    
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    prefix = request.args.get('prefix', 'true').lower() == 'true'
+    return (query, limit, offset, prefix), None
+
+@admin_bp.route('/search/users', methods=['GET'])
+@admin_required
+def admin_search_users():
+    args, error = _search_args()
+    if error:
+        return error
+    
+    query, limit, offset, prefix = args
+    users, has_more = db.search_users(query, limit, offset, prefix)
+    return jsonify({'users': users, 'limit': limit, 'offset': offset, 'has_more': has_more})
+
+@admin_bp.route('/search/chat', methods=['GET'])
+@admin_required
+def admin_search_chat():
+    args, error = _search_args()
+    if error:
+        return error
+    
+    query, limit, offset, prefix = args
+    order = request.args.get('order', 'rank')
+    if order not in ('rank', 'recent'):
+        return jsonify({'error': 'order doit valoir rank ou recent'}), 400
+    
+    messages, has_more = db.search_chat(query, limit, offset, order,
+                                        game_id=request.args.get('game_id'),
+                                        sender_id=request.args.get('sender_id', type=int),
+                                        prefix=prefix)
+    return jsonify({'messages': messages, 'limit': limit, 'offset': offset, 'has_more': has_more})
+
 @admin_bp.route('/users/<int:user_id>', methods=['DELETE'])
 @admin_required
 def admin_delete_user(user_id):
@@ -30,6 +105,8 @@ def admin_delete_user(user_id):
         return jsonify({'error': 'Vous ne pouvez pas supprimer votre propre compte'}), 400
     
     success = db.delete_user(user_id)
+    current_app.auth_manager.invalidate_user(user_id)
+    leaderboard.remove(user_id)
     
     if success:
         return jsonify({'success': True, 'message': 'Utilisateur supprimé'})
@@ -46,8 +123,13 @@ def admin_toggle_admin(user_id):
         return jsonify({'error': 'Vous ne pouvez pas retirer vos propres droits admin'}), 400
     
     success = db.toggle_user_admin(user_id, is_admin)
+    current_app.auth_manager.invalidate_user(user_id)
     
     if success:
+        admin_feed.admin_role_changed(user_id, bool(is_admin))
+        if not is_admin:
+            for sid in admin_feed.admin_sids(user_id):
+                _socketio.server.disconnect(sid, namespace=ADMIN_NAMESPACE)
         return jsonify({'success': True, 'message': 'Statut admin mis à jour'})
     else:
         return jsonify({'error': 'Utilisateur non trouvé'}), 404
@@ -64,27 +146,52 @@ def admin_get_games():
 @admin_required
 def admin_delete_game(game_id):
     success = db.delete_game(game_id)
+    chat_pipeline.discard(game_id)
     
     if success:
         return jsonify({'success': True, 'message': 'Partie supprimée'})
     else:
         return jsonify({'error': 'Partie non trouvée'}), 404
 
+@admin_bp.route('/analytics', methods=['GET'])
+@admin_required
+def admin_get_analytics():
+    """Statistiques de jeu depuis les agrégats : `since`/`until` (AAAA-MM-JJ) ou les `days` derniers jours"""
+    since = request.args.get('since')
+    until = request.args.get('until')
+    try:
+        for value in (since, until):
+            if value:
+                datetime.strptime(value, '%Y-%m-%d')
+        days = request.args.get('days', 30, type=int)
+    except ValueError:
+        return jsonify({'error': 'Dates attendues au format AAAA-MM-JJ'}), 400
+    if not since and days > 0:
+        since = (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    
+    stats = db.get_stats(since, until)
+    stats['since'] = since
+    stats['until'] = until
+    return jsonify(stats)
+
+@admin_bp.route('/analytics/rebuild', methods=['POST'])
+@admin_required
+def admin_rebuild_analytics():
+    """Recalcule les agrégats depuis tout l'historique (tâche de fond au-delà du seuil)"""
+    last_id = db.get_last_game_history_id()
+    
+    def work(job):
+        games = db.rebuild_stats(chunk_size=int(os.getenv('STATS_REBUILD_CHUNK_SIZE', 10000)),
+                                 progress=job.advance_to)
+        print(f"📊 Statistiques recalculées : {games} parties agrégées")
+        return {'games': games}
+    
+    return _job_response(bulk_jobs.submit('rebuild_stats', last_id, work))
+
 @admin_bp.route('/active-games', methods=['GET'])
 @admin_required
 def admin_get_active_games():
-    active_games = []
-    
-    for game_id, game in _games.items():
-        active_games.append({
-            'game_id': game_id,
-            'players_count': len(game.players),
-            'players': [{'name': p['name'], 'number': p['number']} for p in game.players.values()],
-            'current_player': game.current_player,
-            'game_over': game.game_over,
-            'ai_enabled': game.ai_enabled,
-            'moves_count': sum(1 for row in game.board for cell in row if cell != 0)
-        })
+    active_games = admin_feed.active_games_list()
     
     return jsonify({'active_games': active_games, 'count': len(active_games)})
 
@@ -96,7 +203,7 @@ def admin_terminate_game(game_id):
             'message': 'Cette partie a été terminée par un administrateur'
         }, room=game_id)
         
-        del _games[game_id]
+        remove_game(_games, game_id, 'terminated')
         
         return jsonify({'success': True, 'message': 'Partie terminée'})
     else:
@@ -105,29 +212,8 @@ def admin_terminate_game(game_id):
 @admin_bp.route('/connected-users', methods=['GET'])
 @admin_required
 def admin_get_connected_users():
-    users_list = []
-    
-    for sid, user_info in _connected_users.items():
-        in_game = None
-        role = 'idle'
-        
-        for game_id, game in _games.items():
-            if sid in game.players:
-                in_game = game_id
-                role = 'player'
-                break
-            elif sid in game.spectators:
-                in_game = game_id
-                role = 'spectator'
-                break
-        
-        users_list.append({
-            'sid': sid,
-            'username': user_info.get('username', 'Anonyme'),
-            'connected_at': user_info.get('connected_at'),
-            'in_game': in_game,
-            'role': role
-        })
+    # L'emplacement de chaque sid est indexé par le flux admin : pas de parcours des parties
+    users_list = admin_feed.connected_users_list()
     
     return jsonify({'connected_users': users_list, 'count': len(users_list)})
 
@@ -141,9 +227,284 @@ def admin_disconnect_user(sid):
         'message': 'Vous avez été déconnecté par un administrateur'
     }, to=sid)
     
-    _socketio.disconnect(sid)
+    _socketio.server.disconnect(sid, namespace='/')
     
     if sid in _connected_users:
         del _connected_users[sid]
     
     return jsonify({'success': True, 'message': 'Utilisateur déconnecté'})
+
+def _bulk_targets(data, ids_key, resolve, cast=str):
+    """Liste dédoublonnée des cibles d'une opération en masse : ids explicites ou filtre"""
+    max_ids = int(os.getenv('BULK_MAX_IDS', 100000))
+    ids = data.get(ids_key)
+    filters = data.get('filter')
+    
+    if ids is not None:
+        if not isinstance(ids, list):
+            raise ValueError(f'{ids_key} doit être une liste')
+        ids = [cast(value) for value in ids]
+    elif isinstance(filters, dict) and filters:
+        ids = resolve(filters)
+    else:
+        raise ValueError(f'Fournir {ids_key} ou un filtre non vide')
+    
+    if len(ids) > max_ids:
+        raise ValueError(f'Trop de cibles ({len(ids)} > {max_ids})')
+    return list(dict.fromkeys(ids))
+
+def _job_response(job):
+    if job.status == 'running':
+        return jsonify(job.to_dict()), 202
+    if job.status == 'failed':
+        return jsonify(job.to_dict()), 500
+    return jsonify(job.to_dict())
+
+def _chunks(values, size):
+    for start in range(0, len(values), size):
+        yield start + min(size, len(values) - start), values[start:start + size]
+
+@admin_bp.route('/bulk/users/delete', methods=['POST'])
+@admin_required
+def admin_bulk_delete_users():
+    data = request.json or {}
+    try:
+        user_ids = _bulk_targets(data, 'user_ids', db.find_user_ids, int)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    current_id = request.current_user['user_id']
+    user_ids = [user_id for user_id in user_ids if user_id != current_id]
+    auth = current_app.auth_manager
+    
+    def work(job):
+        deleted = db.delete_users(user_ids, chunk_size=int(os.getenv('BULK_CHUNK_SIZE', 1000)),
+                                  progress=job.advance_to)
+        for user_id in user_ids:
+            auth.invalidate_user(user_id)
+            leaderboard.remove(user_id)
+        return {'deleted': deleted}
+    
+    return _job_response(bulk_jobs.submit('delete_users', len(user_ids), work))
+
+@admin_bp.route('/bulk/games/delete', methods=['POST'])
+@admin_required
+def admin_bulk_delete_games():
+    data = request.json or {}
+    try:
+        game_ids = _bulk_targets(data, 'game_ids', db.find_game_ids)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def work(job):
+        deleted = db.delete_games(game_ids, chunk_size=int(os.getenv('BULK_CHUNK_SIZE', 1000)),
+                                  progress=job.advance_to)
+        for game_id in game_ids:
+            chat_pipeline.discard(game_id)
+        return {'deleted': deleted}
+    
+    return _job_response(bulk_jobs.submit('delete_games', len(game_ids), work))
+
+@admin_bp.route('/bulk/active-games/terminate', methods=['POST'])
+@admin_required
+def admin_bulk_terminate_games():
+    data = request.json or {}
+    
+    def resolve(filters):
+        return [game_id for game_id, game in list(_games.items())
+                if ('ai_enabled' not in filters or game.ai_enabled == bool(filters['ai_enabled']))
+                and ('game_over' not in filters or game.game_over == bool(filters['game_over']))
+                and (not filters.get('empty') or not game.players)]
+    
+    try:
+        game_ids = _bulk_targets(data, 'game_ids', resolve)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    chunk_size = int(os.getenv('BULK_CHUNK_SIZE', 1000))
+    
+    def work(job):
+        terminated = []
+        for done, chunk in _chunks(game_ids, chunk_size):
+            removed = [game_id for game_id in chunk
+                       if remove_game(_games, game_id, 'terminated', notify_feed=False) is not None]
+            if removed:
+                # Une seule émission pour toutes les salles du lot
+                _socketio.emit('game_terminated', {
+                    'message': 'Cette partie a été terminée par un administrateur'
+                }, to=removed)
+                admin_feed.games_removed(removed, 'terminated')
+                terminated.extend(removed)
+            job.advance_to(done)
+        return {'terminated': len(terminated), 'not_found': len(game_ids) - len(terminated)}
+    
+    return _job_response(bulk_jobs.submit('terminate_games', len(game_ids), work))
+
+@admin_bp.route('/bulk/connected-users/disconnect', methods=['POST'])
+@admin_required
+def admin_bulk_disconnect_users():
+    data = request.json or {}
+    
+    def resolve(filters):
+        prefix = filters.get('username_prefix')
+        sids = []
+        for sid, info in list(_connected_users.items()):
+            in_game, role = admin_feed.location(sid)
+            if 'anonymous' in filters and bool(filters['anonymous']) == bool(info.get('authenticated')):
+                continue
+            if prefix and not info.get('username', '').startswith(prefix):
+                continue
+            if filters.get('idle') and role != 'idle':
+                continue
+            if filters.get('game_id') and in_game != filters['game_id']:
+                continue
+            sids.append(sid)
+        return sids
+    
+    try:
+        sids = _bulk_targets(data, 'sids', resolve)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    chunk_size = int(os.getenv('BULK_CHUNK_SIZE', 1000))
+    
+    def work(job):
+        disconnected = 0
+        for done, chunk in _chunks(sids, chunk_size):
+            sessions = {sid: _connected_users.pop(sid, None) for sid in chunk}
+            targets = [sid for sid, session in sessions.items() if session is not None]
+            for sid in targets:
+                # Le sid n'est plus dans les sessions quand on_disconnect s'exécute : présence retirée ici
+                if sessions[sid].get('user_id') is not None:
+                    presence.disconnect(sessions[sid]['user_id'], sid)
+            if targets:
+                _socketio.emit('force_disconnect', {
+                    'message': 'Vous avez été déconnecté par un administrateur'
+                }, to=targets)
+                admin_feed.users_left(targets)
+                for sid in targets:
+                    _socketio.server.disconnect(sid, namespace='/')
+                disconnected += len(targets)
+            job.advance_to(done)
+        return {'disconnected': disconnected, 'not_found': len(sids) - disconnected}
+    
+    return _job_response(bulk_jobs.submit('disconnect_users', len(sids), work))
+
+@admin_bp.route('/bulk/jobs', methods=['GET'])
+@admin_required
+def admin_get_bulk_jobs():
+    return jsonify({'jobs': bulk_jobs.recent()})
+
+@admin_bp.route('/bulk/jobs/<job_id>', methods=['GET'])
+@admin_required
+def admin_get_bulk_job(job_id):
+    job = bulk_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Tâche introuvable'}), 404
+    return jsonify(job.to_dict())
+
+@admin_bp.route('/live-stats', methods=['GET'])
+@admin_required
+def admin_get_live_stats():
+    return jsonify(admin_feed.stats())
+
+@admin_bp.route('/rate-limits', methods=['GET'])
+@admin_required
+def admin_get_rate_limits():
+    return jsonify(socket_limiter.stats())
+
+@admin_bp.route('/matchmaking', methods=['GET'])
+@admin_required
+def admin_get_matchmaking():
+    return jsonify(matchmaking_queue.stats())
+
+@admin_bp.route('/ai', methods=['GET'])
+@admin_required
+def admin_get_ai_stats():
+    return jsonify({
+        'position_cache': position_cache.stats(),
+        'parallel_search': parallel_search.stats()
+    })
+
+@admin_bp.route('/ai/cache', methods=['DELETE'])
+@admin_required
+def admin_clear_ai_cache():
+    position_cache.clear()
+    return jsonify({'message': 'Cache des coups de l\'IA vidé'})
+
+@admin_bp.route('/profiling', methods=['GET'])
+@admin_required
+def admin_get_profiling():
+    limit = request.args.get('limit', 50, type=int)
+    stats = tracer.stats()
+    stats['traces'] = tracer.recent_traces(limit)
+    return jsonify(stats)
+
+@admin_bp.route('/profiling', methods=['PUT'])
+@admin_required
+def admin_toggle_profiling():
+    data = request.json or {}
+    tracer.set_enabled(data.get('enabled', False))
+    if data.get('reset'):
+        tracer.reset()
+    
+    print(f"🔬 Profilage {'activé' if tracer.enabled else 'désactivé'} par {request.current_user['username']}")
+    return jsonify({'success': True, 'enabled': tracer.enabled})
+
+@admin_bp.route('/profiling', methods=['DELETE'])
+@admin_required
+def admin_reset_profiling():
+    tracer.reset()
+    return jsonify({'success': True, 'message': 'Mesures de profilage réinitialisées'})
+
+@admin_bp.route('/profiling/sample', methods=['POST'])
+@admin_required
+def admin_sample_profile():
+    data = request.json or {}
+    max_seconds = float(os.getenv('PROFILING_MAX_SAMPLE_SECONDS', 30))
+    try:
+        seconds = min(max(float(data.get('seconds', 5)), 0.1), max_seconds)
+        interval = min(max(float(data.get('interval', 0.005)), 0.001), 1.0)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Paramètres invalides'}), 400
+    
+    profile = tracer.sample_stacks(seconds, interval, include_idle=bool(data.get('include_idle')))
+    if profile is None:
+        return jsonify({'error': 'Un échantillonnage est déjà en cours'}), 409
+    
+    if request.args.get('format') == 'collapsed':
+        return current_app.response_class(profile['collapsed'], mimetype='text/plain')
+    return jsonify(profile)
+
+@admin_bp.route('/drain', methods=['GET'])
+@admin_required
+def admin_get_drain_status():
+    return jsonify(drain_controller.status(_games))
+
+@admin_bp.route('/drain', methods=['POST'])
+@admin_required
+def admin_start_drain():
+    drain_controller.start_drain()
+    
+    # Chaque joueur reçoit son jeton de reprise avant l'arrêt du processus
+    notices = drain_controller.issue_tokens(_games)
+    for sid, notice in notices:
+        _socketio.emit('server_draining', notice, to=sid)
+    
+    status = drain_controller.status(_games)
+    status['players_notified'] = len(notices)
+    return jsonify(status)
+
+@admin_bp.route('/drain', methods=['DELETE'])
+@admin_required
+def admin_stop_drain():
+    drain_controller.stop_drain()
+    return jsonify(drain_controller.status(_games))
+
+@admin_bp.route('/drain/snapshot', methods=['POST'])
+@admin_required
+def admin_write_snapshot():
+    try:
+        return jsonify(drain_controller.snapshot(_games))
+    except OSError as e:
+        return jsonify({'error': f"Écriture de l'instantané impossible : {e}"}), 500
@@ -1,11 +1,17 @@
 from flask import Blueprint, request, jsonify, current_app
 from database import db
+from chat import chat_pipeline
+from hashing import HasherBusy
 from auth import token_required, optional_token
+from migration import drain_controller
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/health', methods=['GET'])
 def health():
+    # 503 pendant le drainage : le répartiteur de charge oriente les nouveaux clients ailleurs
+    if drain_controller.draining:
+        return jsonify({'status': 'draining'}), 503
     return jsonify({'status': 'ok'})
 
 @auth_bp.route('/register', methods=['POST'])
@@ -22,7 +28,10 @@ def register():
     if len(password) < 6:
         return jsonify({'error': 'Le mot de passe doit contenir au moins 6 caractères'}), 400
     
-    user_id = db.create_user(username, email, password, display_name)
+    try:
+        user_id = db.create_user(username, email, password, display_name)
+    except HasherBusy:
+        return jsonify({'error': 'Serveur occupé, veuillez réessayer dans un instant'}), 503
     
     if not user_id:
         return jsonify({'error': 'Nom d\'utilisateur ou email déjà utilisé'}), 409
@@ -41,7 +50,10 @@ def login():
     username = data.get('username')
     password = data.get('password')
     
-    user = db.authenticate_user(username, password)
+    try:
+        user = db.authenticate_user(username, password)
+    except HasherBusy:
+        return jsonify({'error': 'Serveur occupé, veuillez réessayer dans un instant'}), 503
     
     if not user:
         return jsonify({'error': 'Identifiants invalides'}), 401
@@ -93,6 +105,11 @@ def get_game_history():
 @optional_token
 def get_chat_history(game_id):
     limit = request.args.get('limit', 100, type=int)
-    history = db.get_chat_history(game_id, limit)
+    history = chat_pipeline.get_recent(game_id, limit)
+    
+    if history is None:
+        # Messages en file ou en cours d'écriture : écrits avant la lecture en base
+        chat_pipeline.flush()
+        history = db.get_chat_history(game_id, limit)
     
     return jsonify({'messages': history})
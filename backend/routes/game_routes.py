@@ -3,7 +3,23 @@ from flask_socketio import emit, join_room, leave_room
 import uuid
 import threading
 import time
-from ai import PuissanceAI
+from functools import wraps
+from game import Puissance4
+from chat import chat_pipeline
+from ratelimit import socket_limiter
+from auth import auth_manager
+from database import db
+from matchmaking import matchmaking_queue
+from leaderboard import leaderboard
+from metrics import MOVE_SECONDS, AI_THINK_SECONDS, BROADCAST_FANOUT
+from profiling import tracer
+from admin_feed import admin_feed
+from migration import drain_controller
+from sessions import reconnect_grace
+from tournament import tournament_manager
+from timer_wheel import timer_wheel
+from event_log import game_log
+from presence import presence
 
 game_bp = Blueprint('game', __name__)
 
@@ -14,90 +30,124 @@ def init_game_routes(games):
     global _games
     _games = games
 
-class Puissance4:
-    def __init__(self, ai_enabled=False, difficulty='medium'):
-        self.rows = 6
-        self.cols = 7
-        self.board = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
-        self.current_player = 1
-        self.players = {}
-        self.spectators = {}
-        self.game_over = False
-        self.winner = None
-        self.ai_enabled = ai_enabled
-        self.ai = PuissanceAI(difficulty) if ai_enabled else None
-        self.global_score = {'player1': 0, 'player2': 0, 'draws': 0}
-        
-    def drop_piece(self, col, player):
-        if col < 0 or col >= self.cols or self.game_over:
-            return False
-        
-        for row in range(self.rows - 1, -1, -1):
-            if self.board[row][col] == 0:
-                self.board[row][col] = player
-                return True
-        return False
+def record_game_result(game_id, game):
+    """Enregistre le résultat d'une partie terminée (une seule fois par manche)"""
+    if not game.game_over or game.result_saved:
+        return
+    game.result_saved = True
+    admin_feed.game_ended(game_id, game)
+    game_log.ended(game_id, game.winner)
+    tournament_manager.game_finished(game_id, game.winner)
     
-    def check_winner(self):
-        for row in range(self.rows):
-            for col in range(self.cols - 3):
-                if self.board[row][col] != 0 and \
-                   self.board[row][col] == self.board[row][col+1] == \
-                   self.board[row][col+2] == self.board[row][col+3]:
-                    return self.board[row][col]
-        
-        for row in range(self.rows - 3):
-            for col in range(self.cols):
-                if self.board[row][col] != 0 and \
-                   self.board[row][col] == self.board[row+1][col] == \
-                   self.board[row+2][col] == self.board[row+3][col]:
-                    return self.board[row][col]
-        
-        for row in range(self.rows - 3):
-            for col in range(self.cols - 3):
-                if self.board[row][col] != 0 and \
-                   self.board[row][col] == self.board[row+1][col+1] == \
-                   self.board[row+2][col+2] == self.board[row+3][col+3]:
-                    return self.board[row][col]
-        
-        for row in range(3, self.rows):
-            for col in range(self.cols - 3):
-                if self.board[row][col] != 0 and \
-                   self.board[row][col] == self.board[row-1][col+1] == \
-                   self.board[row-2][col+2] == self.board[row-3][col+3]:
-                    return self.board[row][col]
-        
-        return None
+    player1 = game.get_player(1) or {}
+    player2 = game.get_player(2) or {}
+    if game.ai_enabled:
+        player2 = {'name': 'IA', 'user_id': None}
     
-    def is_board_full(self):
-        return all(self.board[0][col] != 0 for col in range(self.cols))
+    player1_id = player1.get('user_id')
+    player2_id = player2.get('user_id')
+    winner_id = {1: player1_id, 2: player2_id}.get(game.winner)
+    moves_count = sum(1 for row in game.board for cell in row if cell != 0)
     
-    def reset_game(self):
-        self.board = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
-        self.current_player = 1
-        self.game_over = False
-        self.winner = None
+    try:
+        ratings = db.save_game_result(
+            game_id, player1_id, player2_id, player1.get('name'), player2.get('name'),
+            winner_id, game_mode='ai' if game.ai_enabled else 'multiplayer',
+            moves_count=moves_count, is_guest_game=not (player1_id or player2_id),
+            winner=game.winner, ai_difficulty=game.ai.difficulty if game.ai_enabled else None
+        )
+        names = {player1_id: player1.get('name'), player2_id: player2.get('name')}
+        for user_id, rating in ratings.items():
+            leaderboard.update(user_id, rating, names.get(user_id))
+    except Exception as e:
+        print(f"⚠️  Erreur lors de l'enregistrement de la partie {game_id} : {e}")
+
+def end_abandoned_game(socketio, games, game_id, game, player_name):
+    """Termine une partie multijoueur quittée par un joueur"""
+    game.game_over = True
+    socketio.emit('game_ended', {
+        'reason': 'player_left',
+        'message': f'{player_name} a quitté la partie. La partie est terminée.',
+        'redirect': True
+    }, room=game_id)
     
-    def to_dict(self):
-        return {
-            'board': self.board,
-            'current_player': self.current_player,
-            'players': self.players,
-            'spectators': self.spectators,
-            'game_over': self.game_over,
-            'winner': self.winner,
-            'ai_enabled': self.ai_enabled,
-            'global_score': self.global_score
-        }
+    # En tournoi, le joueur resté dans la salle gagne par forfait
+    seated = [player['number'] for player in game.players.values()]
+    remove_game(games, game_id, 'player_left', seated[0] if len(seated) == 1 else None)
+
+def remove_game(games, game_id, reason, winner=None, notify_feed=True):
+    """Retire une partie du serveur et libère ce qui s'y rattache : pendule, présence, rencontre de tournoi
+    
+    Une rencontre de tournoi encore ouverte est déclarée forfait (winner : place
+    du joueur resté, None pour un double forfait) afin que sa manche se clôture.
+    Retourne la partie retirée, ou None si elle n'existait plus.
+    """
+    game = games.pop(game_id, None)
+    if game is None:
+        return None
+    
+    stop_clock(game)
+    if notify_feed:
+        admin_feed.game_removed(game_id, reason)
+    game_log.removed(game_id)
+    for player in game.players.values():
+        if player.get('user_id') is not None:
+            presence.set_game(player['user_id'], None)
+    # Sans effet si la rencontre a déjà son résultat ou si la partie n'est pas de tournoi
+    tournament_manager.game_finished(game_id, winner, 'forfeit')
+    return game
+
+def schedule_grace_expiry(socketio, games, game_id, number, token):
+    """Garde la place d'un joueur déconnecté ; la roue de temporisation la libère à l'échéance"""
+    reconnect_grace.schedule(game_id, number, token)
+    timer_wheel.schedule(reconnect_grace.grace_seconds, expire_held_slots, socketio, games)
+
+def expire_held_slots(socketio, games):
+    """Rappel de la roue : termine les parties dont le joueur n'est pas revenu à temps"""
+    for game_id, game, slot in reconnect_grace.pop_expired(games):
+        print(f"⌛ {slot['name']} ne s'est pas reconnecté à temps (partie {game_id})")
+        end_abandoned_game(socketio, games, game_id, game, slot['name'])
+
+def arm_clock(socketio, games, game_id, game):
+    """(Re)programme sur la roue la chute du drapeau du joueur au trait"""
+    clock = game.clock
+    timer_wheel.cancel(clock.timer)
+    clock.timer = None
+    if clock.running is not None:
+        clock.timer = timer_wheel.schedule(clock.left(clock.running), flag_fall, socketio, games, game_id, game)
+
+def start_clock(socketio, games, game_id, game):
+    """Lance la pendule au premier coup attendu, une fois les deux joueurs assis"""
+    clock = game.clock
+    if clock is None or clock.running is not None or game.game_over or len(game.players) < 2:
+        return
+    clock.start(game.current_player)
+    arm_clock(socketio, games, game_id, game)
+
+def stop_clock(game):
+    if game.clock is not None:
+        game.clock.stop()
+        timer_wheel.cancel(game.clock.timer)
+        game.clock.timer = None
+
+def flag_fall(socketio, games, game_id, game):
+    """Rappel de la roue : le joueur au trait a épuisé son temps, son adversaire gagne"""
+    clock = game.clock
+    if games.get(game_id) is not game or game.game_over or clock is None or clock.running is None:
+        return
+    loser = clock.flagged()
+    if loser is None:
+        # Coup joué entre-temps : la pendule a déjà été réarmée
+        return
     
-    def update_score(self, winner):
-        """Met à jour le score global après une victoire"""
-        if winner == 1:
-            self.global_score['player1'] += 1
-        elif winner == 2:
-            self.global_score['player2'] += 1
-        elif winner == 0:
-            self.global_score['draws'] += 1
+    stop_clock(game)
+    game.game_over = True
+    game.winner = 3 - loser
+    game.update_score(game.winner)
+    print(f"⏱️  Temps écoulé pour le joueur {loser} (partie {game_id})")
+    socketio.emit('flag_fell', {'player_number': loser, 'winner': game.winner}, room=game_id)
+    record_game_result(game_id, game)
+    socketio.emit('game_state', game.to_dict(), room=game_id)
 
 @game_bp.route('/join_game/<game_id>')
 def join_game(game_id):
@@ -106,48 +156,119 @@ def join_game(game_id):
     else:
         return "Partie non trouvée", 404
 
+DRAINING_MESSAGE = 'Serveur en maintenance : aucune nouvelle partie pour le moment'
+
 @game_bp.route('/create_game', methods=['POST'])
 def create_game():
+    if drain_controller.draining:
+        return {'error': DRAINING_MESSAGE}, 503
+    
     game_id = str(uuid.uuid4())
-    _games[game_id] = Puissance4()
+    game = Puissance4()
+    _games[game_id] = game
+    admin_feed.game_created(game_id, game)
+    game_log.created(game_id, game)
+    chat_pipeline.open(game_id)
     return {'game_id': game_id}
 
 @game_bp.route('/create_ai_game', methods=['POST'])
 def create_ai_game():
+    if drain_controller.draining:
+        return {'error': DRAINING_MESSAGE}, 503
+    
     data = request.json or {}
     difficulty = data.get('difficulty', 'medium')
     
     game_id = str(uuid.uuid4())
     game = Puissance4(ai_enabled=True, difficulty=difficulty)
     _games[game_id] = game
+    admin_feed.game_created(game_id, game)
+    game_log.created(game_id, game)
+    chat_pipeline.open(game_id)
     
     return {'game_id': game_id, 'difficulty': difficulty}
 
 def init_socketio_handlers(socketio, games, connected_users):
     from datetime import datetime
+    timer_wheel.attach(socketio)
     
     def emit_game_state(game_id):
         if game_id not in games:
             return
         game = games[game_id]
+        BROADCAST_FANOUT.observe(len(game.players) + len(game.spectators))
         socketio.emit('game_state', game.to_dict(), room=game_id)
     
+    def send_resync(game_id, game, player_number, player_name):
+        """Reprise de session : tout l'état nécessaire au client en un seul message"""
+        reconnect_grace.mark_resumed()
+        emit('game_resync', {
+            'game_id': game_id,
+            'player_number': player_number,
+            'name': player_name,
+            'sid': request.sid,
+            'role': 'player',
+            'slot_token': game.session_token(request.sid),
+            'game_state': game.to_dict(),
+            'players_count': len(game.players),
+            'spectators_count': len(game.spectators)
+        }, room=request.sid)
+        
+        emit('player_reconnected', {
+            'player_name': player_name,
+            'player_number': player_number,
+            'players_count': len(game.players),
+            'spectators_count': len(game.spectators)
+        }, room=game_id, include_self=False)
+        emit('game_state', game.to_dict(), room=game_id, include_self=False)
+    
+    def rate_limited(event):
+        """Ignore l'événement si le client dépasse sa limite de débit"""
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                user_id = connected_users.get(request.sid, {}).get('user_id')
+                if not socket_limiter.allow(event, request.sid, user_id):
+                    emit('error', {'message': 'Trop de requêtes, veuillez ralentir', 'rate_limited': True})
+                    return
+                return f(*args, **kwargs)
+            return wrapper
+        return decorator
+    
     @socketio.on('connect')
-    def on_connect():
+    @tracer.traced('socket.connect')
+    def on_connect(auth=None):
+        # Le JWT est vérifié une seule fois, à la poignée de main ; le contexte
+        # utilisateur reste ensuite attaché au sid pour les événements suivants
+        token = (auth or {}).get('token') or request.args.get('token')
+        user = auth_manager.get_user_from_token(token) if token else None
+        
         connected_users[request.sid] = {
             'sid': request.sid,
-            'username': 'Anonyme',
+            'username': user['username'] if user else 'Anonyme',
+            'user_id': user['user_id'] if user else None,
+            'authenticated': user is not None,
             'connected_at': datetime.now().isoformat()
         }
+        admin_feed.user_connected(request.sid)
+        if user:
+            emit('friends_presence', {'friends': presence.connect(user['user_id'], request.sid)})
         print(f"✅ Utilisateur connecté: {request.sid} (Total: {len(connected_users)})")
     
     @socketio.on('join_game')
+    @tracer.traced('socket.join_game')
+    @rate_limited('join_game')
     def on_join_game(data):
         game_id = data['game_id']
-        player_name = data['player_name']
+        session = connected_users.get(request.sid, {})
+        user_id = session.get('user_id')
         
-        if request.sid in connected_users:
-            connected_users[request.sid]['username'] = player_name
+        if user_id is not None:
+            player_name = session['username']
+        else:
+            player_name = data['player_name']
+            if session:
+                session['username'] = player_name
         
         if game_id not in games:
             emit('error', {'message': 'Partie non trouvée'})
@@ -158,32 +279,70 @@ def init_socketio_handlers(socketio, games, connected_users):
         
         if game.ai_enabled:
             if request.sid not in game.players:
+                # Place gardée après une déconnexion ou restaurée d'un instantané de migration
+                resumed = game.resume_slot(user_id, data.get('slot_token')) is not None
+                game.reserved_slots.pop(1, None)
                 game.players[request.sid] = {
                     'number': 1,
                     'name': player_name,
-                    'sid': request.sid
+                    'sid': request.sid,
+                    'user_id': user_id
                 }
+                admin_feed.role_changed(request.sid, game_id, 'player')
                 
+                if resumed:
+                    send_resync(game_id, game, 1, player_name)
+                    return
+                
+                slot_token = game.session_token(request.sid)
+                game_log.seated(game_id, 1, player_name, user_id, slot_token)
+                if user_id is not None:
+                    presence.set_game(user_id, game_id)
                 emit('player_assigned', {
                     'player_number': 1,
                     'name': player_name,
                     'sid': request.sid,
-                    'role': 'player'
+                    'role': 'player',
+                    'slot_token': slot_token
                 }, room=request.sid)
         else:
-            if len(game.players) < 2:
-                player_number = len(game.players) + 1
+            existing = game.players.get(request.sid)
+            resumed = False
+            if existing:
+                player_number = existing['number']
+            else:
+                player_number = game.resume_slot(user_id, data.get('slot_token'))
+                resumed = player_number is not None
+                if not resumed:
+                    player_number = game.claim_slot(user_id, data.get('slot_token')) or game.free_slot_number()
+            
+            if player_number:
                 game.players[request.sid] = {
                     'number': player_number,
                     'name': player_name,
-                    'sid': request.sid
+                    'sid': request.sid,
+                    'user_id': user_id,
+                    'token': existing.get('token') if existing else None
                 }
+                admin_feed.role_changed(request.sid, game_id, 'player')
                 
+                if resumed:
+                    # La pendule, suspendue pendant le délai de grâce, repart au retour du joueur
+                    start_clock(socketio, games, game_id, game)
+                    send_resync(game_id, game, player_number, player_name)
+                    return
+                
+                slot_token = game.session_token(request.sid)
+                if not existing:
+                    game_log.seated(game_id, player_number, player_name, user_id, slot_token)
+                if user_id is not None:
+                    presence.set_game(user_id, game_id)
                 emit('player_assigned', {
                     'player_number': player_number,
                     'name': player_name,
                     'sid': request.sid,
-                    'role': 'player'
+                    'role': 'player',
+                    'slot_token': slot_token
                 }, room=request.sid)
                 
                 emit('player_joined', {
@@ -192,11 +351,14 @@ def init_socketio_handlers(socketio, games, connected_users):
                     'players_count': len(game.players),
                     'spectators_count': len(game.spectators)
                 }, room=game_id)
+                start_clock(socketio, games, game_id, game)
             else:
                 game.spectators[request.sid] = {
                     'name': player_name,
-                    'sid': request.sid
+                    'sid': request.sid,
+                    'user_id': user_id
                 }
+                admin_feed.role_changed(request.sid, game_id, 'spectator')
                 
                 emit('player_assigned', {
                     'player_number': None,
@@ -205,6 +367,13 @@ def init_socketio_handlers(socketio, games, connected_users):
                     'role': 'spectator'
                 }, room=request.sid)
                 
+                # Rattrapage : état courant et coups de la manche en un seul message
+                emit('spectator_sync', {
+                    'game_id': game_id,
+                    'game_state': game.to_dict(),
+                    'moves': game.moves
+                }, room=request.sid)
+                
                 emit('spectator_joined', {
                     'spectator_name': player_name,
                     'players_count': len(game.players),
@@ -215,6 +384,9 @@ def init_socketio_handlers(socketio, games, connected_users):
         emit_game_state(game_id)
     
     @socketio.on('make_move')
+    @tracer.traced('socket.make_move')
+    @rate_limited('make_move')
+    @MOVE_SECONDS.timed()
     def on_make_move(data):
         game_id = data['game_id']
         col = data['col']
@@ -238,6 +410,11 @@ def init_socketio_handlers(socketio, games, connected_users):
             emit('error', {'message': 'Ce n\'est pas votre tour'})
             return
         
+        # Coup arrivé après la chute du drapeau, avant le cran de la roue
+        if game.clock and game.clock.flagged():
+            flag_fall(socketio, games, game_id, game)
+            return
+        
         if game.drop_piece(col, player_number):
             row = None
             for r in range(6):
@@ -265,6 +442,15 @@ def init_socketio_handlers(socketio, games, connected_users):
             else:
                 game.current_player = 2 if game.current_player == 1 else 1
             
+            if game.clock and game.clock.running is not None:
+                if game.game_over:
+                    stop_clock(game)
+                else:
+                    game.clock.switch()
+                    arm_clock(socketio, games, game_id, game)
+            
+            game_log.moved(game_id, game, col, player_number)
+            record_game_result(game_id, game)
             emit_game_state(game_id)
             
             if game.ai_enabled and game.current_player == 2 and not game.game_over:
@@ -273,21 +459,32 @@ def init_socketio_handlers(socketio, games, connected_users):
             emit('error', {'message': 'Coup invalide'})
     
     @socketio.on('reset_game')
+    @tracer.traced('socket.reset_game')
+    @rate_limited('reset_game')
     def on_reset_game(data):
         game_id = data['game_id']
         
         if game_id in games:
             game = games[game_id]
+            stop_clock(game)
             game.reset_game()
+            game_log.reset(game_id)
+            start_clock(socketio, games, game_id, game)
             emit_game_state(game_id)
     
     @socketio.on('send_private_message')
+    @tracer.traced('socket.send_private_message')
+    @rate_limited('send_private_message')
     def handle_private_message(data):
         game_id = data.get('game_id')
         target_sid = data.get('target_sid')
         message = data.get('message')
         sender_name = data.get('sender_name')
         sender_sid = data.get('sender_sid')
+        sender_id = connected_users.get(request.sid, {}).get('user_id')
+        
+        if sender_id is not None:
+            sender_name = connected_users[request.sid]['username']
         
         if game_id and target_sid and message:
             socketio.emit('private_message', {
@@ -295,28 +492,50 @@ def init_socketio_handlers(socketio, games, connected_users):
                 'sender_sid': sender_sid,
                 'message': message
             }, room=target_sid)
+            
+            recipient_id = connected_users.get(target_sid, {}).get('user_id')
+            chat_pipeline.submit(game_id, sender_id, sender_name or 'Anonyme', recipient_id, message,
+                                 is_guest_message=sender_id is None)
     
     @socketio.on('disconnect')
+    @tracer.traced('socket.disconnect')
     def on_disconnect():
+        socket_limiter.forget(request.sid)
+        matchmaking_queue.remove(request.sid)
+        
         if request.sid in connected_users:
-            del connected_users[request.sid]
+            user_id = connected_users.pop(request.sid).get('user_id')
+            if user_id is not None:
+                presence.disconnect(user_id, request.sid)
+            admin_feed.user_left(request.sid)
             print(f"❌ Utilisateur déconnecté: {request.sid} (Total: {len(connected_users)})")
         
+        # Arrêt pour migration : les parties sont dans l'instantané, les joueurs vont se reconnecter
+        if drain_controller.shutting_down:
+            return
+        
         for game_id, game in list(games.items()):
             if request.sid in game.players:
                 player_name = game.players[request.sid]['name']
-                del game.players[request.sid]
                 
-                if not game.ai_enabled:
-                    game.game_over = True
-                    socketio.emit('game_ended', {
-                        'reason': 'player_left',
-                        'message': f'{player_name} a quitté la partie. La partie est terminée.',
-                        'redirect': True
+                if not game.ai_enabled and not reconnect_grace.enabled:
+                    del game.players[request.sid]
+                    end_abandoned_game(socketio, games, game_id, game, player_name)
+                elif not game.ai_enabled:
+                    # La place est gardée le temps du délai de grâce, reprise possible avec le jeton
+                    player_number, token = game.hold_slot(request.sid)
+                    schedule_grace_expiry(socketio, games, game_id, player_number, token)
+                    # Pendule suspendue : le temps ne court pour personne pendant le délai de grâce
+                    stop_clock(game)
+                    emit('player_disconnected', {
+                        'player_name': player_name,
+                        'player_number': player_number,
+                        'grace_seconds': reconnect_grace.grace_seconds,
+                        'players_count': len(game.players),
+                        'spectators_count': len(game.spectators)
                     }, room=game_id)
-                    
-                    del games[game_id]
                 else:
+                    game.hold_slot(request.sid)
                     emit('player_left', {
                         'player_name': player_name,
                         'players_count': len(game.players),
@@ -350,7 +569,8 @@ def ai_move_delayed(game_id, socketio):
     if not game.ai_enabled or game.game_over or game.current_player != 2:
         return
     
-    ai_col = game.ai.get_move(game.board, 2)
+    with AI_THINK_SECONDS.time(game.ai.difficulty):
+        ai_col = game.ai.get_move(game.board, 2)
     
     if ai_col is not None and game.drop_piece(ai_col, 2):
         row = None
@@ -378,8 +598,12 @@ def ai_move_delayed(game_id, socketio):
         else:
             game.current_player = 1
         
+        game_log.moved(game_id, game, ai_col, 2)
+        record_game_result(game_id, game)
+        
         def emit_state():
             if game_id in games:
                 socketio.emit('game_state', games[game_id].to_dict(), room=game_id)
         
+        BROADCAST_FANOUT.observe(len(game.players) + len(game.spectators))
         socketio.emit('game_state', game.to_dict(), room=game_id)
@@ -0,0 +1,27 @@
+from flask import Blueprint, request, jsonify
+from auth import token_required
+from leaderboard import leaderboard
+
+leaderboard_bp = Blueprint('leaderboard', __name__)
+
+@leaderboard_bp.route('/leaderboard', methods=['GET'])
+def get_leaderboard():
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    return jsonify({
+        'leaderboard': leaderboard.top(limit, offset),
+        'total': len(leaderboard)
+    })
+
+@leaderboard_bp.route('/leaderboard/me', methods=['GET'])
+@token_required
+def get_my_rank():
+    user_id = request.current_user['user_id']
+    
+    return jsonify({
+        'user_id': user_id,
+        'rank': leaderboard.rank(user_id),
+        'rating': leaderboard.get_rating(user_id),
+        'total': len(leaderboard)
+    })
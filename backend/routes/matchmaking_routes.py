@@ -0,0 +1,106 @@
+from flask import request
+from flask_socketio import emit
+import os
+import uuid
+import threading
+from matchmaking import matchmaking_queue
+from leaderboard import leaderboard, DEFAULT_RATING
+from ratelimit import socket_limiter
+from game import Puissance4
+from profiling import tracer
+from admin_feed import admin_feed
+from chat import chat_pipeline
+from event_log import game_log
+from migration import drain_controller
+from timer_wheel import timer_wheel
+from .game_routes import remove_game
+
+_ticker_lock = threading.Lock()
+_ticker_started = False
+
+def init_matchmaking_handlers(socketio, games, connected_users):
+    """Enregistre les événements de file d'attente et le tick d'appariement"""
+    tick_interval = float(os.getenv('MATCHMAKING_TICK_SECONDS', 1))
+    no_show_seconds = float(os.getenv('MATCHMAKING_NO_SHOW_SECONDS', 30))
+    
+    def create_match_room(first, second):
+        """Crée la partie d'une paire : les deux places sont réservées avant publication"""
+        game_id = str(uuid.uuid4())
+        game = Puissance4()
+        tokens = {
+            1: game.reserve_slot(1, first.name, first.user_id),
+            2: game.reserve_slot(2, second.name, second.user_id)
+        }
+        games[game_id] = game
+        admin_feed.game_created(game_id, game)
+        game_log.created(game_id, game)
+        chat_pipeline.open(game_id)
+        timer_wheel.schedule(no_show_seconds, expire_no_show, game_id)
+        
+        for number, entry, opponent in ((1, first, second), (2, second, first)):
+            socketio.emit('match_found', {
+                'game_id': game_id,
+                'player_number': number,
+                'slot_token': tokens[number],
+                'opponent': {'name': opponent.name, 'rating': opponent.rating}
+            }, to=entry.sid)
+    
+    def expire_no_show(game_id):
+        """Rappel de la roue : une place réservée jamais prise libère la salle de la paire"""
+        game = games.get(game_id)
+        if game is None or not any(not slot.get('held') for slot in game.reserved_slots.values()):
+            return
+        socketio.emit('game_ended', {
+            'reason': 'no_show',
+            'message': 'Adversaire absent : la partie est annulée.',
+            'redirect': True
+        }, room=game_id)
+        remove_game(games, game_id, 'no_show')
+    
+    def ticker():
+        while True:
+            socketio.sleep(tick_interval)
+            if drain_controller.draining:
+                continue
+            for first, second in matchmaking_queue.tick():
+                create_match_room(first, second)
+    
+    def ensure_ticker():
+        global _ticker_started
+        with _ticker_lock:
+            if not _ticker_started:
+                _ticker_started = True
+                socketio.start_background_task(ticker)
+    
+    @socketio.on('join_queue')
+    @tracer.traced('socket.join_queue')
+    def on_join_queue(data=None):
+        session = connected_users.get(request.sid, {})
+        user_id = session.get('user_id')
+        
+        if not socket_limiter.allow('join_queue', request.sid, user_id):
+            emit('error', {'message': 'Trop de requêtes, veuillez ralentir', 'rate_limited': True})
+            return
+        
+        if drain_controller.draining:
+            emit('error', {'message': 'Serveur en maintenance : aucune nouvelle partie pour le moment'})
+            return
+        
+        name = session.get('username') if user_id is not None else (data or {}).get('player_name', 'Anonyme')
+        rating = leaderboard.get_rating(user_id) if user_id is not None else DEFAULT_RATING
+        
+        ensure_ticker()
+        pairs = matchmaking_queue.enqueue(request.sid, rating, user_id=user_id, name=name)
+        if pairs is None:
+            emit('error', {'message': 'Vous êtes déjà dans la file d\'attente depuis une autre session'})
+            return
+        emit('queue_joined', {'rating': rating, 'queue_depth': len(matchmaking_queue)})
+        
+        for first, second in pairs:
+            create_match_room(first, second)
+    
+    @socketio.on('leave_queue')
+    @tracer.traced('socket.leave_queue')
+    def on_leave_queue(data=None):
+        if matchmaking_queue.remove(request.sid):
+            emit('queue_left', {'queue_depth': len(matchmaking_queue)})
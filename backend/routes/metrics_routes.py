@@ -0,0 +1,88 @@
+from flask import Blueprint, Response, request
+import os
+import threading
+from metrics import registry
+from chat import chat_pipeline
+from event_log import game_log
+from hashing import password_hasher
+from ratelimit import socket_limiter
+from matchmaking import matchmaking_queue
+from auth import auth_manager
+from sessions import reconnect_grace
+from parallel_search import parallel_search
+from position_cache import position_cache
+from tournament import tournament_manager
+from timer_wheel import timer_wheel
+from presence import presence
+
+metrics_bp = Blueprint('metrics', __name__)
+
+def init_metrics_routes(games, connected_users):
+    """Déclare les jauges calculées à la collecte à partir de l'état du serveur"""
+    registry.gauge('puissance4_active_games', 'Parties en mémoire', lambda: len(games))
+    registry.gauge('puissance4_connected_sids', 'Sockets connectés', lambda: len(connected_users))
+    registry.gauge('puissance4_spectators', 'Spectateurs toutes parties confondues',
+                   lambda: sum(len(game.spectators) for game in list(games.values())))
+    registry.gauge('puissance4_threads', 'Threads actifs du processus', threading.active_count)
+    registry.gauge('puissance4_executor_queue_depth', 'Travaux en attente par exécuteur',
+                   lambda: {
+                       'password_hash': password_hasher.pending(),
+                       'chat_writer': chat_pipeline.pending(),
+                       'event_log': game_log.pending()
+                   }, labels=('executor',))
+    registry.gauge('puissance4_matchmaking_queue_depth', 'Joueurs en file de matchmaking',
+                   lambda: len(matchmaking_queue))
+    registry.gauge('puissance4_socket_events_dropped_total', 'Événements Socket.IO rejetés par le limiteur',
+                   lambda: dict(socket_limiter.dropped), labels=('event',), kind='counter')
+    registry.gauge('puissance4_auth_cache_hits_total', 'Succès des caches d\'authentification',
+                   lambda: {
+                       'token': auth_manager.token_cache.hits,
+                       'admin': auth_manager.admin_cache.hits
+                   }, labels=('cache',), kind='counter')
+    registry.gauge('puissance4_auth_cache_misses_total', 'Échecs des caches d\'authentification',
+                   lambda: {
+                       'token': auth_manager.token_cache.misses,
+                       'admin': auth_manager.admin_cache.misses
+                   }, labels=('cache',), kind='counter')
+    registry.gauge('puissance4_reconnect_slots_pending', 'Places gardées en attente de reconnexion',
+                   lambda: reconnect_grace.stats()['pending'])
+    registry.gauge('puissance4_reconnect_slots_total', 'Places gardées après une déconnexion, par issue',
+                   lambda: {
+                       'held': reconnect_grace.held,
+                       'resumed': reconnect_grace.resumed,
+                       'expired': reconnect_grace.expired
+                   }, labels=('outcome',), kind='counter')
+    registry.gauge('puissance4_ai_parallel_busy_workers', 'Processus de recherche IA occupés',
+                   lambda: parallel_search.stats()['busy_workers'])
+    registry.gauge('puissance4_ai_searches_total', 'Recherches minimax par mode d\'exécution',
+                   lambda: {
+                       'parallel': parallel_search.parallel_searches,
+                       'sequential_fallback': parallel_search.sequential_fallbacks
+                   }, labels=('mode',), kind='counter')
+    registry.gauge('puissance4_ai_cache_hits_total', 'Coups de l\'IA servis par le cache de positions',
+                   lambda: position_cache.hits, kind='counter')
+    registry.gauge('puissance4_ai_cache_misses_total', 'Coups de l\'IA calculés faute d\'entrée en cache',
+                   lambda: position_cache.misses, kind='counter')
+    registry.gauge('puissance4_ai_cache_entries', 'Positions dans le cache des coups de l\'IA',
+                   lambda: len(position_cache))
+    registry.gauge('puissance4_event_log_commits_total', 'Écritures groupées (fsync) du journal des parties',
+                   lambda: game_log.commit_count, kind='counter')
+    registry.gauge('puissance4_timers_pending', 'Minuteurs programmés sur la roue (pendules, délais de grâce)',
+                   lambda: len(timer_wheel))
+    registry.gauge('puissance4_timers_fired_total', 'Minuteurs de la roue arrivés à échéance',
+                   lambda: timer_wheel.fired, kind='counter')
+    registry.gauge('puissance4_online_users', 'Utilisateurs authentifiés connectés (toutes sessions)',
+                   lambda: presence.stats()['online_users'])
+    registry.gauge('puissance4_tournament_games', 'Rencontres de tournoi par état',
+                   lambda: {
+                       'waiting_room': tournament_manager.stats()['rooms_waiting'],
+                       'in_progress': tournament_manager.stats()['games_in_progress']
+                   }, labels=('state',))
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    expected = os.getenv('METRICS_TOKEN')
+    if expected and request.headers.get('Authorization') != f'Bearer {expected}':
+        return Response('Accès refusé\n', status=403, mimetype='text/plain')
+    
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,181 @@
+from flask import Blueprint, request, jsonify
+import os
+import uuid
+from datetime import datetime, timedelta
+from game import Puissance4
+from database import db
+from presence import presence
+from auth import token_required
+from admin_feed import admin_feed
+from chat import chat_pipeline
+from event_log import game_log
+from timer_wheel import timer_wheel
+from migration import drain_controller
+
+social_bp = Blueprint('social', __name__)
+
+_games = None
+
+INVITATION_TTL_SECONDS = float(os.getenv('INVITATION_TTL_SECONDS', 300))
+
+def init_social_routes(socketio, games):
+    """Branche le service de présence et les invitations sur Socket.IO et les parties"""
+    global _games
+    _games = games
+    presence.attach(socketio)
+
+def discard_invitation_game(game_id, reason):
+    """Libère la salle d'une invitation restée sans joueur"""
+    game = _games.get(game_id) if game_id else None
+    if game is None or game.players or game.moves:
+        return
+    _games.pop(game_id, None)
+    admin_feed.game_removed(game_id, reason)
+    game_log.removed(game_id)
+
+def sweep_invitations():
+    """Rappel de la roue : expire les invitations échues (index partiel sur expires_at)"""
+    for invitation_id, from_user_id, to_user_id, game_id in db.expire_invitations():
+        discard_invitation_game(game_id, 'invitation_expired')
+        notice = {'invitation_id': invitation_id, 'game_id': game_id}
+        presence.send_to(from_user_id, 'invitation_expired', notice)
+        presence.send_to(to_user_id, 'invitation_expired', notice)
+
+@social_bp.route('/friends', methods=['GET'])
+@token_required
+def list_friends():
+    user_id = request.current_user['user_id']
+    friends = db.get_friendships(user_id)
+    for friend in friends:
+        if friend['status'] == 'accepted':
+            status = presence.status(friend['user_id'])
+            friend['presence'] = status['status']
+            friend['game_id'] = status['game_id']
+    return jsonify({'friends': friends})
+
+@social_bp.route('/friends', methods=['POST'])
+@token_required
+def add_friend():
+    user = request.current_user
+    target = db.find_user((request.get_json() or {}).get('username', ''))
+    if target is None:
+        return jsonify({'error': 'Utilisateur introuvable'}), 404
+    if target[0] == user['user_id']:
+        return jsonify({'error': 'Impossible de vous ajouter vous-même'}), 400
+    
+    status = db.create_friend_request(user['user_id'], target[0])
+    if status is None:
+        return jsonify({'error': 'Déjà amis ou demande déjà envoyée'}), 409
+    
+    if status == 'accepted':
+        # Demande croisée : l'autre avait déjà demandé, l'amitié est acceptée
+        presence.add_friendship(user['user_id'], target[0])
+    else:
+        presence.send_to(target[0], 'friend_request', {'user_id': user['user_id'], 'username': user['username']})
+    return jsonify({'user_id': target[0], 'username': target[1], 'status': status}), 201
+
+@social_bp.route('/friends/<int:friend_id>/accept', methods=['POST'])
+@token_required
+def accept_friend(friend_id):
+    user_id = request.current_user['user_id']
+    if not db.accept_friend_request(user_id, friend_id):
+        return jsonify({'error': 'Aucune demande en attente'}), 404
+    
+    presence.add_friendship(user_id, friend_id)
+    return jsonify({'message': 'Demande acceptée'})
+
+@social_bp.route('/friends/<int:friend_id>', methods=['DELETE'])
+@token_required
+def remove_friend(friend_id):
+    user_id = request.current_user['user_id']
+    if not db.delete_friendship(user_id, friend_id):
+        return jsonify({'error': 'Ami introuvable'}), 404
+    
+    presence.remove_friendship(user_id, friend_id)
+    return jsonify({'message': 'Ami retiré'})
+
+@social_bp.route('/invitations', methods=['GET'])
+@token_required
+def list_invitations():
+    return jsonify({'invitations': db.get_pending_invitations(request.current_user['user_id'])})
+
+@social_bp.route('/invitations', methods=['POST'])
+@token_required
+def send_invitation():
+    if drain_controller.draining:
+        return jsonify({'error': 'Serveur en maintenance : aucune nouvelle partie pour le moment'}), 503
+    
+    user = request.current_user
+    data = request.get_json() or {}
+    friend_id = data.get('user_id')
+    if friend_id not in db.get_friend_ids(user['user_id']):
+        return jsonify({'error': 'Vous ne pouvez inviter que vos amis'}), 403
+    
+    friend = db.get_user_by_id(friend_id)
+    game_id = str(uuid.uuid4())
+    game = Puissance4()
+    slot_token = game.reserve_slot(1, user['username'], user['user_id'])
+    game.reserve_slot(2, friend['username'], friend_id)
+    _games[game_id] = game
+    admin_feed.game_created(game_id, game)
+    game_log.created(game_id, game)
+    chat_pipeline.open(game_id)
+    
+    message = (data.get('message') or '')[:200] or None
+    expires_at = (datetime.utcnow() + timedelta(seconds=INVITATION_TTL_SECONDS)).strftime('%Y-%m-%d %H:%M:%S')
+    invitation_id = db.create_invitation(user['user_id'], friend_id, game_id, message, expires_at)
+    # La roue déclenche le balayage à l'échéance ; il expire aussi les invitations en retard
+    timer_wheel.schedule(INVITATION_TTL_SECONDS + 1, sweep_invitations)
+    
+    presence.send_to(friend_id, 'game_invitation', {
+        'invitation_id': invitation_id,
+        'from_user_id': user['user_id'],
+        'from_username': user['username'],
+        'game_id': game_id,
+        'message': message,
+        'expires_at': expires_at
+    })
+    return jsonify({
+        'invitation_id': invitation_id,
+        'game_id': game_id,
+        'player_number': 1,
+        'slot_token': slot_token,
+        'expires_at': expires_at
+    }), 201
+
+@social_bp.route('/invitations/<int:invitation_id>/accept', methods=['POST'])
+@token_required
+def accept_invitation(invitation_id):
+    user = request.current_user
+    answered = db.answer_invitation(invitation_id, user['user_id'], 'accepted')
+    if answered is None:
+        return jsonify({'error': 'Invitation introuvable ou expirée'}), 404
+    
+    from_user_id, game_id = answered
+    slot = _games[game_id].reserved_slots.get(2) if game_id in _games else None
+    if slot is None:
+        return jsonify({'error': 'La partie n\'existe plus'}), 410
+    
+    presence.send_to(from_user_id, 'invitation_accepted', {
+        'invitation_id': invitation_id,
+        'game_id': game_id,
+        'username': user['username']
+    })
+    return jsonify({'game_id': game_id, 'player_number': 2, 'slot_token': slot['token']})
+
+@social_bp.route('/invitations/<int:invitation_id>/decline', methods=['POST'])
+@token_required
+def decline_invitation(invitation_id):
+    user = request.current_user
+    answered = db.answer_invitation(invitation_id, user['user_id'], 'declined')
+    if answered is None:
+        return jsonify({'error': 'Invitation introuvable ou expirée'}), 404
+    
+    from_user_id, game_id = answered
+    discard_invitation_game(game_id, 'invitation_declined')
+    presence.send_to(from_user_id, 'invitation_declined', {
+        'invitation_id': invitation_id,
+        'game_id': game_id,
+        'username': user['username']
+    })
+    return jsonify({'message': 'Invitation refusée'})
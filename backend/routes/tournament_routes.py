@@ -0,0 +1,172 @@
+from flask import Blueprint, request, jsonify
+from flask_socketio import emit, join_room
+import os
+import uuid
+import threading
+from game import Puissance4
+from tournament import tournament_manager, FORMATS
+from leaderboard import leaderboard
+from auth import token_required, admin_required
+from profiling import tracer
+from admin_feed import admin_feed
+from chat import chat_pipeline
+from event_log import game_log
+from migration import drain_controller
+from .game_routes import remove_game
+
+tournament_bp = Blueprint('tournament', __name__)
+
+_socketio = None
+_games = None
+_ticker_lock = threading.Lock()
+_ticker_started = False
+
+def open_room(match):
+    """Crée la salle d'une rencontre : les deux places sont réservées avant publication"""
+    game_id = str(uuid.uuid4())
+    game = Puissance4()
+    tokens = {number: game.reserve_slot(number, entrant.name, entrant.user_id)
+              for number, entrant in match.players.items()}
+    _games[game_id] = game
+    admin_feed.game_created(game_id, game)
+    game_log.created(game_id, game)
+    chat_pipeline.open(game_id)
+    tournament_manager.opened(match, game_id, tokens)
+
+def forfeit_no_show(game_id):
+    """Rencontre non disputée à l'échéance : le joueur présent l'emporte"""
+    game = _games.get(game_id)
+    if game is None:
+        tournament_manager.game_finished(game_id, None, 'forfeit')
+        return
+    # Partie commencée, ou pendule lancée (les deux joueurs sont là) : la pendule tranchera
+    if any(cell for row in game.board for cell in row) or (game.clock and game.clock.running is not None):
+        return
+    
+    seated = [player['number'] for player in game.players.values()]
+    winner = seated[0] if len(seated) == 1 else None
+    game.game_over = True
+    _socketio.emit('game_ended', {
+        'reason': 'no_show',
+        'message': 'Adversaire absent : la rencontre est déclarée forfait.',
+        'redirect': True
+    }, room=game_id)
+    remove_game(_games, game_id, 'no_show', winner)
+
+def ensure_ticker():
+    """Démarre (une seule fois) le tick qui ouvre les salles par vagues et applique les forfaits"""
+    global _ticker_started
+    with _ticker_lock:
+        if _ticker_started:
+            return
+        _ticker_started = True
+    
+    tick_interval = float(os.getenv('TOURNAMENT_TICK_SECONDS', 1))
+    
+    def ticker():
+        while True:
+            _socketio.sleep(tick_interval)
+            if not drain_controller.draining:
+                for match in tournament_manager.next_wave():
+                    open_room(match)
+            for game_id in tournament_manager.pop_no_shows():
+                forfeit_no_show(game_id)
+    
+    _socketio.start_background_task(ticker)
+
+@tournament_bp.route('/tournaments', methods=['GET'])
+def list_tournaments():
+    return jsonify({'tournaments': tournament_manager.list()})
+
+@tournament_bp.route('/tournaments', methods=['POST'])
+@admin_required
+def create_tournament():
+    data = request.get_json() or {}
+    name = (data.get('name') or '').strip()
+    format = data.get('format', 'swiss')
+    rounds = data.get('rounds')
+    
+    if not name:
+        return jsonify({'error': 'Nom du tournoi requis'}), 400
+    if format not in FORMATS:
+        return jsonify({'error': f"Format inconnu (valeurs possibles : {', '.join(FORMATS)})"}), 400
+    if rounds is not None and (not isinstance(rounds, int) or rounds < 1):
+        return jsonify({'error': 'Nombre de manches invalide'}), 400
+    
+    tournament = tournament_manager.create(name, format, rounds, request.current_user['user_id'])
+    return jsonify(tournament.summary()), 201
+
+@tournament_bp.route('/tournaments/<tournament_id>', methods=['GET'])
+def get_tournament(tournament_id):
+    tournament = tournament_manager.get(tournament_id)
+    if tournament is None:
+        return jsonify({'error': 'Tournoi introuvable'}), 404
+    
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    return jsonify(dict(tournament.summary(),
+                        standings=[e.to_dict() for e in tournament.standings(limit, offset)]))
+
+@tournament_bp.route('/tournaments/<tournament_id>/register', methods=['POST'])
+@token_required
+def register_tournament(tournament_id):
+    if tournament_manager.get(tournament_id) is None:
+        return jsonify({'error': 'Tournoi introuvable'}), 404
+    
+    user = request.current_user
+    error = tournament_manager.register(tournament_id, user['user_id'], user['username'],
+                                        leaderboard.get_rating(user['user_id']))
+    if error:
+        return jsonify({'error': error}), 409
+    return jsonify({'message': 'Inscription confirmée'})
+
+@tournament_bp.route('/tournaments/<tournament_id>/register', methods=['DELETE'])
+@token_required
+def withdraw_tournament(tournament_id):
+    if tournament_manager.get(tournament_id) is None:
+        return jsonify({'error': 'Tournoi introuvable'}), 404
+    
+    error = tournament_manager.withdraw(tournament_id, request.current_user['user_id'])
+    if error:
+        return jsonify({'error': error}), 409
+    return jsonify({'message': 'Désinscription confirmée'})
+
+@tournament_bp.route('/tournaments/<tournament_id>/start', methods=['POST'])
+@admin_required
+def start_tournament(tournament_id):
+    if tournament_manager.get(tournament_id) is None:
+        return jsonify({'error': 'Tournoi introuvable'}), 404
+    if drain_controller.draining:
+        return jsonify({'error': 'Serveur en maintenance : aucune nouvelle partie pour le moment'}), 503
+    
+    error = tournament_manager.start(tournament_id)
+    if error:
+        return jsonify({'error': error}), 409
+    ensure_ticker()
+    return jsonify(tournament_manager.get(tournament_id).summary())
+
+def init_tournament_handlers(socketio, games, connected_users):
+    """Enregistre les événements de tournoi ; le tick démarre avec le premier tournoi"""
+    global _socketio, _games
+    _socketio = socketio
+    _games = games
+    tournament_manager.attach(socketio)
+    
+    @socketio.on('watch_tournament')
+    @tracer.traced('socket.watch_tournament')
+    def on_watch_tournament(data):
+        tournament = tournament_manager.get((data or {}).get('tournament_id'))
+        if tournament is None:
+            emit('error', {'message': 'Tournoi introuvable'})
+            return
+        
+        join_room(f'tournament:{tournament.id}')
+        user_id = connected_users.get(request.sid, {}).get('user_id')
+        pending = tournament_manager.watch(tournament.id, user_id, request.sid) if user_id is not None else None
+        
+        emit('tournament_state', dict(
+            tournament.summary(),
+            standings=[e.to_dict() for e in tournament.standings(tournament_manager.standings_size)]
+        ))
+        if pending:
+            emit('tournament_match', pending)
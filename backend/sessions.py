@@ -0,0 +1,72 @@
+import os
+import heapq
+import threading
+import time
+
+
+class ReconnectGrace:
+    """Délai de grâce des joueurs déconnectés d'une partie multijoueur
+
+    La place d'un joueur dont le socket tombe est gardée (place réservée
+    avec son jeton de reprise) pendant `RECONNECT_GRACE_SECONDS`. Les
+    échéances sont rangées dans un tas, dépilé par un minuteur de la roue
+    de temporisation à leur terme ; les places reprises entre-temps sont
+    ignorées.
+    """
+
+    def __init__(self, grace_seconds=None):
+        self.grace_seconds = grace_seconds if grace_seconds is not None \
+            else float(os.getenv('RECONNECT_GRACE_SECONDS', 30))
+        self._deadlines = []
+        self._lock = threading.Lock()
+        self.held = 0
+        self.resumed = 0
+        self.expired = 0
+
+    @property
+    def enabled(self):
+        return self.grace_seconds > 0
+
+    def schedule(self, game_id, number, token, now=None):
+        """Programme l'expiration de la place gardée ; retourne l'échéance"""
+        deadline = (time.monotonic() if now is None else now) + self.grace_seconds
+        with self._lock:
+            heapq.heappush(self._deadlines, (deadline, game_id, number, token))
+            self.held += 1
+        return deadline
+
+    def mark_resumed(self):
+        """Compte une reprise de place par son joueur"""
+        with self._lock:
+            self.resumed += 1
+
+    def pop_expired(self, games, now=None):
+        """Retourne [(game_id, game, place)] des places gardées dont le délai est écoulé"""
+        now = time.monotonic() if now is None else now
+        expired = []
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] <= now:
+                _, game_id, number, token = heapq.heappop(self._deadlines)
+                game = games.get(game_id)
+                slot = game.reserved_slots.get(number) if game else None
+                # Place reprise (ou partie disparue) depuis la programmation
+                if slot is None or slot['token'] != token:
+                    continue
+                del game.reserved_slots[number]
+                self.expired += 1
+                expired.append((game_id, game, slot))
+        return expired
+
+    def stats(self):
+        with self._lock:
+            return {
+                'grace_seconds': self.grace_seconds,
+                'pending': len(self._deadlines),
+                'held_total': self.held,
+                'resumed_total': self.resumed,
+                'expired_total': self.expired
+            }
+
+
+# Instance globale du délai de grâce de reconnexion
+reconnect_grace = ReconnectGrace()
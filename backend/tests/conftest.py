@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Les instances globales (base SQLite, journal des parties, instantané) s'ouvrent
+# dans le répertoire courant : les tests tournent dans un répertoire jetable
+os.chdir(tempfile.mkdtemp(prefix='puissance4-tests-'))
+os.environ.setdefault('SOCKET_RATE_LIMIT_ENABLED', 'false')
+os.environ.setdefault('TIMER_WHEEL_TICK_MS', '10')
+os.environ.setdefault('PASSWORD_HASH_ITERATIONS', '1000')
+
+
+@pytest.fixture
+def database(tmp_path):
+    from database import Database
+    return Database(str(tmp_path / 'test.db'))
+
+
+@pytest.fixture(scope='session')
+def server():
+    """Application complète (Flask + Socket.IO) et compte administrateur"""
+    import app
+    app.init_admin_user()
+    return app
+
+
+@pytest.fixture
+def http(server):
+    return server.app.test_client()
+
+
+def login(http, username, password='secret123', register=True):
+    if register:
+        http.post('/api/register', json={'username': username, 'email': f'{username}@test.local', 'password': password})
+    return http.post('/api/login', json={'username': username, 'password': password}).get_json()['token']
+
+
+def admin_headers(http):
+    return {'Authorization': 'Bearer ' + login(http, 'admin', 'admin1234', register=False)}
+
+
+def received(client, event):
+    return [message['args'][0] for message in client.get_received() if message['name'] == event]
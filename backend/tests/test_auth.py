@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta
+import jwt
+from auth import AuthManager
+
+
+def test_token_round_trip_and_cache():
+    manager = AuthManager('clé-de-test')
+    token = manager.generate_token({'id': 7, 'username': 'alice'})
+    assert manager.get_user_from_token(token) == {'user_id': 7, 'username': 'alice'}
+    assert manager.token_cache.get(token)['user_id'] == 7
+    assert manager.verify_token(token + 'x') is None
+    assert AuthManager('autre-clé').verify_token(token) is None
+
+
+def test_expired_token_is_rejected():
+    manager = AuthManager('clé-de-test')
+    token = jwt.encode({'user_id': 7, 'username': 'alice', 'exp': datetime.utcnow() - timedelta(seconds=1)},
+                       'clé-de-test', algorithm='HS256')
+    assert manager.verify_token(token) is None
@@ -0,0 +1,40 @@
+from chat import ChatPipeline
+
+
+def test_open_buffer_serves_history(database):
+    pipeline = ChatPipeline(database, flush_interval=0.01, buffer_size=3)
+    pipeline.open('g1')
+    assert pipeline.get_recent('g1') == []
+    for i in range(2):
+        pipeline.submit('g1', None, 'Invité', None, f'message {i}', True)
+    assert [m['message'] for m in pipeline.get_recent('g1')] == ['message 0', 'message 1']
+
+
+def test_incomplete_buffer_falls_back_to_database(database):
+    pipeline = ChatPipeline(database, flush_interval=0.01, buffer_size=3)
+    # Tampon recréé (éviction ou redémarrage) : il ne contient pas tout le chat
+    pipeline.submit('g1', None, 'Invité', None, 'après redémarrage', True)
+    assert pipeline.get_recent('g1') is None
+
+    pipeline.open('g2')
+    for i in range(5):
+        pipeline.submit('g2', None, 'Invité', None, f'message {i}', True)
+    assert [m['message'] for m in pipeline.get_recent('g2', limit=3)] == ['message 2', 'message 3', 'message 4']
+    assert pipeline.get_recent('g2', limit=10) is None
+
+
+def test_lru_eviction(database):
+    pipeline = ChatPipeline(database, max_games=2)
+    for game_id in ('g1', 'g2', 'g3'):
+        pipeline.open(game_id)
+    assert pipeline.get_recent('g1') is None
+    assert pipeline.get_recent('g3') == []
+
+
+def test_flush_persists_everything_submitted(database):
+    pipeline = ChatPipeline(database, flush_interval=0.05, batch_size=7)
+    for i in range(50):
+        pipeline.submit('g1', 1, 'alice', None, f'message {i}')
+    pipeline.flush()
+    history = database.get_chat_history('g1', limit=100)
+    assert len(history) == 50 and pipeline.persisted_count == 50
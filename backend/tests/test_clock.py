@@ -0,0 +1,31 @@
+from clock import GameClock
+
+
+def test_switch_counts_elapsed_and_increment():
+    clock = GameClock(60, 5)
+    clock.start(1, now=0)
+    assert clock.left(1, now=10) == 50
+    clock.switch(now=10)
+    assert clock.remaining[1] == 55
+    assert clock.running == 2
+    assert clock.left(2, now=70) == 0
+    assert clock.flagged(now=70) == 2
+    assert clock.flagged(now=69) is None
+
+
+def test_stop_pauses_time():
+    clock = GameClock(60)
+    clock.start(1, now=0)
+    clock.stop(now=20)
+    assert clock.running is None
+    assert clock.left(1, now=1000) == 40
+
+
+def test_snapshot_round_trip_restarts_running_clock():
+    clock = GameClock(60, 2)
+    clock.start(2, now=0)
+    data = clock.snapshot(now=15)
+    restored = GameClock.from_snapshot(data)
+    assert restored.running == 2
+    assert restored.remaining == {1: 60, 2: 45}
+    assert (restored.initial, restored.increment) == (60, 2)
@@ -0,0 +1,98 @@
+import sqlite3
+from datetime import datetime
+
+
+def make_users(database, *names):
+    return [database.create_user(name, f'{name}@test.local', 'secret123') for name in names]
+
+
+def count(database, query, *params):
+    conn = sqlite3.connect(database.db_path)
+    value = conn.execute(query, params).fetchone()[0]
+    conn.close()
+    return value
+
+
+def test_authenticate_user(database):
+    user_id, = make_users(database, 'alice')
+    assert database.authenticate_user('alice', 'secret123')['id'] == user_id
+    assert database.authenticate_user('alice', 'wrong') is None
+
+
+def test_bulk_delete_removes_users_and_their_data(database):
+    alice, bob, carol = make_users(database, 'alice', 'bob', 'carol')
+    database.save_game_result('g1', alice, bob, 'alice', 'bob', alice, moves_count=7, winner=1)
+    database.save_game_result('g2', bob, carol, 'bob', 'carol', carol, moves_count=9, winner=2)
+    database.save_chat_message('g1', alice, 'alice', bob, 'bonjour')
+    database.create_friend_request(alice, carol)
+
+    assert database.delete_users([alice, bob], chunk_size=1) == 2
+    assert count(database, 'SELECT COUNT(*) FROM users') == 1
+    assert count(database, 'SELECT COUNT(*) FROM game_history') == 0
+    assert count(database, 'SELECT COUNT(*) FROM chat_messages') == 0
+    assert count(database, 'SELECT COUNT(*) FROM friendships') == 0
+    assert database.get_stats()['overall']['games'] == 0
+
+
+def test_bulk_delete_never_touches_admins(database):
+    alice, = make_users(database, 'alice')
+    admin = database.create_admin_user('root', 'root@test.local', 'secret123')
+    database.save_game_result('g1', admin, None, 'root', 'IA', admin, game_mode='ai', winner=1)
+    database.save_chat_message('g2', admin, 'root', None, 'annonce')
+
+    assert database.delete_users([admin, alice]) == 1
+    assert database.get_user_by_id(admin) is not None
+    assert count(database, 'SELECT COUNT(*) FROM game_history') == 1
+    assert count(database, 'SELECT COUNT(*) FROM chat_messages') == 1
+    assert database.find_user_ids({}) == []
+
+    # delete_user garde sa sémantique : n'importe quel compte, admin compris
+    assert database.delete_user(admin)
+    assert database.get_user_by_id(admin) is None
+
+
+def test_stats_rollup_matches_rebuild(database):
+    alice, bob = make_users(database, 'alice', 'bob')
+    database.save_game_result('g1', alice, bob, 'alice', 'bob', alice, moves_count=7, winner=1)
+    database.save_game_result('g2', alice, bob, 'alice', 'bob', None, moves_count=42, winner=0)
+    database.save_game_result('g3', alice, None, 'alice', 'IA', None, game_mode='ai', moves_count=10,
+                              winner=2, ai_difficulty='hard')
+    database.delete_game('g1')
+
+    incremental = database.get_stats()
+    assert database.rebuild_stats(chunk_size=1) == 2
+    assert database.get_stats() == incremental
+
+    overall = incremental['overall']
+    assert (overall['games'], overall['draws'], overall['player2_wins']) == (2, 1, 1)
+    assert incremental['ai_by_difficulty']['hard']['ai_win_rate'] == 1.0
+    today = datetime.now().strftime('%Y-%m-%d')
+    assert incremental['per_day'] == [{'day': today, 'games': 2, 'avg_moves': 26.0}]
+    assert database.get_stats(since='2000-01-01', until='2000-01-02')['overall']['games'] == 0
+
+
+def test_chat_history_returns_last_messages_in_order(database):
+    database.save_chat_messages([
+        ('g1', None, 'Invité', None, f'message {i}', True, f'2024-01-01 00:00:{i:02d}') for i in range(10)
+    ])
+    history = database.get_chat_history('g1', limit=3)
+    assert [message['message'] for message in history] == ['message 7', 'message 8', 'message 9']
+
+
+def test_search_chat_and_users(database):
+    alice, bob = make_users(database, 'alice', 'bob')
+    database.save_chat_message('g1', alice, 'alice', None, 'quelle belle partie')
+    database.save_chat_message('g2', bob, 'bob', None, 'partie nulle, revanche ?')
+    database.save_chat_message('g2', bob, 'bob', None, 'bonne nuit')
+
+    messages, more = database.search_chat('parti')
+    assert {message['game_id'] for message in messages} == {'g1', 'g2'} and not more
+    messages, more = database.search_chat('partie', limit=1, order='recent')
+    assert messages[0]['game_id'] == 'g2' and more
+    assert database.search_chat('partie', sender_id=alice)[0][0]['sender_id'] == alice
+    assert database.search_chat('"') == ([], False)
+
+    users, _ = database.search_users('ali')
+    assert [user['id'] for user in users] == [alice]
+    database.delete_user(alice)
+    assert database.search_users('ali') == ([], False)
@@ -0,0 +1,35 @@
+from event_log import GameEventLog
+from game import Puissance4
+
+
+def test_replay_rebuilds_live_games_only(tmp_path):
+    log = GameEventLog(directory=str(tmp_path), flush_interval=0.005)
+    live, gone = Puissance4(), Puissance4()
+    log.created('live', live)
+    log.seated('live', 1, 'alice', 7, 'jeton')
+    for col in (0, 1, 0):
+        player = live.current_player
+        live.drop_piece(col, player)
+        live.current_player = 3 - player
+        log.moved('live', live, col, player)
+    log.created('gone', gone)
+    log.ended('gone', 2)
+    log.removed('gone')
+    log.flush()
+
+    games = {}
+    assert GameEventLog(directory=str(tmp_path)).replay(games) == 1
+    assert games['live'].board == live.board
+    assert games['live'].current_player == 2
+    assert games['live'].resume_slot(token='jeton') == 1
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    log = GameEventLog(directory=str(tmp_path))
+    log.created('g1', Puissance4())
+    log.flush()
+    with open(log._segment_path(log._segment), 'a') as f:
+        f.write('[1.0,"g1","mo')
+
+    games = {}
+    assert GameEventLog(directory=str(tmp_path)).replay(games) == 1
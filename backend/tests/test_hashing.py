@@ -0,0 +1,38 @@
+import threading
+from hashing import PasswordHasher
+
+
+def test_hash_and_verify_formats(monkeypatch):
+    monkeypatch.setenv('PASSWORD_HASH_ITERATIONS', '1000')
+    hasher = PasswordHasher()
+    hashed = hasher.hash('secret123')
+    assert hashed.startswith('pbkdf2_sha256$1000$')
+    assert hasher.verify('secret123', hashed)
+    assert not hasher.verify('wrong', hashed)
+    assert not hasher.verify('secret123', 'garbage')
+    assert not hasher.needs_rehash(hashed)
+
+    monkeypatch.setenv('PASSWORD_HASH_SCHEME', 'scrypt')
+    monkeypatch.setenv('PASSWORD_SCRYPT_N', '1024')
+    scrypt_hasher = PasswordHasher()
+    assert scrypt_hasher.needs_rehash(hashed)
+    assert scrypt_hasher.verify('secret123', hashed)
+    assert scrypt_hasher.verify('secret123', scrypt_hasher.hash('secret123'))
+
+
+def test_rehash_in_background(monkeypatch):
+    monkeypatch.setenv('PASSWORD_HASH_ITERATIONS', '1000')
+    hasher = PasswordHasher()
+    done = threading.Event()
+    result = []
+    assert hasher.rehash_in_background('secret123', lambda hashed: (result.append(hashed), done.set()))
+    assert done.wait(5)
+    assert hasher.verify('secret123', result[0])
+
+
+def test_rehash_skipped_when_saturated(monkeypatch):
+    monkeypatch.setenv('LOGIN_MAX_CONCURRENCY', '1')
+    hasher = PasswordHasher()
+    hasher._slots.acquire()
+    # La migration est abandonnée sans lever HasherBusy : la connexion n'échoue pas
+    assert hasher.rehash_in_background('secret123', lambda hashed: None) is False
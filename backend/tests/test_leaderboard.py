@@ -0,0 +1,29 @@
+from leaderboard import elo_update, Leaderboard
+
+
+def test_elo_equal_ratings():
+    assert elo_update(1200, 1200, 1) == (1220.0, 1180.0)
+    assert elo_update(1200, 1200, 0.5) == (1200.0, 1200.0)
+
+
+def test_elo_established_players_use_lower_k():
+    assert elo_update(1200, 1200, 1, games_a=30, games_b=30) == (1210.0, 1190.0)
+
+
+def test_elo_upset_moves_more_points():
+    upset, _ = elo_update(1000, 1400, 1)
+    expected, _ = elo_update(1400, 1000, 1)
+    assert upset - 1000 > expected - 1400
+
+
+def test_rank_and_top():
+    board = Leaderboard()
+    board._loaded = True
+    for user_id, rating in ((1, 1300), (2, 1500), (3, 1400)):
+        board.update(user_id, rating, f'u{user_id}')
+    assert [entry['user_id'] for entry in board.top(3)] == [2, 3, 1]
+    assert board.rank(1) == 3
+    board.update(1, 1600)
+    assert board.rank(1) == 1
+    board.remove(2)
+    assert len(board) == 2
@@ -0,0 +1,46 @@
+from matchmaking import MatchmakingQueue
+
+
+def pair_ratings(pairs):
+    return [sorted((left.rating, right.rating)) for left, right in pairs]
+
+
+def test_close_ratings_pair_immediately():
+    queue = MatchmakingQueue(base_band=50, widen_rate=10, max_band=400)
+    assert queue.enqueue('a', 1200, now=0) == []
+    assert pair_ratings(queue.enqueue('b', 1240, now=0)) == [[1200, 1240]]
+    assert len(queue) == 0
+
+
+def test_band_widens_with_waiting_time():
+    queue = MatchmakingQueue(base_band=50, widen_rate=10, max_band=400)
+    queue.enqueue('a', 1000, now=0)
+    assert queue.enqueue('b', 1150, now=0) == []
+    assert queue.tick(now=9.9) == []
+    assert pair_ratings(queue.tick(now=10)) == [[1000, 1150]]
+
+
+def test_gap_beyond_max_band_never_pairs():
+    queue = MatchmakingQueue(base_band=50, widen_rate=10, max_band=400)
+    queue.enqueue('a', 1000, now=0)
+    queue.enqueue('b', 1500, now=0)
+    assert queue.tick(now=10 ** 6) == []
+    assert queue.remove('a') and not queue.remove('a')
+
+
+def test_one_entry_per_account():
+    queue = MatchmakingQueue()
+    assert queue.enqueue('sid-1', 1200, user_id=7, now=0) == []
+    assert queue.enqueue('sid-2', 1200, user_id=7, now=0) is None
+    assert len(queue) == 1
+    queue.remove('sid-1')
+    assert queue.enqueue('sid-2', 1200, user_id=7, now=0) == []
+
+
+def test_removed_neighbour_reconnects_pairs():
+    queue = MatchmakingQueue(base_band=50, widen_rate=10, max_band=400)
+    queue.enqueue('a', 1000, now=0)
+    queue.enqueue('b', 1200, now=0)
+    queue.enqueue('c', 1100, now=0)
+    queue.remove('c')
+    assert pair_ratings(queue.tick(now=15)) == [[1000, 1200]]
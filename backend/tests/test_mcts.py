@@ -0,0 +1,72 @@
+import numpy as np
+from ai import PuissanceAI
+from mcts import MCTSSearch, random_playouts, _Node
+
+# Plateau plein sans alignement : rangées alternées 1122112 / 2211221
+DRAWN = np.array([[1, 1, 2, 2, 1, 1, 2] if row % 2 == 0 else [2, 2, 1, 1, 2, 2, 1] for row in range(6)],
+                 dtype=np.int8)
+
+
+def empty_board():
+    return [[0] * 7 for _ in range(6)]
+
+
+def play(board, *moves):
+    ai = PuissanceAI()
+    for col, player in moves:
+        board = ai._simulate_move(board, col, player)
+    return board
+
+
+def search():
+    # Plafond de parties atteint bien avant le budget de temps : résultat reproductible
+    return MCTSSearch(budget_ms=60000, max_playouts=4096, seed=7)
+
+
+def test_random_playouts_report_wins_and_draws():
+    rng = np.random.default_rng(7)
+    almost_drawn = DRAWN.copy()
+    almost_drawn[0, 6] = 0
+    assert random_playouts(almost_drawn[np.newaxis].repeat(5, axis=0), 2, rng).tolist() == [0] * 5
+
+    winners = random_playouts(np.zeros((200, 6, 7), dtype=np.int8), 1, rng)
+    assert set(winners.tolist()) <= {0, 1, 2}
+    assert (winners == 1).sum() > (winners == 2).sum()
+
+
+def test_terminal_and_draw_backpropagation():
+    root = _Node(DRAWN.copy(), 1)
+    assert root.terminal and root.winner == 0
+
+    parent = _Node(np.zeros((6, 7), dtype=np.int8), 1)
+    child = parent.child_for(3)
+    search()._backpropagate(child, np.array([0, 0, 1, 2], dtype=np.int8))
+    # Points du joueur qui vient de jouer : nuls à 0,5 pour chacun
+    assert child.wins == 2.0
+    assert parent.wins == 2.0
+
+
+def test_immediate_win_is_played():
+    board = play(empty_board(), (0, 2), (6, 1), (1, 2), (6, 1), (2, 2), (5, 1))
+    assert search().get_move(board, 2) == 3
+
+
+def test_forced_block_is_played():
+    board = play(empty_board(), (0, 1), (6, 2), (1, 1), (6, 2), (2, 1))
+    assert search().get_move(board, 2) == 3
+
+
+def test_tree_is_reused_two_plies_later():
+    mcts = search()
+    board = play(empty_board(), (3, 1))
+    col = mcts.get_move(board, 2)
+    assert mcts.reused_visits == 0
+
+    board = play(board, (col, 2), (3, 1))
+    mcts.get_move(board, 2)
+    assert mcts.reused_visits > 0
+    assert mcts.root.parent is None
+
+
+def test_terminal_position_has_no_move():
+    assert search().get_move(DRAWN.tolist(), 1) is None
@@ -0,0 +1,41 @@
+from game import Puissance4
+from migration import DrainController
+
+
+def play(game, *cols):
+    for col in cols:
+        player = game.current_player
+        game.drop_piece(col, player)
+        game.current_player = 3 - player
+
+
+def test_snapshot_round_trip():
+    game = Puissance4()
+    game.players['sid-a'] = {'number': 1, 'name': 'alice', 'user_id': 7}
+    token = game.session_token('sid-a')
+    game.reserve_slot(2, 'bob')
+    play(game, 3, 3, 4)
+    game.update_score(1)
+
+    restored = Puissance4.from_snapshot(game.snapshot())
+    assert restored.board == game.board
+    assert restored.moves == game.moves
+    assert restored.current_player == 2
+    assert restored.global_score == game.global_score
+    # Le joueur connecté redevient une place gardée, réclamable avec son jeton
+    assert restored.resume_slot(token=token) == 1
+    assert restored.claim_slot(token=game.reserved_slots[2]['token']) == 2
+
+
+def test_drain_snapshot_restore(tmp_path):
+    path = str(tmp_path / 'snapshot.json')
+    controller = DrainController(path)
+    game = Puissance4()
+    play(game, 2, 5)
+    controller.snapshot({'g1': game})
+
+    games = {}
+    assert controller.restore(games) == 1
+    assert games['g1'].board == game.board
+    # L'instantané est renommé : pas de double restauration
+    assert controller.restore({}) == 0
@@ -0,0 +1,89 @@
+import threading
+import pytest
+from ai import PuissanceAI
+from parallel_search import ParallelSearch, position_key, _SharedSearch, EXACT
+
+# Positions jouées colonne par colonne depuis le plateau vide, joueur 1 en premier
+OPENINGS = ['', '3', '33', '3324', '332415', '0123456', '3344226', '33332222', '6543210123']
+
+
+def board_after(columns):
+    ai = PuissanceAI('hard')
+    board = [[0] * 7 for _ in range(6)]
+    for index, col in enumerate(columns):
+        board = ai._simulate_move(board, int(col), index % 2 + 1)
+    return board
+
+
+@pytest.fixture(scope='module')
+def search():
+    search = ParallelSearch(workers=2, move_workers=2, min_depth=1, tt_size=1 << 16)
+    yield search
+    if search._executor is not None:
+        search._executor.shutdown()
+
+
+def test_position_key_distinguishes_player_and_stones():
+    board = board_after('33')
+    assert position_key(board, 1) != position_key(board, 2)
+    assert position_key(board_after('34'), 2) != position_key(board_after('43'), 2)
+
+
+@pytest.mark.parametrize('depth', [4, 5])
+def test_same_move_as_sequential_search(search, depth):
+    # La table de transposition est partagée d'une recherche à l'autre : ses entrées ne doivent jamais
+    # changer le résultat d'une recherche ultérieure
+    for columns in OPENINGS:
+        board = board_after(columns)
+        player = len(columns) % 2 + 1
+        expected = PuissanceAI('hard')._minimax(board, depth, -float('inf'), float('inf'), True, player)
+        before = search.parallel_searches
+        score, col, nodes = search.search(board, depth, player)
+        assert (score, col) == expected, columns
+        assert nodes > 0 and search.parallel_searches == before + 1
+
+
+class RaisingSearch(_SharedSearch):
+    """Processus dont la borne alpha partagée est relevée en cours de recherche, comme par un coup frère"""
+
+    def __init__(self, raise_after, raise_to):
+        super().__init__([0] * 4096, [0] * 4096, [-float('inf')], threading.Lock())
+        self.raise_after = raise_after
+        self.raise_to = raise_to
+        self.visited = 0
+        self.path = []
+        self.exact = []
+
+    def _minimax(self, board, depth, alpha, beta, maximizing_player, player):
+        self.path.append((board, maximizing_player))
+        try:
+            return super()._minimax(board, depth, alpha, beta, maximizing_player, player)
+        finally:
+            self.path.pop()
+
+    def _search_children(self, board, depth, alpha, beta, maximizing_player, player):
+        self.visited += 1
+        if self.visited == self.raise_after:
+            self._alphas[0] = self.raise_to
+        return super()._search_children(board, depth, alpha, beta, maximizing_player, player)
+
+    def _store(self, key, depth, value, flag):
+        super()._store(key, depth, value, flag)
+        if flag == EXACT:
+            self.exact.append((self.path[-1], depth, value))
+
+
+@pytest.mark.parametrize('columns', OPENINGS[:6])
+def test_raised_shared_alpha_never_stores_wrong_exact_entries(columns):
+    board = board_after(columns)
+    player = len(columns) % 2 + 1
+    sequential = PuissanceAI('hard')
+    child = sequential._simulate_move(board, 3, player)
+    score, _ = sequential._minimax(child, 4, -float('inf'), float('inf'), False, player)
+
+    for raise_after in (10, 40, 80):
+        worker = RaisingSearch(raise_after, score + 50)
+        worker.search_root_move(0, board, 3, 5, player)
+        for (position, maximizing_player), depth, value in worker.exact:
+            expected, _ = sequential._minimax(position, depth, -float('inf'), float('inf'), maximizing_player, player)
+            assert value == expected
@@ -0,0 +1,37 @@
+from position_cache import PositionCache, canonical_position
+
+
+def empty_board():
+    return [[0] * 7 for _ in range(6)]
+
+
+def test_mirrored_position_returns_mirrored_move():
+    cache = PositionCache(maxsize=10, difficulties=['hard'])
+    board = empty_board()
+    board[5][1] = 1
+    mirrored = [list(reversed(row)) for row in board]
+    assert canonical_position(board)[0] == canonical_position(mirrored)[0]
+
+    cache.set(board, 2, 'hard', 2, 15)
+    assert cache.get(board, 2, 'hard') == (2, 15)
+    assert cache.get(mirrored, 2, 'hard') == (4, 15)
+    assert len(cache) == 1
+
+
+def test_key_includes_player_and_difficulty():
+    cache = PositionCache(maxsize=10, difficulties=['medium', 'hard', 'easy'])
+    board = empty_board()
+    cache.set(board, 1, 'hard', 3)
+    assert cache.get(board, 2, 'hard') is None
+    assert cache.get(board, 1, 'medium') is None
+    # easy garde son hasard : jamais mis en cache
+    cache.set(board, 1, 'easy', 3)
+    assert cache.get(board, 1, 'easy') is None
+
+
+def test_zero_size_disables_cache(monkeypatch):
+    monkeypatch.setenv('AI_CACHE_SIZE', '1000')
+    cache = PositionCache(maxsize=0, difficulties=['hard'])
+    assert not cache.enabled
+    cache.set(empty_board(), 1, 'hard', 3)
+    assert cache.get(empty_board(), 1, 'hard') is None
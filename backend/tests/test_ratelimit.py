@@ -0,0 +1,34 @@
+from ratelimit import TokenBucketLimiter, parse_limits
+
+
+def test_parse_limits():
+    assert parse_limits('make_move=5:10, reset_game=0.2:2,join_game=3') == {
+        'make_move': (5.0, 10), 'reset_game': (0.2, 2), 'join_game': (3.0, 3)
+    }
+    assert parse_limits(None) == {}
+
+
+def test_burst_then_refused():
+    limiter = TokenBucketLimiter({'make_move': (0.001, 3)})
+    limiter.enabled = True
+    assert [limiter.allow('make_move', 'sid') for _ in range(4)] == [True, True, True, False]
+    assert limiter.stats()['dropped']['make_move'] == 1
+
+
+def test_user_bucket_shared_across_sids():
+    limiter = TokenBucketLimiter({'make_move': (0.001, 2)})
+    limiter.enabled = True
+    assert limiter.allow('make_move', 'a', user_id=1)
+    assert limiter.allow('make_move', 'b', user_id=1)
+    assert not limiter.allow('make_move', 'c', user_id=1)
+    assert limiter.allow('make_move', 'd', user_id=2)
+
+
+def test_unlimited_event_and_forget():
+    limiter = TokenBucketLimiter({'make_move': (0.001, 1)})
+    limiter.enabled = True
+    assert all(limiter.allow('other_event', 'sid') for _ in range(100))
+    assert limiter.allow('make_move', 'sid')
+    assert not limiter.allow('make_move', 'sid')
+    limiter.forget('sid')
+    assert limiter.allow('make_move', 'sid')
@@ -0,0 +1,66 @@
+from conftest import login, admin_headers, received
+
+
+def socket(server, http, token=None):
+    return server.socketio.test_client(server.app, flask_test_client=http,
+                                       auth={'token': token} if token else None)
+
+
+def test_grace_hold_pauses_clock_until_resume(server, http):
+    game_id = http.post('/create_game').get_json()['game_id']
+    first, second = socket(server, http), socket(server, http)
+    first.emit('join_game', {'game_id': game_id, 'player_name': 'A'})
+    second.emit('join_game', {'game_id': game_id, 'player_name': 'B'})
+    slot_token = received(second, 'player_assigned')[0]['slot_token']
+    first.emit('make_move', {'game_id': game_id, 'col': 3})
+    game = server.games[game_id]
+    assert game.clock.running == 2
+
+    # Le joueur au trait se déconnecte : sa place est gardée et sa pendule ne tourne plus
+    second.disconnect()
+    assert 2 in game.reserved_slots
+    assert game.clock.running is None and game.clock.flagged() is None
+
+    back = socket(server, http)
+    back.emit('join_game', {'game_id': game_id, 'player_name': 'B', 'slot_token': slot_token})
+    assert received(back, 'game_resync')[0]['player_number'] == 2
+    assert game.clock.running == 2
+    first.disconnect()
+    back.disconnect()
+
+
+def test_admin_terminate_finishes_tournament_round(server, http):
+    from tournament import tournament_manager
+    from routes import tournament_routes
+
+    tournament = tournament_manager.create('Coupe', 'swiss')
+    for user_id, name in ((101, 'alice'), (102, 'bob')):
+        tournament_manager.register(tournament.id, user_id, name, 1200)
+    assert tournament_manager.start(tournament.id) is None
+    for match in tournament_manager.next_wave():
+        tournament_routes.open_room(match)
+    game_id = tournament.matches[0].game_id
+    assert game_id in server.games
+
+    response = http.delete(f'/api/admin/active-games/{game_id}', headers=admin_headers(http))
+    assert response.status_code == 200
+    assert game_id not in server.games
+    # Sans le retrait commun, la rencontre restait ouverte et la manche bloquée
+    assert not tournament_manager.is_tournament_game(game_id)
+    assert tournament.status == 'finished'
+
+
+def test_bulk_disconnect_clears_presence(server, http):
+    from presence import presence
+
+    token = login(http, 'carol')
+    client = socket(server, http, token)
+    user_id = server.auth_manager.verify_token(token)['user_id']
+    assert presence.is_online(user_id)
+    sids = [sid for sid, info in server.connected_users.items() if info.get('user_id') == user_id]
+
+    response = http.post('/api/admin/bulk/connected-users/disconnect', json={'sids': sids},
+                         headers=admin_headers(http))
+    assert response.status_code == 200
+    assert not presence.is_online(user_id)
+    assert not client.is_connected()
@@ -0,0 +1,53 @@
+import random
+from timer_wheel import TimerWheel
+
+
+def test_timers_fire_on_time_never_early():
+    wheel = TimerWheel(tick_ms=10)
+    origin = wheel._origin
+    fired = []
+    random.seed(1)
+    delays = [random.uniform(0, 600) for _ in range(2000)]
+    for delay in delays:
+        wheel.schedule(delay, fired.append, delay)
+    assert len(wheel) == len(delays)
+
+    now = origin
+    while len(wheel):
+        now += random.uniform(0.5, 30)
+        before = len(fired)
+        wheel.run_due(now)
+        # Tout minuteur exécuté est arrivé à échéance, avec au plus un cran de retard à ce pas
+        assert all(delay <= now - origin + 1e-6 for delay in fired[before:])
+    assert sorted(fired) == sorted(delays)
+
+
+def test_cancelled_timer_never_fires():
+    wheel = TimerWheel(tick_ms=10)
+    fired = []
+    keep = wheel.schedule(1, fired.append, 'keep')
+    drop = wheel.schedule(1, fired.append, 'drop')
+    wheel.cancel(drop)
+    wheel.cancel(None)
+    wheel.run_due(wheel._origin + 2)
+    assert fired == ['keep']
+    assert keep.slot is None and len(wheel) == 0
+
+
+def test_beyond_horizon_is_rescheduled():
+    wheel = TimerWheel(tick_ms=1, levels=2)
+    fired = []
+    wheel.schedule(10, fired.append, 'late')
+    wheel.run_due(wheel._origin + 5)
+    assert fired == []
+    wheel.run_due(wheel._origin + 10.01)
+    assert fired == ['late']
+
+
+def test_callback_error_does_not_stop_the_wheel():
+    wheel = TimerWheel(tick_ms=10)
+    fired = []
+    wheel.schedule(0.01, lambda: 1 / 0)
+    wheel.schedule(0.01, fired.append, 'ok')
+    wheel.run_due(wheel._origin + 1)
+    assert fired == ['ok']
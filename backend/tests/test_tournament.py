@@ -0,0 +1,86 @@
+from tournament import Tournament, bracket_order
+
+
+def make_tournament(format, ratings, total_rounds=None):
+    tournament = Tournament('Test', format, total_rounds)
+    for user_id, rating in enumerate(ratings, 1):
+        tournament.register(user_id, f'joueur{user_id}', rating)
+    tournament.start()
+    return tournament
+
+
+def play_round(tournament, pick_winner):
+    matches = tournament.pair_round()
+    tournament.resolve_byes()
+    over = False
+    for match in matches:
+        if match.players[2] is not None:
+            over = tournament.record(match, pick_winner(match), 'played')
+    return over or tournament.remaining == 0
+
+
+def test_bracket_order():
+    assert bracket_order(2) == [1, 2]
+    assert bracket_order(8) == [1, 8, 4, 5, 2, 7, 3, 6]
+    assert sorted(bracket_order(16)) == list(range(1, 17))
+
+
+def test_elimination_top_seeds_meet_in_final():
+    tournament = make_tournament('elimination', [1000 + 10 * i for i in range(8)])
+    assert tournament.total_rounds == 3
+    best_seed = lambda match: 1 if match.players[1].seed < match.players[2].seed else 2
+
+    while True:
+        play_round(tournament, best_seed)
+        if tournament.close_round():
+            break
+    final = tournament.matches[0]
+    assert {final.players[1].seed, final.players[2].seed} == {1, 2}
+    assert tournament.winner.seed == 1 and tournament.status == 'finished'
+
+
+def test_elimination_byes_go_to_top_seeds():
+    tournament = make_tournament('elimination', [1500, 1400, 1300, 1200, 1100, 1000])
+    matches = tournament.pair_round()
+    byes = [match.players[1].seed for match in matches if match.players[2] is None]
+    assert sorted(byes) == [1, 2]
+
+
+def test_swiss_avoids_rematches_and_byes_rotate():
+    tournament = make_tournament('swiss', [1500, 1400, 1300, 1200, 1100], total_rounds=4)
+    bye_holders = []
+    for _ in range(4):
+        matches = tournament.pair_round()
+        tournament.resolve_byes()
+        for match in matches:
+            if match.players[2] is None:
+                bye_holders.append(match.players[1].user_id)
+            else:
+                first, second = match.players[1], match.players[2]
+                assert second.user_id not in first.opponents
+                tournament.record(match, 1, 'played')
+        finished = tournament.close_round()
+    assert finished and len(set(bye_holders)) == 4
+    assert sum(e.score for e in tournament.entrants.values()) == 4 * 3
+
+
+def test_double_forfeit_scores_nothing():
+    tournament = make_tournament('swiss', [1500, 1400], total_rounds=1)
+    match, = tournament.pair_round()
+    assert tournament.record(match, None, 'forfeit')
+    assert [e.score for e in tournament.entrants.values()] == [0, 0]
+
+    tournament = make_tournament('swiss', [1500, 1400], total_rounds=1)
+    match, = tournament.pair_round()
+    tournament.record(match, 0, 'played')
+    assert [e.score for e in tournament.entrants.values()] == [0.5, 0.5]
+
+
+def test_registration_rules():
+    tournament = Tournament('Test', 'swiss')
+    assert tournament.register(1, 'a', 1200) is None
+    assert tournament.register(1, 'a', 1200) == 'Déjà inscrit à ce tournoi'
+    assert tournament.withdraw(2) == 'Non inscrit à ce tournoi'
+    tournament.register(2, 'b', 1200)
+    tournament.start()
+    assert tournament.register(3, 'c', 1200) == 'Les inscriptions sont closes'
@@ -0,0 +1,157 @@
+import os
+import math
+import threading
+import time
+
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+
+
+class Timer:
+    __slots__ = ('expires', 'callback', 'args', 'slot', 'cancelled')
+
+    def __init__(self, expires, callback, args):
+        self.expires = expires
+        self.callback = callback
+        self.args = args
+        self.slot = None
+        self.cancelled = False
+
+
+class TimerWheel:
+    """Roue de temporisation hiérarchique partagée par tout le serveur
+
+    Une seule tâche de fond fait avancer la roue d'un cran toutes les
+    `TIMER_WHEEL_TICK_MS` millisecondes, quel que soit le nombre de minuteurs
+    (pendules, délais de grâce...). Chaque niveau compte 64 cases, chaque
+    case du niveau n couvre 64^n crans : programmer ou annuler un minuteur
+    est en O(1), un cran ne touche que la case courante, et les cases des
+    niveaux supérieurs ne sont redistribuées qu'au passage de leur tour.
+    Les rappels sont exécutés dans la tâche de fond, hors du verrou.
+    """
+
+    def __init__(self, tick_ms=None, levels=4):
+        self.tick = (tick_ms or float(os.getenv('TIMER_WHEEL_TICK_MS', 100))) / 1000
+        self.levels = levels
+        self._wheels = [[set() for _ in range(SLOTS)] for _ in range(levels)]
+        self._origin = time.monotonic()
+        self._current = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self._socketio = None
+        self._started = False
+        self.fired = 0
+
+    def attach(self, socketio):
+        """Branche la roue sur Socket.IO ; la tâche de fond démarre au premier minuteur"""
+        self._socketio = socketio
+
+    def schedule(self, delay, callback, *args):
+        """Programme callback(*args) dans `delay` secondes ; retourne le minuteur (annulable)"""
+        with self._lock:
+            # Arrondi au cran supérieur : un minuteur ne part jamais avant son échéance
+            expires = max(math.ceil((time.monotonic() + delay - self._origin) / self.tick), self._current + 1)
+            timer = Timer(expires, callback, args)
+            self._place(timer)
+            self._count += 1
+        self._ensure_running()
+        return timer
+
+    def cancel(self, timer):
+        if timer is None:
+            return
+        with self._lock:
+            if timer.slot is not None:
+                timer.slot.discard(timer)
+                timer.slot = None
+                self._count -= 1
+            timer.cancelled = True
+
+    def advance(self, now=None):
+        """Avance la roue jusqu'à `now` ; retourne les minuteurs arrivés à échéance"""
+        target = self._ticks(time.monotonic() if now is None else now)
+        due = []
+        with self._lock:
+            while self._current < target:
+                self._current += 1
+                index = self._current & SLOT_MASK
+                if index == 0:
+                    self._cascade(1)
+                slot = self._wheels[0][index]
+                if slot:
+                    for timer in slot:
+                        timer.slot = None
+                    due.extend(slot)
+                    self._count -= len(slot)
+                    slot.clear()
+        return due
+
+    def run_due(self, now=None):
+        """Exécute les rappels arrivés à échéance"""
+        for timer in self.advance(now):
+            if timer.cancelled:
+                continue
+            self.fired += 1
+            try:
+                timer.callback(*timer.args)
+            except Exception as e:
+                print(f"⚠️  Erreur dans un minuteur ({getattr(timer.callback, '__name__', timer.callback)}) : {e}")
+
+    def __len__(self):
+        return self._count
+
+    def stats(self):
+        with self._lock:
+            return {
+                'tick_ms': self.tick * 1000,
+                'pending': self._count,
+                'fired_total': self.fired,
+                'running': self._started
+            }
+
+    def _ticks(self, instant):
+        return int((instant - self._origin) / self.tick)
+
+    def _place(self, timer):
+        delta = timer.expires - self._current
+        level = 0
+        while level < self.levels - 1 and delta >= SLOTS ** (level + 1):
+            level += 1
+        # Au-delà de l'horizon, le minuteur attend dans la dernière case et sera reprogrammé
+        expires = min(timer.expires, self._current + SLOTS ** self.levels - 1)
+        slot = self._wheels[level][(expires >> (SLOT_BITS * level)) & SLOT_MASK]
+        slot.add(timer)
+        timer.slot = slot
+
+    def _cascade(self, level):
+        """Redistribue la case courante du niveau `level` vers les niveaux inférieurs"""
+        if level >= self.levels:
+            return
+        index = (self._current >> (SLOT_BITS * level)) & SLOT_MASK
+        if index == 0:
+            self._cascade(level + 1)
+        slot = self._wheels[level][index]
+        timers = list(slot)
+        slot.clear()
+        for timer in timers:
+            self._place(timer)
+
+    def _ensure_running(self):
+        if self._started or self._socketio is None:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        def driver():
+            while True:
+                self._socketio.sleep(self.tick)
+                self.run_due()
+
+        self._socketio.start_background_task(driver)
+
+
+# Instance globale de la roue de temporisation
+timer_wheel = TimerWheel()
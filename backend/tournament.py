@@ -0,0 +1,412 @@
+import os
+import math
+import heapq
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from database import db
+
+FORMATS = ('swiss', 'elimination')
+
+
+class Entrant:
+    __slots__ = ('user_id', 'name', 'rating', 'seed', 'score', 'opponents', 'byes', 'eliminated')
+
+    def __init__(self, user_id, name, rating):
+        self.user_id = user_id
+        self.name = name
+        self.rating = rating
+        self.seed = None
+        self.score = 0.0
+        self.opponents = set()
+        self.byes = 0
+        self.eliminated = False
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'name': self.name,
+            'rating': self.rating,
+            'seed': self.seed,
+            'score': self.score,
+            'eliminated': self.eliminated
+        }
+
+
+class Match:
+    __slots__ = ('tournament_id', 'round', 'players', 'game_id', 'slot_tokens', 'winner', 'result')
+
+    def __init__(self, tournament_id, round_number, first, second):
+        self.tournament_id = tournament_id
+        self.round = round_number
+        # Numéro de joueur -> Entrant ; sans second joueur, la manche est une exemption
+        self.players = {1: first, 2: second}
+        self.game_id = None
+        self.slot_tokens = {}
+        self.winner = None
+        self.result = None
+
+    def opponent_of(self, user_id):
+        first, second = self.players[1], self.players[2]
+        return second if first.user_id == user_id else first
+
+    def number_of(self, user_id):
+        return 1 if self.players[1].user_id == user_id else 2
+
+
+def bracket_order(size):
+    """Têtes de série dans l'ordre du tableau (8 : 1, 8, 4, 5, 2, 7, 3, 6), size puissance de 2"""
+    order = [1]
+    while len(order) < size:
+        count = len(order) * 2
+        order = [seed for top in order for seed in (top, count + 1 - top)]
+    return order
+
+
+class Tournament:
+    """Déroulé d'un tournoi suisse ou à élimination directe"""
+
+    def __init__(self, name, format, total_rounds=None, created_by=None):
+        self.id = str(uuid.uuid4())
+        self.name = name
+        self.format = format
+        self.requested_rounds = total_rounds
+        self.total_rounds = None
+        self.created_by = created_by
+        self.status = 'registration'
+        self.entrants = {}
+        self.round = 0
+        self.matches = []
+        self.remaining = 0
+        self.bracket = []
+        self.winner = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def register(self, user_id, name, rating):
+        if self.status != 'registration':
+            return 'Les inscriptions sont closes'
+        if user_id in self.entrants:
+            return 'Déjà inscrit à ce tournoi'
+        self.entrants[user_id] = Entrant(user_id, name, rating)
+        return None
+
+    def withdraw(self, user_id):
+        if self.status != 'registration':
+            return 'Le tournoi a déjà commencé'
+        if self.entrants.pop(user_id, None) is None:
+            return 'Non inscrit à ce tournoi'
+        return None
+
+    def start(self):
+        seeded = sorted(self.entrants.values(), key=lambda e: (-e.rating, e.user_id))
+        for seed, entrant in enumerate(seeded, 1):
+            entrant.seed = seed
+
+        if self.format == 'elimination':
+            size = 1 << max(1, math.ceil(math.log2(len(seeded))))
+            slots = seeded + [None] * (size - len(seeded))
+            # Tête de série n contre n-ième en partant du bas (les exemptions vont aux mieux classés),
+            # rencontres placées dans l'ordre standard : les deux premières ne se croisent qu'en finale
+            self.bracket = [slots[seed - 1] for seed in bracket_order(size)]
+            self.total_rounds = int(math.log2(size))
+        else:
+            self.total_rounds = self.requested_rounds or max(1, math.ceil(math.log2(len(seeded))))
+        self.status = 'running'
+
+    def pair_round(self):
+        """Forme les rencontres de la manche suivante"""
+        self.round += 1
+        if self.format == 'elimination':
+            pairs = [(self.bracket[i], self.bracket[i + 1]) for i in range(0, len(self.bracket), 2)]
+            pairs = [(a, b) if a is not None else (b, a) for a, b in pairs]
+        else:
+            pairs = self._swiss_pairs()
+
+        self.matches = []
+        for first, second in pairs:
+            # Alternance des couleurs d'une manche à l'autre
+            if second is not None and self.round % 2 == 0:
+                first, second = second, first
+            self.matches.append(Match(self.id, self.round, first, second))
+        self.remaining = sum(1 for match in self.matches if match.players[2] is not None)
+        return self.matches
+
+    def _swiss_pairs(self):
+        ranked = sorted(self.entrants.values(), key=lambda e: (-e.score, e.seed))
+        pairs = []
+        if len(ranked) % 2:
+            # Exemption pour le moins bien classé n'en ayant pas encore eu
+            index = next((i for i in range(len(ranked) - 1, -1, -1) if not ranked[i].byes), len(ranked) - 1)
+            pairs.append((ranked.pop(index), None))
+
+        while ranked:
+            first = ranked.pop(0)
+            index = next((i for i, other in enumerate(ranked) if other.user_id not in first.opponents), 0)
+            pairs.append((first, ranked.pop(index)))
+        return pairs
+
+    def resolve_byes(self):
+        for match in self.matches:
+            if match.players[2] is None:
+                match.winner = match.players[1]
+                match.result = 'bye'
+                match.players[1].byes += 1
+                match.players[1].score += 1
+
+    def record(self, match, winner_number, result):
+        """Applique le résultat d'une rencontre ; retourne True si la manche est terminée"""
+        first, second = match.players[1], match.players[2]
+        first.opponents.add(second.user_id)
+        second.opponents.add(first.user_id)
+        match.result = result
+
+        if winner_number in (1, 2):
+            match.winner = match.players[winner_number]
+            match.winner.score += 1
+        else:
+            if result != 'forfeit':
+                # Double forfait : aucun point
+                first.score += 0.5
+                second.score += 0.5
+            if self.format == 'elimination':
+                # Nul : la meilleure tête de série se qualifie
+                match.winner = min(first, second, key=lambda e: e.seed)
+
+        if self.format == 'elimination':
+            match.opponent_of(match.winner.user_id).eliminated = True
+
+        self.remaining -= 1
+        return self.remaining == 0
+
+    def close_round(self):
+        """Prépare la manche suivante ; retourne True si le tournoi est terminé"""
+        if self.format == 'elimination':
+            self.bracket = [match.winner for match in self.matches]
+            if len(self.bracket) == 1:
+                self.winner = self.bracket[0]
+        elif self.round >= self.total_rounds:
+            self.winner = self.standings(1)[0] if self.entrants else None
+
+        if self.winner is not None or self.round >= self.total_rounds:
+            self.status = 'finished'
+            self.finished_at = time.time()
+            return True
+        return False
+
+    def standings(self, limit=None, offset=0):
+        ranked = sorted(self.entrants.values(), key=lambda e: (e.eliminated, -e.score, e.seed or 0))
+        end = None if limit is None else offset + limit
+        return ranked[offset:end]
+
+    def summary(self):
+        return {
+            'tournament_id': self.id,
+            'name': self.name,
+            'format': self.format,
+            'status': self.status,
+            'entrants': len(self.entrants),
+            'round': self.round,
+            'total_rounds': self.total_rounds,
+            'games_remaining': self.remaining,
+            'winner': self.winner.to_dict() if self.winner else None,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+class TournamentManager:
+    """Tournois en cours : appariements, ouverture des salles par vagues et classements
+
+    Les salles d'une manche ne sont pas créées d'un bloc : elles partent dans
+    une file que le tick dépile par vagues de TOURNAMENT_WAVE_SIZE. Chaque
+    partie de tournoi est indexée par son game_id ; un résultat met à jour
+    le classement et le compteur de rencontres restantes de la manche en
+    O(1), sans parcourir `games`. La dernière rencontre d'une manche
+    déclenche une seule écriture groupée en base puis l'appariement suivant.
+    """
+
+    def __init__(self, wave_size=None, no_show_seconds=None, standings_size=None):
+        self.wave_size = wave_size or int(os.getenv('TOURNAMENT_WAVE_SIZE', 200))
+        self.no_show_seconds = no_show_seconds or float(os.getenv('TOURNAMENT_NO_SHOW_SECONDS', 120))
+        self.standings_size = standings_size or int(os.getenv('TOURNAMENT_STANDINGS_SIZE', 50))
+        self._socketio = None
+        self._tournaments = {}
+        self._by_game = {}         # game_id -> Match
+        self._waves = deque()      # rencontres dont la salle reste à ouvrir
+        self._no_shows = []        # tas (échéance, game_id)
+        self._sids = {}            # user_id -> sid qui suit le tournoi
+        self._lock = threading.Lock()
+
+    def attach(self, socketio):
+        self._socketio = socketio
+
+    # Inscriptions
+
+    def create(self, name, format, total_rounds=None, created_by=None):
+        tournament = Tournament(name, format, total_rounds, created_by)
+        with self._lock:
+            self._tournaments[tournament.id] = tournament
+        db.create_tournament(tournament.id, name, format, created_by)
+        return tournament
+
+    def get(self, tournament_id):
+        return self._tournaments.get(tournament_id)
+
+    def list(self):
+        return [tournament.summary() for tournament in list(self._tournaments.values())]
+
+    def register(self, tournament_id, user_id, name, rating):
+        with self._lock:
+            return self._tournaments[tournament_id].register(user_id, name, rating)
+
+    def withdraw(self, tournament_id, user_id):
+        with self._lock:
+            return self._tournaments[tournament_id].withdraw(user_id)
+
+    def start(self, tournament_id):
+        with self._lock:
+            tournament = self._tournaments[tournament_id]
+            if tournament.status != 'registration':
+                return 'Le tournoi a déjà commencé'
+            if len(tournament.entrants) < 2:
+                return 'Il faut au moins deux inscrits'
+            tournament.start()
+        db.update_tournament_status(tournament.id, 'running', tournament.total_rounds)
+        self._next_round(tournament)
+        return None
+
+    def watch(self, tournament_id, user_id, sid):
+        """Associe le sid d'un inscrit ; retourne sa rencontre en attente éventuelle"""
+        with self._lock:
+            tournament = self._tournaments.get(tournament_id)
+            if tournament is None or user_id not in tournament.entrants:
+                return None
+            self._sids[user_id] = sid
+            for match in tournament.matches:
+                if match.game_id and match.result is None and user_id in (
+                        match.players[1].user_id, match.players[2].user_id):
+                    return self._match_notice(match, user_id)
+        return None
+
+    # Salles
+
+    def next_wave(self):
+        """Dépile la prochaine vague de rencontres dont il faut ouvrir la salle"""
+        with self._lock:
+            wave = [self._waves.popleft() for _ in range(min(self.wave_size, len(self._waves)))]
+        return wave
+
+    def opened(self, match, game_id, slot_tokens, now=None):
+        """Enregistre la salle d'une rencontre et prévient les deux joueurs"""
+        deadline = (time.monotonic() if now is None else now) + self.no_show_seconds
+        with self._lock:
+            match.game_id = game_id
+            match.slot_tokens = slot_tokens
+            self._by_game[game_id] = match
+            heapq.heappush(self._no_shows, (deadline, game_id))
+            notices = [(self._sids.get(entrant.user_id), self._match_notice(match, entrant.user_id))
+                       for entrant in match.players.values()]
+        for sid, notice in notices:
+            if sid is not None:
+                self._socketio.emit('tournament_match', notice, to=sid)
+
+    def pop_no_shows(self, now=None):
+        """Retourne les game_id de tournoi dont le délai de présentation est écoulé"""
+        now = time.monotonic() if now is None else now
+        expired = []
+        with self._lock:
+            while self._no_shows and self._no_shows[0][0] <= now:
+                _, game_id = heapq.heappop(self._no_shows)
+                if game_id in self._by_game:
+                    expired.append(game_id)
+        return expired
+
+    def is_tournament_game(self, game_id):
+        return game_id in self._by_game
+
+    # Résultats
+
+    def game_finished(self, game_id, winner_number, result='played'):
+        """Résultat d'une partie de tournoi (winner_number 0 ou None pour un nul / double forfait)"""
+        with self._lock:
+            match = self._by_game.pop(game_id, None)
+            if match is None or match.result is not None:
+                return
+            tournament = self._tournaments[match.tournament_id]
+            round_over = tournament.record(match, winner_number, result)
+        # Le classement n'est diffusé qu'en fin de manche : pas d'envoi à tous les suiveurs par partie
+        if round_over:
+            self._close_round(tournament)
+
+    def _close_round(self, tournament):
+        with self._lock:
+            finished = tournament.close_round()
+            rows = [(tournament.id, match.round, match.game_id, match.players[1].user_id,
+                     match.players[2].user_id if match.players[2] else None,
+                     match.winner.user_id if match.winner else None, match.result)
+                    for match in tournament.matches]
+            entrants = [(tournament.id, e.user_id, e.score, e.eliminated) for e in tournament.entrants.values()]
+
+        try:
+            db.save_tournament_round(tournament.id, rows, entrants, tournament.status,
+                                     tournament.winner.user_id if tournament.winner else None,
+                                     datetime.now() if finished else None)
+        except Exception as e:
+            print(f"⚠️  Erreur lors de l'enregistrement de la manche {tournament.round} "
+                  f"du tournoi {tournament.id} : {e}")
+
+        if finished:
+            print(f"🏆 Tournoi {tournament.name} terminé après {tournament.round} manche(s)")
+            self._publish(tournament, 'tournament_finished', self._state(tournament))
+        else:
+            self._next_round(tournament)
+
+    def _next_round(self, tournament):
+        with self._lock:
+            matches = tournament.pair_round()
+            tournament.resolve_byes()
+            self._waves.extend(match for match in matches if match.players[2] is not None)
+            only_byes = tournament.remaining == 0
+        print(f"🏁 Tournoi {tournament.name} : manche {tournament.round}/{tournament.total_rounds}, "
+              f"{len(matches)} rencontres")
+        self._publish(tournament, 'tournament_round', self._state(tournament))
+        if only_byes:
+            self._close_round(tournament)
+
+    # Lectures
+
+    def stats(self):
+        with self._lock:
+            return {
+                'tournaments': len(self._tournaments),
+                'running': sum(1 for t in self._tournaments.values() if t.status == 'running'),
+                'games_in_progress': len(self._by_game),
+                'rooms_waiting': len(self._waves)
+            }
+
+    def _state(self, tournament):
+        return dict(tournament.summary(),
+                    standings=[e.to_dict() for e in tournament.standings(self.standings_size)])
+
+    def _match_notice(self, match, user_id):
+        opponent = match.opponent_of(user_id)
+        number = match.number_of(user_id)
+        return {
+            'tournament_id': match.tournament_id,
+            'round': match.round,
+            'game_id': match.game_id,
+            'player_number': number,
+            'slot_token': match.slot_tokens.get(number),
+            'opponent': {'name': opponent.name, 'rating': opponent.rating}
+        }
+
+    def _publish(self, tournament, event, payload):
+        if self._socketio is not None:
+            self._socketio.emit(event, payload, room=f'tournament:{tournament.id}')
+
+
+# Instance globale des tournois
+tournament_manager = TournamentManager()
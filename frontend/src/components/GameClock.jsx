@@ -0,0 +1,52 @@
+import React, { useState, useEffect } from 'react';
+import '../styles/components/GameClock.css';
+
+const formatTime = (ms) => {
+  const totalSeconds = Math.max(0, Math.ceil(ms / 1000));
+  const minutes = Math.floor(totalSeconds / 60);
+  const seconds = totalSeconds % 60;
+  return `${minutes}:${seconds.toString().padStart(2, '0')}`;
+};
+
+const GameClock = ({ clock, gameOver }) => {
+  // Le serveur fait foi : l'affichage décompte localement depuis le dernier état reçu
+  const [receivedAt, setReceivedAt] = useState(Date.now());
+  const [now, setNow] = useState(Date.now());
+
+  useEffect(() => {
+    setReceivedAt(Date.now());
+    setNow(Date.now());
+  }, [clock]);
+
+  useEffect(() => {
+    if (!clock || !clock.running || gameOver) return undefined;
+    const interval = setInterval(() => setNow(Date.now()), 200);
+    return () => clearInterval(interval);
+  }, [clock, gameOver]);
+
+  if (!clock) return null;
+
+  const remaining = (player) => {
+    const base = clock.remaining_ms[player];
+    return clock.running === player && !gameOver ? base - (now - receivedAt) : base;
+  };
+
+  return (
+    <div className="game-clock">
+      {[1, 2].map(player => (
+        <div
+          key={player}
+          className={`clock-item ${clock.running === player && !gameOver ? 'running' : ''} ${remaining(player) < 10000 ? 'low' : ''}`}
+        >
+          <span className="player-indicator">{player === 1 ? '🔴' : '🟡'}</span>
+          <span className="clock-time">{formatTime(remaining(player))}</span>
+        </div>
+      ))}
+      {clock.increment_ms > 0 && (
+        <div className="clock-increment">+{clock.increment_ms / 1000}s par coup</div>
+      )}
+    </div>
+  );
+};
+
+export default GameClock;
@@ -0,0 +1,104 @@
+import { useEffect, useState, useRef, useCallback } from 'react';
+import io from 'socket.io-client';
+
+const SOCKET_URL = 'http://localhost:5001';
+
+// Flux temps réel du tableau de bord admin : un instantané puis des événements incrémentaux
+export const useAdminFeed = (enabled) => {
+  const [activeGames, setActiveGames] = useState([]);
+  const [connectedUsers, setConnectedUsers] = useState([]);
+  const [stats, setStats] = useState(null);
+  const [connected, setConnected] = useState(false);
+  const socketRef = useRef(null);
+  const seqRef = useRef(0);
+
+  useEffect(() => {
+    if (!enabled) {
+      return undefined;
+    }
+
+    const socket = io(`${SOCKET_URL}/admin`, {
+      transports: ['polling', 'websocket'],
+      reconnection: true,
+      auth: (cb) => cb({ token: localStorage.getItem('puissance4_token') })
+    });
+    socketRef.current = socket;
+
+    // Les événements antérieurs à l'instantané reçu sont ignorés
+    const apply = (handler) => (data) => {
+      if (data.seq <= seqRef.current) {
+        return;
+      }
+      seqRef.current = data.seq;
+      setStats(data.stats);
+      handler(data);
+    };
+
+    socket.on('connect', () => setConnected(true));
+    socket.on('disconnect', () => setConnected(false));
+
+    socket.on('snapshot', (data) => {
+      seqRef.current = data.seq;
+      setActiveGames(data.games);
+      setConnectedUsers(data.users);
+      setStats(data.stats);
+    });
+
+    socket.on('game_created', apply(({ seq, stats: _, ...game }) => {
+      setActiveGames(games => [...games.filter(g => g.game_id !== game.game_id), game]);
+    }));
+
+    socket.on('game_ended', apply(({ game_id, moves_count }) => {
+      setActiveGames(games => games.map(g => (
+        g.game_id === game_id ? { ...g, game_over: true, moves_count } : g
+      )));
+    }));
+
+    socket.on('game_removed', apply(({ game_id }) => {
+      setActiveGames(games => games.filter(g => g.game_id !== game_id));
+      setConnectedUsers(users => users.map(u => (
+        u.in_game === game_id ? { ...u, in_game: null, role: 'idle' } : u
+      )));
+    }));
+
+    socket.on('games_removed', apply(({ game_ids }) => {
+      const removed = new Set(game_ids);
+      setActiveGames(games => games.filter(g => !removed.has(g.game_id)));
+      setConnectedUsers(users => users.map(u => (
+        removed.has(u.in_game) ? { ...u, in_game: null, role: 'idle' } : u
+      )));
+    }));
+
+    socket.on('user_connected', apply(({ seq, stats: _, ...user }) => {
+      setConnectedUsers(users => [...users.filter(u => u.sid !== user.sid), user]);
+    }));
+
+    socket.on('user_left', apply(({ sid }) => {
+      setConnectedUsers(users => users.filter(u => u.sid !== sid));
+    }));
+
+    socket.on('users_left', apply(({ sids }) => {
+      const left = new Set(sids);
+      setConnectedUsers(users => users.filter(u => !left.has(u.sid)));
+    }));
+
+    socket.on('user_role', apply(({ sid, username, in_game, role }) => {
+      setConnectedUsers(users => users.map(u => (
+        u.sid === sid ? { ...u, username, in_game, role } : u
+      )));
+    }));
+
+    return () => {
+      socket.close();
+      socketRef.current = null;
+    };
+  }, [enabled]);
+
+  const refresh = useCallback(() => {
+    socketRef.current?.emit('request_snapshot');
+  }, []);
+
+  return { activeGames, connectedUsers, stats, connected, refresh };
+};
+
+export default useAdminFeed;
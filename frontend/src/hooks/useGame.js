@@ -1,4 +1,7 @@
-import { useEffect, useState, useCallback } from 'react';
+import { useEffect, useState, useCallback, useRef } from 'react';
+
+// Jeton de reprise de la place d'un joueur, conservé le temps de l'onglet
+const slotTokenKey = (gameId) => `puissance4_slot_${gameId}`;
 
 export const useGame = (socket, gameId) => {
   const [gameState, setGameState] = useState(null);
@@ -7,15 +10,18 @@ export const useGame = (socket, gameId) => {
   const [statusMessage, setStatusMessage] = useState('Connexion en cours...');
   const [error, setError] = useState(null);
   const [moveHistory, setMoveHistory] = useState([]);
+  const playerNameRef = useRef(null);
 
   // Rejoindre une partie
   const joinGame = useCallback((playerName) => {
     if (!socket || !gameId) return;
     
     console.log('🎮 Tentative de rejoindre la partie:', gameId, 'en tant que', playerName);
+    playerNameRef.current = playerName;
     socket.emit('join_game', {
       game_id: gameId,
-      player_name: playerName
+      player_name: playerName,
+      slot_token: sessionStorage.getItem(slotTokenKey(gameId))
     });
   }, [socket, gameId]);
 
@@ -91,6 +97,9 @@ export const useGame = (socket, gameId) => {
       console.log('👤 Joueur assigné:', data);
       setCurrentPlayer(data.player_number);
       setPlayerInfo(data);
+      if (data.slot_token) {
+        sessionStorage.setItem(slotTokenKey(gameId), data.slot_token);
+      }
       
       if (data.role === 'spectator') {
         setStatusMessage('Vous êtes spectateur 👁️');
@@ -119,6 +128,37 @@ export const useGame = (socket, gameId) => {
       setStatusMessage(`${data.player_name} a quitté la partie (${data.players_count}/2)`);
     });
 
+    // Joueur déconnecté : sa place est gardée pendant le délai de grâce
+    socket.on('player_disconnected', (data) => {
+      console.log('📴 Joueur déconnecté:', data);
+      setStatusMessage(`${data.player_name} s'est déconnecté, attente de sa reconnexion (${data.grace_seconds}s)...`);
+    });
+
+    // Joueur revenu dans le délai de grâce
+    socket.on('player_reconnected', (data) => {
+      console.log('🔌 Joueur reconnecté:', data);
+      setStatusMessage(`${data.player_name} est de retour !`);
+    });
+
+    // Reprise de notre place : tout l'état arrive en un seul message
+    socket.on('game_resync', (data) => {
+      console.log('🔄 Reprise de la partie:', data);
+      const { game_state: state, ...info } = data;
+      sessionStorage.setItem(slotTokenKey(data.game_id), data.slot_token);
+      setCurrentPlayer(data.player_number);
+      setPlayerInfo(info);
+      setGameState(state);
+      setError(null);
+      setStatusMessage('Reconnecté, la partie reprend !');
+    });
+
+    // Arrivée en spectateur : état courant et coups déjà joués en un seul message
+    socket.on('spectator_sync', (data) => {
+      console.log('👁️ Rattrapage spectateur:', data);
+      setGameState(data.game_state);
+      setMoveHistory(data.moves);
+    });
+
     // Spectateur quitté
     socket.on('spectator_left', (data) => {
       console.log('👋 Spectateur a quitté:', data);
@@ -148,6 +188,30 @@ export const useGame = (socket, gameId) => {
       }]);
     });
 
+    // Drapeau tombé : le joueur au trait a épuisé son temps
+    socket.on('flag_fell', (data) => {
+      console.log('⏱️ Temps écoulé:', data);
+      setStatusMessage(`Temps écoulé pour le joueur ${data.player_number} !`);
+    });
+
+    // Le serveur va redémarrer : le jeton permettra de reprendre la même place
+    socket.on('server_draining', (data) => {
+      console.log('🚧 Serveur en maintenance, reprise prévue:', data);
+      sessionStorage.setItem(slotTokenKey(data.game_id), data.slot_token);
+      setStatusMessage('Maintenance du serveur : reconnexion automatique en cours...');
+    });
+
+    // Reconnexion (redémarrage du serveur ou coupure réseau) : on reprend sa place
+    const rejoin = () => {
+      if (!gameId || !playerNameRef.current) return;
+      socket.emit('join_game', {
+        game_id: gameId,
+        player_name: playerNameRef.current,
+        slot_token: sessionStorage.getItem(slotTokenKey(gameId))
+      });
+    };
+    socket.io.on('reconnect', rejoin);
+
     // Erreur
     socket.on('error', (data) => {
       console.error('❌ Erreur:', data.message);
@@ -173,13 +237,20 @@ export const useGame = (socket, gameId) => {
       socket.off('player_joined');
       socket.off('spectator_joined');
       socket.off('player_left');
+      socket.off('player_disconnected');
+      socket.off('player_reconnected');
+      socket.off('game_resync');
       socket.off('spectator_left');
+      socket.off('spectator_sync');
       socket.off('game_state');
       socket.off('move_made');
       socket.off('error');
       socket.off('game_ended');
+      socket.off('server_draining');
+      socket.off('flag_fell');
+      socket.io.off('reconnect', rejoin);
     };
-  }, [socket]);
+  }, [socket, gameId]);
 
   return {
     gameState,
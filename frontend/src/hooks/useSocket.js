@@ -15,7 +15,9 @@ export const useSocket = () => {
       reconnection: true,
       reconnectionDelay: 1000,
       reconnectionAttempts: 5,
-      upgrade: true
+      upgrade: true,
+      // Le token est lu à chaque (re)connexion pour authentifier la session
+      auth: (cb) => cb({ token: localStorage.getItem('puissance4_token') })
     });
 
     socketRef.current = newSocket;
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
+import { useAdminFeed } from '../hooks/useAdminFeed';
 import '../styles/pages/Admin.css';
 
 const Admin = () => {
@@ -10,8 +11,8 @@ const Admin = () => {
   const [activeTab, setActiveTab] = useState('users');
   const [users, setUsers] = useState([]);
   const [games, setGames] = useState([]);
-  const [activeGames, setActiveGames] = useState([]);
-  const [connectedUsers, setConnectedUsers] = useState([]);
+  // Parties actives et utilisateurs connectés sont poussés par le serveur
+  const { activeGames, connectedUsers, refresh: refreshLive } = useAdminFeed(Boolean(user && user.is_admin));
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
   const [successMessage, setSuccessMessage] = useState('');
@@ -27,10 +28,6 @@ const Admin = () => {
       loadUsers();
     } else if (activeTab === 'games') {
       loadGames();
-    } else if (activeTab === 'active-games') {
-      loadActiveGames();
-    } else if (activeTab === 'connected-users') {
-      loadConnectedUsers();
     }
   }, [activeTab]);
 
@@ -80,52 +77,6 @@ const Admin = () => {
     setLoading(false);
   };
 
-  const loadActiveGames = async () => {
-    setLoading(true);
-    setError('');
-    try {
-      const response = await fetch('http://localhost:5001/api/admin/active-games', {
-        headers: {
-          'Content-Type': 'application/json',
-          ...getAuthHeaders()
-        }
-      });
-      
-      if (response.ok) {
-        const data = await response.json();
-        setActiveGames(data.active_games);
-      } else {
-        setError('Erreur lors du chargement des parties actives');
-      }
-    } catch (err) {
-      setError('Erreur de connexion au serveur');
-    }
-    setLoading(false);
-  };
-
-  const loadConnectedUsers = async () => {
-    setLoading(true);
-    setError('');
-    try {
-      const response = await fetch('http://localhost:5001/api/admin/connected-users', {
-        headers: {
-          'Content-Type': 'application/json',
-          ...getAuthHeaders()
-        }
-      });
-      
-      if (response.ok) {
-        const data = await response.json();
-        setConnectedUsers(data.connected_users);
-      } else {
-        setError('Erreur lors du chargement des utilisateurs connectés');
-      }
-    } catch (err) {
-      setError('Erreur de connexion au serveur');
-    }
-    setLoading(false);
-  };
-
   const deleteUser = async (userId) => {
     if (!window.confirm('Êtes-vous sûr de vouloir supprimer cet utilisateur ?')) {
       return;
@@ -222,7 +173,6 @@ const Admin = () => {
 
       if (response.ok) {
         setSuccessMessage('Partie terminée avec succès');
-        loadActiveGames();
         setTimeout(() => setSuccessMessage(''), 3000);
       } else {
         const data = await response.json();
@@ -249,7 +199,6 @@ const Admin = () => {
 
       if (response.ok) {
         setSuccessMessage('Utilisateur déconnecté avec succès');
-        loadConnectedUsers();
         setTimeout(() => setSuccessMessage(''), 3000);
       } else {
         const data = await response.json();
@@ -451,7 +400,7 @@ const Admin = () => {
                 <div className="connected-users-section">
                   <div className="section-header">
                     <h2>Utilisateurs connectés</h2>
-                    <button onClick={loadConnectedUsers} className="btn-refresh">
+                    <button onClick={refreshLive} className="btn-refresh">
                       🔄 Actualiser
                     </button>
                   </div>
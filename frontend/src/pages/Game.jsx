@@ -6,6 +6,7 @@ import { useAuth } from '../contexts/AuthContext';
 import Board from '../components/Board';
 import PlayersList from '../components/PlayersList';
 import GameStatus from '../components/GameStatus';
+import GameClock from '../components/GameClock';
 import GameControls from '../components/GameControls';
 import GameHistory from '../components/GameHistory';
 import GlobalScore from '../components/GlobalScore';
@@ -77,6 +78,7 @@ const Game = () => {
             playerInfo={playerInfo}
             statusMessage={statusMessage}
           />
+          <GameClock clock={gameState?.clock} gameOver={gameState?.game_over} />
         </div>
       </div>
 
@@ -213,6 +213,7 @@ const Home = () => {
                     <option value="easy">Facile</option>
                     <option value="medium">Moyen</option>
                     <option value="hard">Difficile</option>
+                    <option value="mcts">Expert (Monte Carlo)</option>
                   </select>
                 </div>
                 <button 